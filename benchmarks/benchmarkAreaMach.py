@@ -0,0 +1,78 @@
+import os
+import sys
+import timeit
+import numpy as np
+from scipy.optimize import fsolve
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import quasi1DIsentropic
+
+
+# Per-point fsolve loop previously used by quasi1DIsentropic.compute_flow_variables
+def legacy_compute_mach_from_area_ratio(A_Astar, subsonic=True):
+    M_guess = 0.2 if subsonic else 2.0
+    M_solution, = fsolve(quasi1DIsentropic.area_mach_relation, M_guess, args=(A_Astar))
+    return M_solution
+
+
+def legacy_mach(x, y):
+    A = 2 * y
+    dA_dx = np.gradient(A, x)
+    throat_index = np.argmin(A)
+    A_ratio = A / A[throat_index]
+    Mach = np.zeros_like(A)
+
+    for i in range(0, throat_index + 1):
+        Mach[i] = legacy_compute_mach_from_area_ratio(A_ratio[i], subsonic=True)
+
+    regime = "supersonic"
+    for i in range(throat_index + 1, len(A)):
+        if regime == "supersonic":
+            Mach[i] = legacy_compute_mach_from_area_ratio(A_ratio[i], subsonic=False)
+            if dA_dx[i] < 0:
+                regime = "subsonic"
+        else:
+            Mach[i] = legacy_compute_mach_from_area_ratio(A_ratio[i], subsonic=True)
+            if dA_dx[i] > 0:
+                regime = "supersonic"
+
+    return Mach
+
+
+def vectorised_mach(x, y):
+    A = 2 * y
+    dA_dx = np.gradient(A, x)
+    throat_index = np.argmin(A)
+    A_ratio = A / A[throat_index]
+    return quasi1DIsentropic.mach_from_area_ratio(A_ratio, quasi1DIsentropic.supersonic_points(dA_dx, throat_index))
+
+
+def nozzle(n_points):
+    # Converging-diverging channel with its throat at 40 % of the length, like the case geometries
+    x = np.linspace(0, 1, n_points)
+    y = 0.05 + 0.02 * (1 - np.cos(2 * np.pi * np.clip((x - 0.4) / 1.2 + 0.5, 0, 1))) / 2
+    return x, y
+
+
+def run(sizes=(10**3, 10**4, 10**5, 10**6), legacy_max_points=10**6, repeats=3):
+    results = {}
+    print(f"{'points':>10s} {'fsolve loop':>14s} {'vectorised':>14s} {'speedup':>10s} {'max |dM|':>10s}")
+    for n_points in sizes:
+        x, y = nozzle(n_points)
+        vectorised = min(timeit.repeat(lambda: vectorised_mach(x, y), number=1, repeat=repeats))
+
+        legacy = float('nan')
+        difference = float('nan')
+        if n_points <= legacy_max_points:
+            legacy = min(timeit.repeat(lambda: legacy_mach(x, y), number=1, repeat=1))
+            difference = np.max(np.abs(legacy_mach(x, y) - vectorised_mach(x, y))) if n_points <= 10**4 else difference
+
+        results[n_points] = {'legacy': legacy, 'vectorised': vectorised}
+        print(f"{n_points:10d} {legacy * 1e3:12.1f}ms {vectorised * 1e3:12.2f}ms {legacy / vectorised:9.0f}x {difference:10.2e}")
+
+    return results
+
+
+if __name__ == '__main__':
+    run(legacy_max_points=int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6)
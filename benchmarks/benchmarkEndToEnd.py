@@ -0,0 +1,273 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import tempfile
+import subprocess
+import configparser
+
+repository = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+mock_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mockFoam')
+solver = 'rhoCentralFoam_2ph'
+
+sys.path.insert(0, os.path.join(repository, 'src'))
+import checkpoint
+
+# More overhead per run than this relative to the compared results counts as a regression
+regression_threshold = 1.2
+
+
+def busy_time(intervals):
+    # Wall time during which at least one of the (start, end) intervals runs
+    total = 0.0
+    current_start, current_end = None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def prepare_case(case, working_dir, runs, settings):
+    # Copy of the case without results of earlier simulations, with the given [SECTION] option values
+    case_dir = os.path.join(working_dir, os.path.basename(os.path.normpath(case)))
+    shutil.copytree(case, case_dir, ignore=shutil.ignore_patterns('logs', 'simulation_results', 'simulation_results.objects', 'processor*', '.trash', 'checkpoint.npz', '*.log'))
+
+    config = configparser.ConfigParser()
+    config.read(os.path.join(case_dir, "simulation_parameters.ini"))
+    config.set("SIMULATION", "maximum_number_of_runs", str(runs - 1))
+    for (section, option), value in settings.items():
+        if value is not None:
+            config.set(section, option, str(value))
+    with open(os.path.join(case_dir, "simulation_parameters.ini"), 'w') as f:
+        config.write(f)
+    return case_dir
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repository, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def mock_environment(call_log, write_seconds, tool_seconds):
+    env = dict(os.environ, PATH=mock_dir + os.pathsep + os.environ.get("PATH", ""), MOCKFOAM_LOG=call_log,
+               MOCKFOAM_WRITE_SECONDS=str(write_seconds), MOCKFOAM_TOOL_SECONDS=str(tool_seconds))
+    # Cores and ranks of a campaign would not apply to the copy
+    env.pop("PLUMES_PROCESSORS", None)
+    env.pop("PLUMES_CPU_SET", None)
+    return env
+
+
+def run(case, runs=3, write_seconds=0.2, tool_seconds=0.0, settings=None, profile=False, keep=False, timeout=3600):
+    """
+    Run runSimulation.py on a copy of case with the mock OpenFOAM and Gmsh executables of
+    benchmarks/mockFoam and return the timings: total wall time, wall time of the solver, the
+    non-solver overhead (everything else: meshing, decomposition, monitoring and reconstruction
+    latency, archiving, wall evolution and the start of the driver) and the calls of every tool.
+    """
+    working_dir = tempfile.mkdtemp(prefix="endToEndBenchmark_")
+    case_dir = prepare_case(case, working_dir, runs, settings or {})
+    call_log = os.path.join(working_dir, "tool_calls.jsonl")
+    driver_log = os.path.join(working_dir, "driver.log")
+    env = mock_environment(call_log, write_seconds, tool_seconds)
+
+    command = [sys.executable, os.path.join(repository, 'src', 'runSimulation.py'), case_dir] + (['--profile'] if profile else [])
+    print(f"Running {runs} runs of {case} with the mock toolchain in {working_dir}...", flush=True)
+    try:
+        start = time.perf_counter()
+        with open(driver_log, 'w') as log_file:
+            result = subprocess.run(command, cwd=repository, env=env, stdout=log_file, stderr=subprocess.STDOUT, timeout=timeout)
+        wall_time = time.perf_counter() - start
+        if result.returncode != 0:
+            with open(driver_log) as f:
+                print(f.read()[-5000:])
+            raise RuntimeError(f"runSimulation.py failed with exit code {result.returncode}, see {driver_log}")
+
+        with open(call_log) as f:
+            calls = [json.loads(line) for line in f]
+
+        tools = {}
+        for call in calls:
+            tool = tools.setdefault(call['tool'], {'calls': 0, 'wall_time': 0.0})
+            tool['calls'] += 1
+            tool['wall_time'] += call['end'] - call['start']
+
+        solver_time = busy_time([(c['start'], c['end']) for c in calls if c['tool'] == solver])
+        tool_time = busy_time([(c['start'], c['end']) for c in calls])
+
+        # Stage timing of the driver per run, summed over the runs
+        stages = {}
+        results_dir = os.path.join(case_dir, "simulation_results")
+        for run_dir in sorted(os.listdir(results_dir)):
+            timing_file = os.path.join(results_dir, run_dir, "stage_timing.json")
+            if os.path.exists(timing_file):
+                with open(timing_file) as f:
+                    for record in json.load(f)['stages']:
+                        stages[record['stage']] = stages.get(record['stage'], 0.0) + record['wall_time']
+
+        completed_runs = tools.get(solver, {'calls': 0})['calls']
+        return {
+            'commit': git_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'case': case,
+            'runs': completed_runs,
+            'write_seconds': write_seconds,
+            'tool_seconds': tool_seconds,
+            'settings': {f"{section}.{option}": value for (section, option), value in (settings or {}).items() if value is not None},
+            'wall_time': wall_time,
+            'solver_time': solver_time,
+            'non_solver_overhead': wall_time - solver_time,
+            'non_solver_overhead_per_run': (wall_time - solver_time) / max(completed_runs, 1),
+            'driver_time': wall_time - tool_time,
+            'tools': tools,
+            'stages': stages,
+        }
+    finally:
+        if keep:
+            print(f"Kept {working_dir}", flush=True)
+        else:
+            shutil.rmtree(working_dir, ignore_errors=True)
+
+
+def kill_case_processes(case_dir):
+    # SIGKILL every process running in the case directory (driver, solver ranks, monitor workers), as a crash would
+    case_dir = os.path.realpath(case_dir)
+    for pid in os.listdir('/proc'):
+        try:
+            if pid.isdigit() and os.path.realpath(os.readlink(f'/proc/{pid}/cwd')) == case_dir:
+                os.kill(int(pid), signal.SIGKILL)
+        except OSError:
+            continue
+
+
+def resume_check(case, runs=2, write_seconds=0.2, settings=None, keep=False, timeout=3600):
+    """
+    For every checkpoint stage: kill runSimulation.py on a copy of case once the first run has
+    completed that stage, continue it with --resume and check that all runs complete. Returns the
+    stages whose resumed run failed.
+    """
+    failed = []
+    for stage in checkpoint.stages:
+        working_dir = tempfile.mkdtemp(prefix="endToEndBenchmark_")
+        case_dir = prepare_case(case, working_dir, runs, settings or {})
+        driver_log = os.path.join(working_dir, "driver.log")
+        env = mock_environment(os.path.join(working_dir, "tool_calls.jsonl"), write_seconds, 0.0)
+        command = [sys.executable, os.path.join(repository, 'src', 'runSimulation.py'), case_dir]
+        # The run counter is incremented before the 'evolved' checkpoint of a run
+        first_run = 1 if stage == 'evolved' else 0
+
+        print(f"Interrupting run 0 of {case} after stage '{stage}'...", flush=True)
+        try:
+            with open(driver_log, 'w') as log_file:
+                driver = subprocess.Popen(command, cwd=repository, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+                deadline = time.monotonic() + timeout
+                while driver.poll() is None and time.monotonic() < deadline:
+                    try:
+                        state, _ = checkpoint.load(os.path.join(case_dir, checkpoint.checkpoint_path))
+                    except (OSError, ValueError):
+                        # Read while it was replaced
+                        state = None
+                    if state is not None and state['number_of_runs'] == first_run and state['stage'] == stage:
+                        break
+                    time.sleep(0.05)
+                interrupted = driver.poll() is None
+                kill_case_processes(case_dir)
+                driver.wait()
+
+                if not interrupted:
+                    print(f"  runSimulation.py ended before stage '{stage}' was checkpointed, see {driver_log}", flush=True)
+                    failed.append(stage)
+                    continue
+
+                log_file.write("\n---------- resumed ----------\n")
+                log_file.flush()
+                result = subprocess.run(command + ['--resume'], cwd=repository, env=env, stdout=log_file, stderr=subprocess.STDOUT, timeout=timeout)
+
+            results_dir = os.path.join(case_dir, "simulation_results")
+            # One directory per completed run, next to the stage timing summary
+            completed_runs = len([d for d in os.listdir(results_dir) if os.path.isdir(os.path.join(results_dir, d))]) if os.path.isdir(results_dir) else 0
+            if result.returncode != 0 or completed_runs != runs:
+                with open(driver_log) as f:
+                    print(f.read()[-5000:])
+                print(f"  Resume after stage '{stage}' FAILED: exit code {result.returncode}, {completed_runs} of {runs} runs", flush=True)
+                failed.append(stage)
+            else:
+                print(f"  Resumed, {completed_runs} of {runs} runs completed.", flush=True)
+        finally:
+            if keep:
+                print(f"Kept {working_dir}", flush=True)
+            else:
+                shutil.rmtree(working_dir, ignore_errors=True)
+    return failed
+
+
+def report(results):
+    print(f"\n{results['runs']} runs in {results['wall_time']:.2f} s, solver {results['solver_time']:.2f} s")
+    print(f"Non-solver overhead: {results['non_solver_overhead']:.2f} s ({results['non_solver_overhead_per_run']:.2f} s per run), "
+          f"of which {results['driver_time']:.2f} s outside of any tool")
+    print(f"\n{'tool':<22}{'calls':>7}{'wall [s]':>11}")
+    for tool, entry in sorted(results['tools'].items(), key=lambda item: -item[1]['wall_time']):
+        print(f"{tool:<22}{entry['calls']:>7}{entry['wall_time']:>11.2f}")
+    print(f"\n{'driver stage':<28}{'wall [s]':>11}")
+    for stage, wall_time in results['stages'].items():
+        print(f"{stage:<28}{wall_time:>11.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run runSimulation.py end to end with the mock OpenFOAM and Gmsh executables of benchmarks/mockFoam.")
+    parser.add_argument("--case", default=os.path.join(repository, 'cases', 'wall_interactions', 'wall_accretion'))
+    parser.add_argument("--runs", type=int, default=3, help="outer runs (default 3)")
+    parser.add_argument("--write-seconds", type=float, default=0.2, help="wall time of the mock solver per write interval")
+    parser.add_argument("--tool-seconds", type=float, default=0.0, help="extra wall time of every other mock tool")
+    parser.add_argument("--processors", type=int)
+    parser.add_argument("--decomposition", choices=['fixed', 'auto'])
+    # The 30 s interval of the poll monitor would make up most of the wall time of the short mock runs
+    parser.add_argument("--monitor-mode", choices=['poll', 'event', 'functionObject', 'residual'], default='event', help="default: event")
+    parser.add_argument("--backend", choices=['native', 'gmsh'])
+    parser.add_argument("--mesh-mode", choices=['remesh', 'morph'])
+    parser.add_argument("--archive-mode", choices=['copy', 'dedup', 'container'])
+    parser.add_argument("--write-format", choices=['ascii', 'binary'])
+    parser.add_argument("--profile", action='store_true', help="run every stage of the driver under cProfile")
+    parser.add_argument("--keep", action='store_true', help="keep the case copy, its results and the logs")
+    parser.add_argument("--output", default="benchmarkEndToEnd.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="JSON results of an earlier run, e.g. of another commit")
+    parser.add_argument("--resume-check", action='store_true', help="instead of timing, interrupt the first run after every checkpoint stage and check that --resume completes all runs")
+    arguments = parser.parse_args()
+
+    settings = {
+        ("SIMULATION", "processors"): arguments.processors,
+        ("SIMULATION", "decomposition"): arguments.decomposition,
+        ("SIMULATION", "monitor_mode"): arguments.monitor_mode,
+        ("SIMULATION", "archive_mode"): arguments.archive_mode,
+        ("SIMULATION", "write_format"): arguments.write_format,
+        ("MESH", "backend"): arguments.backend,
+        ("MESH", "mode"): arguments.mesh_mode,
+    }
+    if arguments.resume_check:
+        failed = resume_check(arguments.case, arguments.runs, arguments.write_seconds, settings, arguments.keep)
+        print(f"\nResume failed after: {', '.join(failed)}" if failed else f"\nResume completed after every stage: {', '.join(checkpoint.stages)}")
+        sys.exit(1 if failed else 0)
+
+    results = run(arguments.case, arguments.runs, arguments.write_seconds, arguments.tool_seconds, settings, arguments.profile, arguments.keep)
+    report(results)
+    with open(arguments.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {arguments.output}")
+
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            previous = json.load(f)
+        ratio = results['non_solver_overhead_per_run'] / previous['non_solver_overhead_per_run']
+        print(f"Non-solver overhead per run compared with {previous.get('commit')}: {ratio:.2f}x"
+              f"{'  REGRESSION' if ratio > regression_threshold else ''}")
+        sys.exit(1 if ratio > regression_threshold else 0)
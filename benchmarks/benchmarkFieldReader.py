@@ -0,0 +1,98 @@
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import foamFieldIO
+
+# Line-by-line parser previously used by editInitialCondition.read_cell_centers
+def legacy_read_cell_centers(filepath):
+    with open(filepath, 'r') as f:
+        lines = f.readlines()
+
+    for i, line in enumerate(lines):
+        if 'internalField' in line and 'nonuniform' in line:
+            size_line_index = i + 1
+            break
+    else:
+        raise ValueError("No nonuniform internalField found in file.")
+
+    size = int(lines[size_line_index].strip())
+    data_start = size_line_index + 2
+    data_end = data_start + size
+
+    vector_data = []
+    for line in lines[data_start:data_end]:
+        vec_str = line.strip().strip('()')
+        vec = tuple(map(float, vec_str.split()))
+        vector_data.append(vec)
+
+    return np.array(vector_data)
+
+# Line-by-line parser previously used by monitorSimulation.calculate_rms_vector_field
+def legacy_rms_vector_field(field_file):
+    with open(field_file, 'r') as f:
+        lines = f.readlines()
+
+    values = []
+    start_reading = False
+    inside_internal_field = False
+
+    for line in lines:
+        line = line.strip()
+        if "internalField" in line:
+            inside_internal_field = True
+        if inside_internal_field and "(" in line and not start_reading:
+            start_reading = True
+            continue
+        if line == ");":
+            start_reading = False
+            inside_internal_field = False
+            continue
+
+        if start_reading:
+            try:
+                vec = np.array([float(n) for n in line.strip("() ").split()])
+                if len(vec) == 3:
+                    values.append(np.linalg.norm(vec))
+            except ValueError:
+                continue
+
+    return np.sqrt(np.mean(np.square(values))) if values else float('nan')
+
+
+def run(field_file, repeats=5):
+    legacy = legacy_read_cell_centers(field_file)
+    vectorised = foamFieldIO.read_internal_field(field_file)
+    if not np.array_equal(legacy, vectorised):
+        raise RuntimeError("Vectorised reader does not match the legacy reader.")
+
+    binary_content = foamFieldIO.convert_format(foamFieldIO.read_file(field_file), 'binary')
+    if not np.array_equal(vectorised, foamFieldIO.read_internal_field(None, content=binary_content)):
+        raise RuntimeError("Binary reader does not match the ascii reader.")
+
+    timings = {
+        'legacy read_cell_centers': lambda: legacy_read_cell_centers(field_file),
+        'legacy calculate_rms_vector_field': lambda: legacy_rms_vector_field(field_file),
+        'foamFieldIO.read_internal_field': lambda: foamFieldIO.read_internal_field(field_file),
+        'foamFieldIO.read_boundary_fields': lambda: foamFieldIO.read_boundary_fields(field_file),
+        'foamFieldIO.read_internal_field binary': lambda: foamFieldIO.read_internal_field(None, content=binary_content),
+    }
+
+    print(f"Field file: {field_file} ({vectorised.shape[0]} cells)")
+    results = {}
+    for name, func in timings.items():
+        results[name] = min(timeit.repeat(func, number=1, repeat=repeats))
+        print(f"{name:40s} {results[name] * 1e3:10.2f} ms")
+
+    print(f"Speedup vs legacy read_cell_centers: {results['legacy read_cell_centers'] / results['foamFieldIO.read_internal_field']:.1f}x")
+    print(f"Speedup vs legacy calculate_rms_vector_field: {results['legacy calculate_rms_vector_field'] / results['foamFieldIO.read_internal_field']:.1f}x")
+
+    return results
+
+
+if __name__ == '__main__':
+    default_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cases', 'baseline', '0', 'C')
+    run(sys.argv[1] if len(sys.argv) > 1 else default_file)
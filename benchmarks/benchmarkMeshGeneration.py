@@ -0,0 +1,95 @@
+import os
+import sys
+import shutil
+import tempfile
+import configparser
+import timeit
+import numpy as np
+from scipy.spatial import cKDTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import commandRunner
+import createGmshGeoFile
+import createPolyMesh
+import editBoundaryFile
+import polyMesh
+
+repository = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+mock_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mockFoam')
+
+
+def native(wall_points, section_boundaries, gradings, mesh, write_format):
+    createPolyMesh.create(wall_points, section_boundaries, gradings, mesh['vertical_divisions'], mesh['progression_vertical'], write_format=write_format)
+
+
+def gmsh(mesh_name):
+    # Same commands as runSimulation.py with the Gmsh backend
+    commandRunner.run(['gmsh', '-3', f'{mesh_name}.geo', '-o', f'{mesh_name}.msh', '-format', 'msh2'])
+    commandRunner.run(['gmshToFoam', f'{mesh_name}.msh'])
+    editBoundaryFile.edit()
+
+
+def is_mock(tool):
+    # The stand-in of benchmarks/mockFoam builds the Gmsh mesh with createPolyMesh itself
+    return os.path.realpath(os.path.dirname(shutil.which(tool))) == os.path.realpath(mock_dir)
+
+
+def run(case, repeats=5):
+    config = configparser.ConfigParser()
+    config.read(os.path.join(case, "simulation_parameters.ini"))
+    mesh = {
+        'name': config.get("MESH", "name"),
+        'vertical_divisions': config.getint("MESH", "vertical_divisions"),
+        'horizontal_divisions': config.getint("MESH", "horizontal_divisions"),
+        'progression_vertical': config.getfloat("MESH", "progression_vertical"),
+        'progression_horizontal': config.getfloat("MESH", "progression_horizontal"),
+        'bump_horizontal': config.getfloat("MESH", "bump_horizontal"),
+    }
+
+    results = {}
+    working_dir = tempfile.mkdtemp(prefix="meshBenchmark_")
+    cwd = os.getcwd()
+    try:
+        shutil.copytree(os.path.join(repository, 'cases', 'baseline', 'system'), os.path.join(working_dir, 'system'))
+        os.chdir(working_dir)
+
+        wall_points = createGmshGeoFile.create(os.path.join(case, 'channel_data.csv'), mesh['name'], mesh['vertical_divisions'], mesh['horizontal_divisions'],
+                                               mesh['progression_vertical'], mesh['progression_horizontal'], mesh['bump_horizontal'])
+        section_boundaries = createGmshGeoFile.find_section_boundaries(wall_points)
+        gradings = createGmshGeoFile.section_gradings(section_boundaries, mesh['horizontal_divisions'], mesh['progression_horizontal'], mesh['bump_horizontal'])
+
+        for write_format in ['ascii', 'binary']:
+            name = f'createPolyMesh {write_format}'
+            results[name] = min(timeit.repeat(lambda: native(wall_points, section_boundaries, gradings, mesh, write_format), number=1, repeat=repeats))
+        native_points = polyMesh.read_points()
+        print(f"Mesh: {len(native_points)} points, {len(section_boundaries) - 1} sections")
+
+        if shutil.which('gmsh') and shutil.which('gmshToFoam'):
+            shutil.rmtree('constant', ignore_errors=True)
+            results['gmsh + gmshToFoam'] = min(timeit.repeat(lambda: gmsh(mesh['name']), number=1, repeat=repeats))
+
+            # Points are compared as sets, the node numbering of gmshToFoam differs
+            gmsh_points = polyMesh.read_points()
+            distance, _ = cKDTree(gmsh_points).query(native_points)
+            print(f"Largest point distance to the Gmsh mesh: {distance.max():.3e} m")
+        else:
+            print("gmsh or gmshToFoam not found, only the native generator is timed.")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(working_dir)
+
+    for name, seconds in results.items():
+        print(f"{name:30s} {seconds * 1e3:10.2f} ms")
+    if 'gmsh + gmshToFoam' in results:
+        print(f"Speedup vs gmsh + gmshToFoam: {results['gmsh + gmshToFoam'] / results['createPolyMesh ascii']:.1f}x")
+        if is_mock('gmsh'):
+            print("The gmsh on PATH is the mock of benchmarks/mockFoam, which meshes with createPolyMesh: the timing and point "
+                  "comparison above compare the native generator with itself and are only meaningful with the real Gmsh.")
+
+    return results
+
+
+if __name__ == '__main__':
+    default_case = os.path.join(repository, 'cases', 'wall_interactions', 'wall_accretion')
+    run(os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else default_case)
@@ -0,0 +1,100 @@
+import os
+import sys
+import shutil
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import foamFieldIO
+import polyMesh
+import runArchive
+
+repository = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Fields changed by every outer run, the other files of 0/ are rewritten unchanged
+run_fields = ['p', 'T', 'U', 'Ma']
+
+
+def prepare_run(case_dir, run, latest_time, rng):
+    # Imitate an outer run: moved mesh points, new initial conditions and a new latest time
+    points = polyMesh.read_points(os.path.join(case_dir, "constant", "polyMesh"))
+    points[:,1] *= 1 - 1e-4 * run * rng.random()
+    polyMesh.write_points(points, os.path.join(case_dir, "constant", "polyMesh"))
+
+    shutil.rmtree(os.path.join(case_dir, latest_time), ignore_errors=True)
+    os.makedirs(os.path.join(case_dir, latest_time))
+    for field in run_fields:
+        path = os.path.join(case_dir, "0", field)
+        content = foamFieldIO.read_file(path)
+        values = foamFieldIO.read_internal_field(None, content=content)
+        if values.ndim == 0 or values.size == 0:
+            continue
+        with open(path, "wb") as f:
+            f.write(foamFieldIO.replace_internal_field(content, values * (1 + 1e-3 * rng.random(values.shape))))
+        shutil.copyfile(path, os.path.join(case_dir, latest_time, field))
+
+    with open(os.path.join(case_dir, "channel_mesh.geo"), "w") as f:
+        f.write(f"// run {run}\n")
+
+
+def copy_run(case_dir, run_dir, sources):
+    # Same result as the cp -r calls of runSimulation.py
+    os.makedirs(run_dir)
+    for source in sources:
+        path = os.path.join(case_dir, source)
+        if os.path.isdir(path):
+            shutil.copytree(path, os.path.join(run_dir, source))
+        else:
+            shutil.copyfile(path, os.path.join(run_dir, source))
+
+
+def run(n_runs=100, seed=0):
+    working_dir = tempfile.mkdtemp(prefix="archiveBenchmark_")
+    case_dir = os.path.join(working_dir, "case")
+    try:
+        for name in ['0', 'constant', 'system', 'foam.foam']:
+            source = os.path.join(repository, 'cases', 'baseline', name)
+            if os.path.isdir(source):
+                shutil.copytree(source, os.path.join(case_dir, name))
+            else:
+                shutil.copyfile(source, os.path.join(case_dir, name))
+
+        latest_time = "0.05"
+        sources = ['0', latest_time, 'constant', 'system', 'foam.foam', 'channel_mesh.geo']
+        copied_dir = os.path.join(working_dir, "copied")
+        archived_dir = os.path.join(working_dir, "archived")
+        archive = runArchive.RunArchive(archived_dir)
+
+        rng = np.random.default_rng(seed)
+        seconds = {'copy': 0.0, 'archive': 0.0}
+        cwd = os.getcwd()
+        for run_index in range(n_runs):
+            prepare_run(case_dir, run_index, latest_time, rng)
+
+            start = time.perf_counter()
+            copy_run(case_dir, os.path.join(copied_dir, f"{run_index:.2f}"), sources)
+            seconds['copy'] += time.perf_counter() - start
+
+            os.chdir(case_dir)
+            try:
+                start = time.perf_counter()
+                archive.add_run(os.path.join(archived_dir, f"{run_index:.2f}"), sources)
+                seconds['archive'] += time.perf_counter() - start
+            finally:
+                os.chdir(cwd)
+
+        copied = runArchive.disk_usage(copied_dir)
+        print(f"{n_runs} runs of the baseline case ({copied['files'] // n_runs} files per run)")
+        print(f"Plain copies: {copied['allocated'] / 2**20:.1f} MiB on disk, {seconds['copy']:.2f} s")
+        print(f"Run archive:  {seconds['archive']:.2f} s, files: " + ", ".join(f"{mode} {archive.stats[mode]}" for mode in ['hardlink', 'reflink', 'copy'] if mode in archive.stats))
+        archived = runArchive.report(archived_dir)
+    finally:
+        shutil.rmtree(working_dir)
+
+    return {'copied': copied, 'archived': archived, 'seconds': seconds}
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
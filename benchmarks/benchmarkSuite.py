@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import createGmshGeoFile
+import createPolyMesh
+import editInitialCondition
+import foamFieldIO
+import meshGeometry
+import monitorSimulation
+import quasi1DIsentropic
+import readWallFields
+import setWallInteractionTerms
+import updateGeometry
+
+repository = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Ratio of the cell counts along and across the channel, as in the baseline case (300 x 60)
+aspect_ratio = 5
+
+# Slower than this relative to the compared results counts as a regression
+regression_threshold = 1.2
+
+
+def channel_points(n_points, length=1.5, inlet_height=0.07, throat_height=0.035):
+    # Converging-diverging channel with one throat, i.e. two sections of the Gmsh script
+    x = np.linspace(0, length, n_points)
+    y = inlet_height - (inlet_height - throat_height) * np.sin(np.pi * x / length)**2 * (x < length / 2)
+    y[x >= length / 2] = throat_height + (inlet_height - throat_height) * 0.5 * np.sin(np.pi * (x[x >= length / 2] - length / 2) / length)**2
+    return x, y
+
+
+def write_field(path, name, values, write_format):
+    # Field file with the boundary conditions of the channel cases
+    class_name = 'volVectorField' if values.ndim == 2 else 'volScalarField'
+    value = 'uniform (0 0 0)' if values.ndim == 2 else 'uniform 0'
+    boundary = "".join(f"    {patch}\n    {{\n        type            {kind};{f' value {value};' if kind == 'fixedValue' else ''}\n    }}\n"
+                       for patch, kind in [('inlet', 'fixedValue'), ('outlet', 'zeroGradient'), ('outerwall', 'zeroGradient'),
+                                           ('longitudinal_symmetry', 'symmetryPlane'), ('lateral_sides', 'empty')])
+    with open(path, 'wb') as f:
+        f.write(foamFieldIO.foam_header(class_name, name, write_format, location="0").encode())
+        f.write(b"dimensions      [0 0 0 0 0 0 0];\n\ninternalField   nonuniform ")
+        f.write(foamFieldIO.format_list(values, write_format))
+        f.write(f";\n\nboundaryField\n{{\n{boundary}}}\n".encode())
+        f.write(foamFieldIO.foam_footer.encode())
+
+
+class SyntheticCase:
+    """
+    Case directory with the files of an outer run for about n_cells cells: channel CSV, Gmsh script,
+    transfinite polyMesh and the fields p, T, Ma, U, mdot_a and mdot_s in 0/.
+    """
+    def __init__(self, working_dir, n_cells, write_format='ascii', seed=0):
+        self.case_dir = os.path.join(working_dir, f"case_{n_cells}")
+        self.write_format = write_format
+        self.horizontal_divisions = int(round(np.sqrt(n_cells * aspect_ratio)))
+        self.vertical_divisions = max(int(round(n_cells / self.horizontal_divisions)), 2) + 1
+        os.makedirs(os.path.join(self.case_dir, "0"))
+        os.makedirs(os.path.join(self.case_dir, "constant", "polyMesh"))
+
+        # One CSV point per mesh column, like channel_data.csv of the cases
+        x, y = channel_points(self.horizontal_divisions + 1)
+        self.csv_file = os.path.join(self.case_dir, "channel_data.csv")
+        np.savetxt(self.csv_file, np.column_stack((x, y)), delimiter=',')
+
+        self.geo_name = os.path.join(self.case_dir, "channel")
+        self.gmsh_points = self.create_geo()
+        boundaries = createGmshGeoFile.find_section_boundaries(self.gmsh_points)
+        gradings = createGmshGeoFile.section_gradings(boundaries, self.horizontal_divisions, 1.0, 1.0)
+        self.polyMesh_dir = os.path.join(self.case_dir, "constant", "polyMesh")
+        createPolyMesh.create(self.gmsh_points, boundaries, gradings, self.vertical_divisions, 1.0, self.polyMesh_dir, write_format)
+
+        self.geometry = meshGeometry.MeshGeometry(self.polyMesh_dir)
+        self.n_cells = self.geometry.n_cells
+        self.wall = self.geometry.wall()
+
+        rng = np.random.default_rng(seed)
+        for name, scale in [('p', 611.0), ('T', 273.0), ('Ma', 1.0), ('mdot_a', 1e-3), ('mdot_s', -1e-4)]:
+            write_field(self.path("0", name), name, scale * (1 + 0.1 * rng.random(self.n_cells)), write_format)
+        write_field(self.path("0", "U"), "U", 500 * rng.random((self.n_cells, 3)), write_format)
+
+    def path(self, *names):
+        return os.path.join(self.case_dir, *names)
+
+    def create_geo(self):
+        return createGmshGeoFile.create(self.csv_file, self.geo_name, self.vertical_divisions, self.horizontal_divisions, 1.0, 1.0, 1.0)
+
+
+def benchmarks(case):
+    """
+    (name, function, setup) of every hot path for the synthetic case. Functions that work on relative
+    paths run in the case directory, setup runs before every repeat and is not timed.
+    """
+    wall = case.wall
+    wall_coordinates, _, wall_cells = readWallFields.get_wall_cells(case.geometry)
+    cell_centres_x = case.geometry.cell_centres[:,0]
+    p = foamFieldIO.read_internal_field(case.path("0", "p"))
+    U = np.linalg.norm(foamFieldIO.read_internal_field(case.path("0", "U")), axis=1)
+    R_wall = 1e-4 * np.ones(len(case.gmsh_points))
+
+    def clear_walls():
+        case.geometry.walls.clear()
+
+    return [
+        ('foamFieldIO.read_internal_field scalar', lambda: foamFieldIO.read_internal_field(case.path("0", "p")), None),
+        ('foamFieldIO.read_internal_field vector', lambda: foamFieldIO.read_internal_field(case.path("0", "U")), None),
+        ('readWallFields.read_static_field', lambda: readWallFields.read_static_field(case.path("0", "T"), wall_cells), None),
+        ('readWallFields.read_vector_field', lambda: readWallFields.read_vector_field(case.path("0", "U"), wall_cells), None),
+        ('readWallFields.read_wall_mass_flux', lambda: readWallFields.read_wall_mass_flux(case.path("0", "mdot_a"), wall), None),
+        ('readWallFields.get_wall_cells', lambda: readWallFields.get_wall_cells(case.geometry), clear_walls),
+        ('monitorSimulation.calculate_rms_scalar_field', lambda: monitorSimulation.calculate_rms_scalar_field(case.path("0", "p")), None),
+        ('monitorSimulation.calculate_rms_vector_field', lambda: monitorSimulation.calculate_rms_vector_field(case.path("0", "U")), None),
+        ('monitorSimulation.calculate_sum_of_squares', lambda: monitorSimulation.calculate_sum_of_squares(case.path("0", "U")), None),
+        ('editInitialCondition.edit scalar', lambda: editInitialCondition.edit('p', p), None),
+        ('editInitialCondition.edit vector', lambda: editInitialCondition.edit('U', U), None),
+        ('setWallInteractionTerms.initialise', lambda: setWallInteractionTerms.initialise('mdot_init', case.n_cells, case.write_format), None),
+        ('setWallInteractionTerms.update', lambda: setWallInteractionTerms.update('mdot_a', wall_cells, np.zeros(len(wall_cells))), None),
+        ('quasi1DIsentropic.compute_flow_variables', lambda: quasi1DIsentropic.compute_flow_variables(wall_coordinates[:,0], wall_coordinates[:,1], cell_centres_x), None),
+        ('createGmshGeoFile.create', case.create_geo, None),
+        ('updateGeometry.update', lambda: updateGeometry.update(case.geo_name, R_wall, len(case.gmsh_points)), case.create_geo),
+        ('meshGeometry.MeshGeometry', lambda: meshGeometry.MeshGeometry(case.polyMesh_dir), None),
+        ('meshGeometry.write_cell_centres', lambda: meshGeometry.write_cell_centres(case.geometry, case.path("0", "C"), case.write_format), None),
+    ]
+
+
+def time_function(function, setup=None, repeats=5, max_seconds=10.0):
+    # Wall times of up to repeats calls, fewer once max_seconds have been spent
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats and (not times or time.perf_counter() - start < max_seconds):
+        if setup is not None:
+            setup()
+        t = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repository, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, write_format='ascii', repeats=5, max_seconds=10.0, selection=None):
+    working_dir = tempfile.mkdtemp(prefix="benchmarkSuite_")
+    cwd = os.getcwd()
+    results = []
+    try:
+        for n_cells in sizes:
+            t = time.perf_counter()
+            case = SyntheticCase(working_dir, n_cells, write_format)
+            print(f"\n{case.n_cells} cells ({case.horizontal_divisions} x {case.vertical_divisions - 1}, {write_format}), synthesised in {time.perf_counter() - t:.1f} s", flush=True)
+
+            os.chdir(case.case_dir)
+            try:
+                for name, function, setup in benchmarks(case):
+                    if selection and not any(s in name for s in selection):
+                        continue
+                    times = time_function(function, setup, repeats, max_seconds)
+                    results.append({'benchmark': name, 'cells': case.n_cells, 'requested_cells': n_cells,
+                                    'min': min(times), 'median': float(np.median(times)), 'repeats': len(times)})
+                    print(f"  {name:48s} {min(times) * 1e3:12.2f} ms", flush=True)
+            finally:
+                os.chdir(cwd)
+            shutil.rmtree(case.case_dir)
+    finally:
+        shutil.rmtree(working_dir, ignore_errors=True)
+
+    return {
+        'commit': git_commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'write_format': write_format,
+        'results': results,
+    }
+
+
+def compare(previous, current):
+    """
+    Print the ratio of the current to the previous minimum time of every benchmark and size both
+    contain, and return the benchmarks slower than regression_threshold.
+    """
+    before = {(r['benchmark'], r['requested_cells']): r['min'] for r in previous['results']}
+    regressions = []
+    print(f"\nCompared with {previous.get('commit')} ({previous.get('date')}):")
+    if previous.get('write_format') != current['write_format']:
+        print(f"  Warning: the fields were written in {previous.get('write_format')} before and in {current['write_format']} now", flush=True)
+    for result in current['results']:
+        key = (result['benchmark'], result['requested_cells'])
+        if key not in before:
+            continue
+        ratio = result['min'] / before[key]
+        flag = '  REGRESSION' if ratio > regression_threshold else ''
+        print(f"  {result['benchmark']:48s} {result['cells']:>10} cells {ratio:8.2f}x{flag}")
+        if flag:
+            regressions.append(result['benchmark'])
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the Python hot paths of src/ on synthetic cases, without OpenFOAM.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e4, 1e5, 1e6], help="cell counts (default: 1e4 1e5 1e6, up to 1e7)")
+    parser.add_argument("--write-format", choices=['ascii', 'binary'], default='ascii')
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget per benchmark and size before fewer repeats are made")
+    parser.add_argument("--select", nargs="+", help="only run benchmarks whose name contains one of these strings")
+    parser.add_argument("--output", default="benchmarkSuite.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="JSON results of an earlier run, e.g. of another commit")
+    arguments = parser.parse_args()
+
+    report = run([int(n) for n in arguments.sizes], arguments.write_format, arguments.repeats, arguments.max_seconds, arguments.select)
+    with open(arguments.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {arguments.output}")
+
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            regressions = compare(json.load(f), report)
+        sys.exit(1 if regressions else 0)
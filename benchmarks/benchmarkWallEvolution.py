@@ -0,0 +1,89 @@
+import os
+import sys
+import numpy as np
+from scipy.integrate import solve_ivp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import wallEvolution
+
+# Settings of cases/wall_interactions/wall_accretion
+threshold_percentage = 0.05
+dt_max = 3600
+dt_min = 1e-4
+safety_factor = 0.2
+
+
+def channel(n_cells=300):
+    # Wall cell heights of a converging-diverging channel with its throat at 40 % of the length
+    x = np.linspace(0, 1.5, n_cells)
+    height = 0.05 + 0.02 * (1 - np.cos(2 * np.pi * np.clip((x / 1.5 - 0.4) / 1.2 + 0.5, 0, 1))) / 2
+    return x, height
+
+
+def accretion_rate(x, height, scale=2e-6):
+    # Stand-in for one steady CFD run: accretion grows slowly as the channel narrows and is strongest near the throat
+    return scale * 0.07 / (height + 0.02) * (1 + 0.5 * np.exp(-((x - 0.6) / 0.2) ** 2))
+
+
+def reference(x, height):
+    # Closure time of dh/dt = -rate(h) integrated with a tight tolerance
+    closes = lambda t, h: np.min(h)
+    closes.terminal = True
+    solution = solve_ivp(lambda t, h: -accretion_rate(x, h), (0, 1e9), height, events=closes, rtol=1e-10, atol=1e-14)
+    return solution.t_events[0][0]
+
+
+def threshold(x, height):
+    # Legacy integrator of runSimulation.py: rate frozen per run until a cell moved by threshold_percentage
+    height = height.copy()
+    time = 0.0
+    runs = 0
+    while True:
+        runs += 1
+        rates = accretion_rate(x, height)
+        R_wall_threshold = threshold_percentage * height
+        dRw_total = np.zeros(len(rates))
+        while np.all(dRw_total < R_wall_threshold):
+            max_delta = np.max(np.abs(R_wall_threshold - dRw_total))
+            dt = np.clip(safety_factor * max_delta / np.max(np.abs(rates)), dt_min, dt_max)
+            dRw_total += rates * dt
+            time += dt
+            height -= rates * dt
+            if np.any(height <= 0):
+                return time, runs
+
+
+def predictor_corrector(x, height, tolerance):
+    height = height.copy()
+    time = 0.0
+    runs = 0
+    evolution = wallEvolution.WallEvolution(tolerance=tolerance, first_step_fraction=threshold_percentage)
+    while True:
+        runs += 1
+        evolution.add_rates(time, x, accretion_rate(x, height))
+        dt, displacement, closed = evolution.next_step(height)
+        time += dt
+        height -= displacement
+        if closed:
+            return time, runs
+
+
+def run(tolerances=(1e-2, 1e-3, 1e-4)):
+    x, height = channel()
+    closure = reference(x, height)
+    print(f"Reference closure time: {closure:.1f} s")
+    print(f"{'integrator':>28s} {'CFD runs':>9s} {'closure time':>13s} {'error':>9s}")
+
+    results = {'threshold': threshold(x, height)}
+    for tolerance in tolerances:
+        results[f'predictor-corrector {tolerance:g}'] = predictor_corrector(x, height, tolerance)
+
+    for name, (time, runs) in results.items():
+        print(f"{name:>28s} {runs:9d} {time:11.1f} s {100 * (time - closure) / closure:8.2f}%")
+
+    return closure, results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,601 @@
+"""
+Stand-ins for the Gmsh and OpenFOAM executables called by runSimulation.py, to run, benchmark and
+profile the driver end to end on a machine without Gmsh and OpenFOAM. Every tool is started through
+the executable of the same name in this directory, so putting the directory first on PATH is enough.
+The tools read and write the files of the real ones in the same layout:
+
+- gmsh -3 <name>.geo -o <name>.msh: transfinite hex mesh of the Gmsh script as MSH 2.2 file, built with
+  createPolyMesh, so it cannot be used to compare the native mesh generator with Gmsh
+- gmshToFoam <name>.msh: constant/polyMesh from the hexahedra and the physical surfaces of the MSH file
+- checkMesh: mesh statistics of constant/polyMesh
+- postProcess -func writeCellCentres: cell centres in 0/C
+- decomposePar: processor*/0 and processor*/constant/polyMesh/cellProcAddressing, with the simple,
+  hierarchical or (estimated) scotch decomposition of system/decomposeParDict
+- mpirun [options] <command>: runs the command once, the solver writes all processor directories itself
+- rhoCentralFoam_2ph [-parallel]: a time directory every writeInterval whose fields relax exponentially
+  from the initial conditions to a steady state, nonzero mdot_a and mdot_s in the wall cells, a solver
+  log with Courant numbers, deltaT, residuals and execution time, and the rmsMonitor function object
+  output if controlDict has it. endTime and stopAt (writeNow) of controlDict are followed while running.
+- reconstructPar [-time <time> | -latestTime]: reconstructed fields of processor* in the case directory
+- foamListTimes [-latestTime] [-processor] [-withZero]
+
+The meshes, fields and logs have the right shape, but no flow is solved. Environment settings:
+
+- MOCKFOAM_WRITE_SECONDS: wall time the solver takes per writeInterval (default 0.2)
+- MOCKFOAM_STEPS_PER_WRITE: solver time steps per writeInterval (default 10)
+- MOCKFOAM_CONVERGENCE_WRITES: writeIntervals over which the fields relax by a factor e (default 3)
+- MOCKFOAM_TOOL_SECONDS: extra wall time of every other tool, e.g. for start-up (default 0)
+- MOCKFOAM_MDOT_A, MOCKFOAM_MDOT_S: mass fluxes onto the wall of the wall cells at the wall pressure and
+  temperature maximum [kg/m^2/s] (default 1e-3 and -2e-4)
+- MOCKFOAM_LOG: file to which every call is appended as JSON line with tool, arguments, start and end
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+
+import createPolyMesh
+import decompositionPlanner
+import foamFieldIO
+import meshGeometry
+import monitorSimulation
+import polyMesh
+
+write_seconds = float(os.environ.get("MOCKFOAM_WRITE_SECONDS", 0.2))
+steps_per_write = int(os.environ.get("MOCKFOAM_STEPS_PER_WRITE", 10))
+convergence_writes = float(os.environ.get("MOCKFOAM_CONVERGENCE_WRITES", 3))
+tool_seconds = float(os.environ.get("MOCKFOAM_TOOL_SECONDS", 0))
+mdot_a_rate = float(os.environ.get("MOCKFOAM_MDOT_A", 1e-3))
+mdot_s_rate = float(os.environ.get("MOCKFOAM_MDOT_S", -2e-4))
+call_log = os.environ.get("MOCKFOAM_LOG")
+
+control_dict_path = "system/controlDict"
+decompose_par_dict_path = "system/decomposeParDict"
+
+# Relative change of the fields from the initial conditions to the steady state
+relaxation_amplitude = 0.05
+
+# Steady state of fields whose initial condition is zero everywhere
+steady_values = {'J': 1e20, 'N': 1e14, 'S_sat': 1.5, 'Y': 1e-3}
+
+# Variables with a residual in the solver log, rhoCentralFoam solves the others explicitly
+residual_variables = ['Ux', 'Uy', 'e', 'J', 'N', 'Y']
+
+# Outward faces of a Gmsh hexahedron (nodes 0-3 at the bottom, 4-7 above them)
+hex_faces = np.array([[0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4], [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]])
+msh_quad = 3
+msh_hexahedron = 5
+
+
+class FatalError(Exception):
+    pass
+
+
+# ---------- FILES ----------
+def read_dict_entry(path, keyword, default=None):
+    with open(path, "r") as f:
+        match = re.search(rf'^\s*{keyword}\s+([^;]+);', f.read(), re.MULTILINE)
+    return match.group(1).strip() if match else default
+
+
+def write_format():
+    return read_dict_entry(control_dict_path, "writeFormat", "ascii")
+
+
+def time_name(value):
+    # timeFormat general with timePrecision digits, like the solver names its time directories
+    precision = int(read_dict_entry(control_dict_path, "timePrecision", 6))
+    return f"{value:.{precision}g}"
+
+
+def list_times(path='.', with_zero=False):
+    names = [d for d in os.listdir(path) if d != 'constant' and os.path.isdir(os.path.join(path, d))
+             and (with_zero or d != '0')]
+    times = []
+    for name in names:
+        try:
+            times.append((float(name), name))
+        except ValueError:
+            continue
+    return [name for _, name in sorted(times)]
+
+
+def processor_dirs():
+    dirs = [d for d in os.listdir('.') if d.startswith('processor') and d[len('processor'):].isdigit()]
+    return sorted(dirs, key=lambda d: int(d[len('processor'):]))
+
+
+def field_files(time_dir):
+    # Files of time_dir with an internalField, except the cell centres, which describe the mesh
+    names = []
+    for name in sorted(os.listdir(time_dir)):
+        path = os.path.join(time_dir, name)
+        if name in meshGeometry.cell_centre_fields or not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            if b'internalField' in f.read():
+                names.append(name)
+    return names
+
+
+def is_uniform(content):
+    return re.search(rb'\binternalField\s+uniform\b', content) is not None
+
+
+def set_location(content, location):
+    return re.sub(rb'(\blocation\s+)"[^"]*"', lambda m: m.group(1) + f'"{location}"'.encode(), content, count=1)
+
+
+def write_field(path, template, values, location, write_format):
+    content = foamFieldIO.replace_internal_field(template, values, write_format)
+    with open(path, 'wb') as f:
+        f.write(set_location(content, location))
+
+
+def cell_addressing(processor_dir):
+    return polyMesh.read_labels("cellProcAddressing", os.path.join(processor_dir, "constant", "polyMesh"))
+
+
+def write_cell_addressing(processor_dir, cells):
+    polyMesh_dir = os.path.join(processor_dir, "constant", "polyMesh")
+    os.makedirs(polyMesh_dir, exist_ok=True)
+    with open(os.path.join(polyMesh_dir, "cellProcAddressing"), 'w') as f:
+        f.write(foamFieldIO.foam_header("labelList", "cellProcAddressing", 'ascii', f"{processor_dir}/constant/polyMesh"))
+        f.write(f"{len(cells)}\n(\n" + "\n".join(map(str, cells.tolist())) + "\n)")
+        f.write(foamFieldIO.foam_footer)
+
+
+# ---------- GMSH ----------
+def read_geo(geo_file):
+    """
+    Wall points, section boundaries, horizontal gradings, vertical divisions and vertical progression
+    of a Gmsh script of createGmshGeoFile, and the names of its physical groups.
+    """
+    points, splines, curves, physical = {}, [], {}, []
+    with open(geo_file) as f:
+        for line in f:
+            point = re.match(r'Point\((\d+)\) = \{([^}]*)\}', line)
+            spline = re.match(r'Spline\((\d+)\) = \{([^}]*)\}', line)
+            curve = re.match(r'Transfinite Curve \{(\d+)\} = (\d+) Using (\w+) (\S+);', line)
+            group = re.match(r'Physical (Surface|Volume)\("(\w+)"\)', line)
+            if point:
+                points[int(point.group(1))] = [float(v) for v in point.group(2).split(',')[:2]]
+            elif spline:
+                splines.append([int(v) for v in spline.group(2).split(',')])
+            elif curve:
+                curves[int(curve.group(1))] = (int(curve.group(2)), curve.group(3), float(curve.group(4)))
+            elif group:
+                physical.append((3 if group.group(1) == 'Volume' else 2, group.group(2)))
+
+    # Wall points come first, followed by one symmetry point per section boundary
+    n_sections = len(splines)
+    wall_points = np.array([points[i] for i in range(1, len(points) - n_sections)])
+    section_boundaries = [spline[0] - 1 for spline in splines] + [splines[-1][-1] - 1]
+    gradings = [curves[i + 1] for i in range(n_sections)]
+    vertical_divisions, _, progression_vertical = curves[n_sections + 1]
+
+    return wall_points, section_boundaries, gradings, vertical_divisions, progression_vertical, physical
+
+
+def gmsh(argv):
+    geo_file = next(arg for arg in argv if arg.endswith('.geo'))
+    msh_file = argv[argv.index('-o') + 1] if '-o' in argv else geo_file[:-len('.geo')] + '.msh'
+
+    wall_points, section_boundaries, gradings, vertical_divisions, progression_vertical, physical = read_geo(geo_file)
+    nodes = createPolyMesh.block_points(wall_points, section_boundaries, gradings, vertical_divisions, progression_vertical)
+    points, faces, _, _, patches = createPolyMesh.build_mesh(nodes)
+
+    # Hexahedra of the extruded quadrangles, cell (i, j) as in createPolyMesh.build_mesh
+    n_columns, n_rows = nodes.shape[:2]
+    node = np.arange(n_columns * n_rows).reshape(n_columns, n_rows)
+    bottom = np.column_stack((node[:-1, :-1].ravel(), node[1:, :-1].ravel(), node[1:, 1:].ravel(), node[:-1, 1:].ravel()))
+    hexahedra = np.hstack((bottom, bottom + n_columns * n_rows))
+
+    tags = {name: i + 1 for i, (_, name) in enumerate(sorted(physical, key=lambda p: -p[0]))}
+    blocks = [(msh_quad, tags[name], faces[start:start + n]) for name, (start, n) in patches.items()]
+    blocks.append((msh_hexahedron, tags['fluid'], hexahedra))
+
+    print(f"Info    : Meshing 3D... {len(hexahedra)} hexahedra, {len(points)} nodes", flush=True)
+    with open(msh_file, 'w') as f:
+        f.write("$MeshFormat\n2.2 0 8\n$EndMeshFormat\n$PhysicalNames\n")
+        f.write(f"{len(tags)}\n" + "".join(f'{dim} {tags[name]} "{name}"\n' for dim, name in sorted(physical, key=lambda p: tags[p[1]])))
+        f.write(f"$EndPhysicalNames\n$Nodes\n{len(points)}\n")
+        np.savetxt(f, np.column_stack((np.arange(1, len(points) + 1), points)), fmt=['%d', '%.17g', '%.17g', '%.17g'])
+        f.write(f"$EndNodes\n$Elements\n{sum(len(b[2]) for b in blocks)}\n")
+        first = 1
+        for element_type, tag, element_nodes in blocks:
+            n = len(element_nodes)
+            rows = np.column_stack((np.arange(first, first + n), np.full(n, element_type), np.full(n, 2), np.full(n, tag), np.full(n, tag), element_nodes + 1))
+            np.savetxt(f, rows, fmt='%d')
+            first += n
+        f.write("$EndElements\n")
+    print(f"Info    : Done writing '{msh_file}'", flush=True)
+
+
+def read_msh(msh_file):
+    # Physical names, node coordinates and the elements of every type of an MSH 2.2 file
+    with open(msh_file) as f:
+        lines = f.read().split('\n')
+
+    names = {}
+    start = lines.index('$PhysicalNames')
+    for line in lines[start + 2:start + 2 + int(lines[start + 1])]:
+        dim, tag, name = line.split(maxsplit=2)
+        names[int(tag)] = name.strip('"')
+
+    start = lines.index('$Nodes')
+    n_nodes = int(lines[start + 1])
+    nodes = np.array(' '.join(lines[start + 2:start + 2 + n_nodes]).split(), dtype=np.float64).reshape(n_nodes, 4)
+    node_index = np.zeros(int(nodes[:, 0].max()) + 1, dtype=np.int64)
+    node_index[nodes[:, 0].astype(np.int64)] = np.arange(n_nodes)
+
+    start = lines.index('$Elements')
+    elements = {}
+    for line in lines[start + 2:start + 2 + int(lines[start + 1])]:
+        values = line.split()
+        n_tags = int(values[2])
+        elements.setdefault(int(values[1]), []).append([int(values[3])] + [int(v) for v in values[3 + n_tags:]])
+
+    elements = {element_type: np.array(rows) for element_type, rows in elements.items()}
+    for rows in elements.values():
+        rows[:, 1:] = node_index[rows[:, 1:]]
+    return names, nodes[:, 1:], elements
+
+
+def gmshToFoam(argv):
+    """
+    Convert the hexahedra of an MSH file into a polyMesh: faces shared by two cells become internal
+    faces, ordered by owner and neighbour and pointing from owner to neighbour, the others are sorted
+    into the patches of their physical surface. The patch types are those of createPolyMesh, i.e. as
+    after editBoundaryFile.
+    """
+    msh_file = next(arg for arg in argv if arg.endswith('.msh'))
+    names, points, elements = read_msh(msh_file)
+    hexahedra = elements[msh_hexahedron][:, 1:]
+    quads = elements[msh_quad]
+
+    faces = hexahedra[:, hex_faces].reshape(-1, 4)
+    cells = np.repeat(np.arange(len(hexahedra)), 6)
+    _, face_ids, counts = np.unique(np.sort(faces, axis=1), axis=0, return_inverse=True, return_counts=True)
+    order = np.argsort(face_ids, kind='stable')
+    shared = counts[face_ids[order]] == 2
+
+    # The first of the two faces belongs to the cell with the lower index, the owner
+    pairs = order[shared].reshape(-1, 2)
+    owner, neighbour = cells[pairs[:, 0]], cells[pairs[:, 1]]
+    internal = np.lexsort((neighbour, owner))
+    internal_faces, owner, neighbour = faces[pairs[internal, 0]], owner[internal], neighbour[internal]
+
+    boundary_faces = order[~shared]
+    _, ids = np.unique(np.sort(np.vstack((faces[boundary_faces], quads[:, 1:])), axis=1), axis=0, return_inverse=True)
+    lookup = np.full(ids.max() + 1, -1)
+    lookup[ids[len(boundary_faces):]] = quads[:, 0]
+    boundary_tags = lookup[ids[:len(boundary_faces)]]
+    if np.any(boundary_tags < 0):
+        raise FatalError(f"{np.count_nonzero(boundary_tags < 0)} boundary faces are not on a physical surface.")
+
+    all_faces, all_owner, patches = [internal_faces], [owner], {}
+    n_faces = len(internal_faces)
+    for name in createPolyMesh.patch_types:
+        tag = next(tag for tag, physical_name in names.items() if physical_name == name)
+        patch_faces = boundary_faces[boundary_tags == tag]
+        patches[name] = (n_faces, len(patch_faces))
+        all_faces.append(faces[patch_faces])
+        all_owner.append(cells[patch_faces])
+        n_faces += len(patch_faces)
+
+    createPolyMesh.write_polyMesh(points, np.concatenate(all_faces), np.concatenate(all_owner), neighbour, patches, write_format=write_format())
+    print(f"Cells: {len(hexahedra)}  Faces: {n_faces}  Internal faces: {len(internal_faces)}", flush=True)
+
+
+# ---------- MESH UTILITIES ----------
+def checkMesh(argv):
+    geometry = meshGeometry.MeshGeometry()
+    print("Mesh stats", flush=True)
+    print(f"    points:           {len(geometry.points)}", flush=True)
+    print(f"    faces:            {len(geometry.faces)}", flush=True)
+    print(f"    internal faces:   {geometry.n_internal_faces}", flush=True)
+    print(f"    cells:            {geometry.n_cells}", flush=True)
+    print(f"    boundary patches: {len(geometry.boundary)}", flush=True)
+    print(f"\nMin volume = {geometry.cell_volumes.min():.6g}. Max volume = {geometry.cell_volumes.max():.6g}.", flush=True)
+    if np.any(geometry.cell_volumes <= 0):
+        print(f"***Zero or negative cell volume detected. Number of cells: {np.count_nonzero(geometry.cell_volumes <= 0)}", flush=True)
+        print("\nFailed 1 mesh checks.\n", flush=True)
+    else:
+        print("\nMesh OK.\n", flush=True)
+
+
+def postProcess(argv):
+    function = argv[argv.index('-func') + 1] if '-func' in argv else None
+    if function != 'writeCellCentres':
+        raise FatalError(f"Unknown function {function}, only writeCellCentres is available.")
+    meshGeometry.write_cell_centres(meshGeometry.MeshGeometry(), write_format=write_format())
+
+
+def decomposition_split(method, n):
+    with open(decompose_par_dict_path) as f:
+        match = re.search(rf'^{method}Coeffs\s*\{{[^}}]*?\bn\s+\(\s*(\d+)\s+(\d+)\s+(\d+)\s*\)', f.read(), re.MULTILINE)
+    split = tuple(int(v) for v in match.groups()) if match else (n, 1, 1)
+    if np.prod(split) != n:
+        raise FatalError(f"Wrong number of processor divisions in {method}Coeffs {split} for {n} subdomains.")
+    return split
+
+
+def decomposePar(argv):
+    n = int(read_dict_entry(decompose_par_dict_path, "numberOfSubdomains"))
+    method = read_dict_entry(decompose_par_dict_path, "method")
+    geometry = meshGeometry.MeshGeometry()
+
+    if method in ('simple', 'hierarchical'):
+        split = decomposition_split(method, n)
+        function = decompositionPlanner.simple if method == 'simple' else decompositionPlanner.hierarchical
+        parts = function(geometry.cell_centres, split[:2])
+    else:
+        parts = decompositionPlanner.recursive_bisection(geometry, n)
+
+    time_format = write_format()
+    templates = {name: foamFieldIO.read_file(os.path.join("0", name)) for name in field_files("0")}
+    for i in range(n):
+        processor_dir = f"processor{i}"
+        cells = np.flatnonzero(parts == i)
+        os.makedirs(os.path.join(processor_dir, "0"), exist_ok=True)
+        write_cell_addressing(processor_dir, cells)
+
+        for name, content in templates.items():
+            path = os.path.join(processor_dir, "0", name)
+            if is_uniform(content):
+                with open(path, 'wb') as f:
+                    f.write(content)
+            else:
+                values = foamFieldIO.read_internal_field(None, geometry.n_cells, content)
+                write_field(path, content, values[cells], "0", time_format)
+
+        print(f"Processor {i}\n    Number of cells = {len(cells)}", flush=True)
+    print(f"\nNumber of processor faces = {decompositionPlanner.processor_faces(parts, geometry) * 2}", flush=True)
+
+
+def reconstructPar(argv):
+    processors = processor_dirs()
+    if not processors:
+        raise FatalError("No processor directories found.")
+    if '-time' in argv:
+        times = [argv[argv.index('-time') + 1]]
+    elif '-latestTime' in argv:
+        times = list_times(processors[0])[-1:]
+    else:
+        times = list_times(processors[0])
+
+    addressing = [cell_addressing(d) for d in processors]
+    n_cells = sum(len(cells) for cells in addressing)
+    for time_dir in times:
+        print(f"Time = {time_dir}", flush=True)
+        os.makedirs(time_dir, exist_ok=True)
+        for name in field_files(os.path.join(processors[0], time_dir)):
+            contents = [foamFieldIO.read_file(os.path.join(d, time_dir, name)) for d in processors]
+            values = None
+            for cells, content in zip(addressing, contents):
+                processor_values = foamFieldIO.read_internal_field(None, len(cells), content)
+                if values is None:
+                    values = np.zeros((n_cells,) + processor_values.shape[1:])
+                values[cells] = processor_values
+            template = foamFieldIO.read_file(os.path.join("0", name)) if os.path.exists(os.path.join("0", name)) else contents[0]
+            write_field(os.path.join(time_dir, name), template, values, time_dir, foamFieldIO.read_format(contents[0]))
+            print(f"    Reconstructing {name}", flush=True)
+
+        uniform_dir = os.path.join(processors[0], time_dir, "uniform")
+        if os.path.isdir(uniform_dir):
+            shutil.copytree(uniform_dir, os.path.join(time_dir, "uniform"), dirs_exist_ok=True)
+
+
+def foamListTimes(argv):
+    path = processor_dirs()[0] if '-processor' in argv and processor_dirs() else '.'
+    times = list_times(path, with_zero='-withZero' in argv)
+    if '-latestTime' in argv:
+        times = times[-1:]
+    for name in times:
+        print(name, flush=True)
+
+
+def mpirun(argv):
+    # Skip the options of mpirun, the ranks are simulated by the solver itself
+    options_with_value = ['-np', '-n', '-c', '--cpu-set', '--bind-to', '--map-by', '--rank-by', '-x', '-H', '--host', '--hostfile']
+    i = 0
+    while i < len(argv) and argv[i].startswith('-'):
+        i += 2 if argv[i] in options_with_value else 1
+    if i == len(argv):
+        raise FatalError("No command given to mpirun.")
+    os.execvp(argv[i], argv[i:])
+
+
+# ---------- SOLVER ----------
+class MockSolver:
+    """
+    Fields of all cells relaxing exponentially from the fields of the start time to a steady state:
+    the initial conditions in 0 changed by relaxation_amplitude, or steady_values for fields that
+    start at zero. The wall source terms follow from the pressure and temperature of the wall cells.
+    """
+    def __init__(self, parallel):
+        self.processors = processor_dirs() if parallel else ['.']
+        if not self.processors:
+            raise FatalError("Cannot run in parallel without processor directories, run decomposePar first.")
+
+        geometry = meshGeometry.MeshGeometry()
+        self.n_cells = geometry.n_cells
+        self.wall_cells = geometry.wall().cells
+        self.addressing = [cell_addressing(d) for d in self.processors] if parallel else [np.arange(self.n_cells)]
+
+        if read_dict_entry(control_dict_path, "startFrom", "latestTime") == 'latestTime':
+            times = list_times(self.processors[0], with_zero=True)
+            self.start_name = times[-1] if times else '0'
+        else:
+            self.start_name = read_dict_entry(control_dict_path, "startTime", "0")
+        self.start_time = float(self.start_name)
+
+        # Every processor keeps the boundary conditions of its own initial fields
+        self.names = field_files(os.path.join(self.processors[0], "0"))
+        self.templates = [{name: foamFieldIO.read_file(os.path.join(d, "0", name)) for name in self.names} for d in self.processors]
+
+        self.start = {}
+        self.target = {}
+        for name in self.names:
+            initial = self.read(name, "0")
+            self.start[name] = initial if self.start_name == '0' else self.read(name, self.start_name)
+            if name in ('mdot_a', 'mdot_s'):
+                continue
+            if not np.any(initial) and name in steady_values:
+                self.target[name] = np.full_like(initial, steady_values[name])
+            else:
+                self.target[name] = initial * (1 + relaxation_amplitude)
+
+    def read(self, name, time_dir):
+        values = None
+        for d, cells in zip(self.processors, self.addressing):
+            processor_values = foamFieldIO.read_internal_field(os.path.join(d, time_dir, name), len(cells))
+            if values is None:
+                values = np.zeros((self.n_cells,) + processor_values.shape[1:])
+            values[cells] = processor_values
+        return values
+
+    def relaxation(self, t):
+        return np.exp(-(t - self.start_time) / (convergence_writes * self.write_interval))
+
+    def fields(self, t):
+        decay = self.relaxation(t)
+        fields = {name: self.target[name] + (self.start[name] - self.target[name]) * decay for name in self.target}
+
+        # Accretion grows with the pressure, sublimation with the temperature of the wall cells
+        for name, rate, driver in [('mdot_a', mdot_a_rate, 'p'), ('mdot_s', mdot_s_rate, 'T')]:
+            if name in self.names:
+                values = np.zeros(self.n_cells)
+                if driver in fields:
+                    wall_values = fields[driver][self.wall_cells]
+                    values[self.wall_cells] = rate * wall_values / np.max(np.abs(wall_values))
+                fields[name] = values
+        return fields
+
+    def write(self, t, index, delta_t):
+        name = time_name(t)
+        time_format = write_format()
+        fields = self.fields(t)
+        for d, cells, templates in zip(self.processors, self.addressing, self.templates):
+            # Never recreates a processor directory the driver removed while the solver was stopping
+            time_dir = os.path.join(d, name)
+            try:
+                if not os.path.isdir(time_dir):
+                    os.mkdir(time_dir)
+                os.makedirs(os.path.join(time_dir, "uniform"), exist_ok=True)
+                for field, values in fields.items():
+                    write_field(os.path.join(time_dir, field), templates[field], values[cells], name, time_format)
+                with open(os.path.join(time_dir, "uniform", "time"), 'w') as f:
+                    f.write(foamFieldIO.foam_header("dictionary", "time", 'ascii', f"{name}/uniform"))
+                    f.write(f"value           {t:.15g};\n\nname            \"{name}\";\n\nindex           {index};\n\ndeltaT          {delta_t:.15g};\n\ndeltaT0         {delta_t:.15g};")
+                    f.write(foamFieldIO.foam_footer)
+            except (FileNotFoundError, FileExistsError) as error:
+                raise FatalError(f"Cannot write time {name}: {error}")
+
+    def function_object(self):
+        # (output file, fields, sample interval in time steps) of the rmsMonitor of monitorSimulation, if present
+        with open(control_dict_path) as f:
+            match = re.search(rf'\b{monitorSimulation.function_object_name}\s*\{{([^}}]*)\}}', f.read())
+        if match is None:
+            return None
+        fields = re.search(r'\bfields\s+\(([^)]*)\)', match.group(1)).group(1).split()
+        interval = int(re.search(r'\bwriteInterval\s+(\d+)', match.group(1)).group(1))
+        output_dir = os.path.join(monitorSimulation.function_object_dir, self.start_name)
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, "volFieldValue.dat")
+        with open(output_file, 'w') as f:
+            f.write("# Volume field value\n# Region type : all\n# Cells  : {}\n".format(self.n_cells))
+            f.write("# Time        \t" + "\t".join(f"average({field})" for field in fields) + "\n")
+        return output_file, fields, interval
+
+    def sample(self, output_file, fields, t):
+        values = self.fields(t)
+        columns = []
+        for field in fields:
+            field_values = values[field[len('magSqr_'):]]
+            squares = np.einsum('ij,ij->i', field_values, field_values) if field_values.ndim == 2 else field_values**2
+            columns.append(f"{np.mean(squares):.6e}")
+        with open(output_file, 'a') as f:
+            f.write(f"{t:.15g}\t" + "\t".join(columns) + "\n")
+
+    def run(self):
+        self.write_interval = float(read_dict_entry(control_dict_path, "writeInterval"))
+        delta_t = self.write_interval / steps_per_write
+        function_object = self.function_object()
+
+        print(f"Starting time loop at {self.start_name} with {len(self.processors)} processor(s), {self.n_cells} cells\n", flush=True)
+        clock = time.monotonic()
+        step = 0
+        t = self.start_time
+        while True:
+            # controlDict is re-read every time step (runTimeModifiable)
+            end_time = float(read_dict_entry(control_dict_path, "endTime"))
+            stop_at = read_dict_entry(control_dict_path, "stopAt", "endTime")
+            if stop_at == 'noWriteNow' or t >= end_time - 0.5 * delta_t:
+                break
+
+            step += 1
+            t = self.start_time + step * delta_t
+            residual = 1e-2 * self.relaxation(t)
+            lines = [f"Courant Number mean: {0.05 + residual:.6g} max: 0.25", f"deltaT = {delta_t:.6g}", f"Time = {time_name(t)}", "",
+                     "diagonal:  Solving for rho, Initial residual = 0, Final residual = 0, No Iterations 0"]
+            lines += [f"smoothSolver:  Solving for {variable}, Initial residual = {residual:.6g}, Final residual = {residual * 1e-3:.6g}, No Iterations 1"
+                      for variable in residual_variables]
+            lines += [f"ExecutionTime = {time.process_time():.2f} s  ClockTime = {int(time.monotonic() - clock)} s", ""]
+            print("\n".join(lines), flush=True)
+
+            if function_object is not None and step % function_object[2] == 0:
+                self.sample(function_object[0], function_object[1], t)
+
+            # writeNow writes the current time step and stops
+            if stop_at == 'writeNow' or step % steps_per_write == 0 or t >= end_time - 0.5 * delta_t:
+                self.write(t, step, delta_t)
+            if stop_at == 'writeNow':
+                break
+
+            # Pace the time steps to the configured write rate
+            time.sleep(max(0.0, clock + step * write_seconds / steps_per_write - time.monotonic()))
+
+        print("End\n", flush=True)
+
+
+def rhoCentralFoam_2ph(argv):
+    MockSolver('-parallel' in argv).run()
+
+
+tools = {
+    'gmsh': gmsh,
+    'gmshToFoam': gmshToFoam,
+    'checkMesh': checkMesh,
+    'postProcess': postProcess,
+    'decomposePar': decomposePar,
+    'mpirun': mpirun,
+    'rhoCentralFoam_2ph': rhoCentralFoam_2ph,
+    'reconstructPar': reconstructPar,
+    'foamListTimes': foamListTimes,
+}
+
+
+def main(tool, start=None):
+    # start: time the executable was started, so that the import of this module counts as well
+    start = start or time.time()
+    argv = sys.argv[1:]
+    status = 0
+    try:
+        if tool != 'rhoCentralFoam_2ph' and tool_seconds > 0:
+            time.sleep(tool_seconds)
+        tools[tool](argv)
+    except FatalError as error:
+        print(f"\n--> FOAM FATAL ERROR: {error}\n", file=sys.stderr, flush=True)
+        status = 1
+    finally:
+        if call_log is not None:
+            with open(call_log, 'a') as f:
+                f.write(json.dumps({'tool': tool, 'argv': argv, 'cwd': os.getcwd(), 'start': start, 'end': time.time(), 'status': status}) + "\n")
+    sys.exit(status)
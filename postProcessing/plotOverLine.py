@@ -1,9 +1,18 @@
-import pyvista as pv
+import os
+import sys
 import numpy as np
 import matplotlib
 matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
-import os
+
+try:
+    import pyvista as pv
+except ImportError:  # only needed for runs saved as case directories
+    pv = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import runContainer
 
 def get_time_step_folders(simulation_results_path):
     folders = []
@@ -20,6 +29,11 @@ def get_latest_time_for_folders(simulation_results_path, all_time_folders):
     latest_times = {}
     for folder in all_time_folders:
         case_folder = os.path.join(simulation_results_path, folder)
+        container_file = os.path.join(case_folder, runContainer.container_name)
+        if os.path.isfile(container_file):
+            with runContainer.RunContainer(container_file) as container:
+                latest_times[folder] = float(container.meta('latest_time'))
+            continue
         foam_file = os.path.join(case_folder, "foam.foam")
         if not os.path.isfile(foam_file):
             print(f"Warning: foam.foam not found in {case_folder}")
@@ -42,6 +56,17 @@ def plot_fields_over_line_all_timesteps(simulation_results_path, pointa, pointb,
     
     for folder in all_time_folders:
         case_folder = os.path.join(simulation_results_path, folder)
+
+        # Runs packed into a container are sampled at the nearest cell centres, only the used fields are read
+        container_file = os.path.join(case_folder, runContainer.container_name)
+        if os.path.isfile(container_file):
+            with runContainer.RunContainer(container_file) as container:
+                for field in fields:
+                    if field not in container.fields:
+                        raise ValueError(f"Field '{field}' not found in {container_file}.")
+                    field_data[field].append(container.sample_over_line(field, pointa, pointb, resolution))
+            continue
+
         foam_file = os.path.join(case_folder, "foam.foam")
         if not os.path.isfile(foam_file):
             print(f"Warning: foam.foam not found in {case_folder}")
@@ -60,9 +85,8 @@ def plot_fields_over_line_all_timesteps(simulation_results_path, pointa, pointb,
                 raise ValueError(f"Field '{field}' not found in {foam_file} at time {t}.")
             field_data[field].append(sampled[field])   
     
-    line = pv.Line(pointa, pointb, resolution=resolution)
-    distances = np.linalg.norm(line.points - line.points[0], axis=1)
-    distances = distances / distances[-1]
+    # Normalised distance of the resolution + 1 points of the line
+    distances = np.linspace(0, 1, resolution + 1)
 
     n_fields = len(fields)
     
@@ -1,9 +1,18 @@
-import pyvista as pv
+import os
+import sys
 import numpy as np
 import matplotlib
 matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
-import os
+
+try:
+    import pyvista as pv
+except ImportError:  # only needed for runs saved as case directories
+    pv = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import runContainer
 
 def get_time_step_folders(simulation_results_path):
     folders = []
@@ -20,6 +29,11 @@ def get_latest_time_for_folders(simulation_results_path, all_time_folders):
     latest_times = {}
     for folder in all_time_folders:
         case_folder = os.path.join(simulation_results_path, folder)
+        container_file = os.path.join(case_folder, runContainer.container_name)
+        if os.path.isfile(container_file):
+            with runContainer.RunContainer(container_file) as container:
+                latest_times[folder] = float(container.meta('latest_time'))
+            continue
         foam_file = os.path.join(case_folder, "foam.foam")
         if not os.path.isfile(foam_file):
             print(f"Warning: foam.foam not found in {case_folder}")
@@ -88,24 +102,34 @@ def plot_pressure_vs_temperature(simulation_results_path, pointa, pointb, resolu
     for folder in time_folders:
         t = latest_times[folder]
         case_folder = os.path.join(simulation_results_path, folder)
-        foam_file = os.path.join(case_folder, "foam.foam")
 
-        if not os.path.isfile(foam_file):
-            print(f"Warning: foam.foam not found in {case_folder}")
-            continue
+        # Runs packed into a container are sampled at the nearest cell centres, only p and T are read
+        container_file = os.path.join(case_folder, runContainer.container_name)
+        if os.path.isfile(container_file):
+            with runContainer.RunContainer(container_file) as container:
+                if 'p' not in container.fields or 'T' not in container.fields:
+                    raise ValueError(f"'p' or 'T' not found in {container_file}.")
+                T = container.sample_over_line('T', pointa, pointb, resolution)
+                p = container.sample_over_line('p', pointa, pointb, resolution)
+        else:
+            foam_file = os.path.join(case_folder, "foam.foam")
 
-        reader = pv.OpenFOAMReader(foam_file)
-        reader.set_active_time_value(t)
-        mesh = reader.read()
+            if not os.path.isfile(foam_file):
+                print(f"Warning: foam.foam not found in {case_folder}")
+                continue
+
+            reader = pv.OpenFOAMReader(foam_file)
+            reader.set_active_time_value(t)
+            mesh = reader.read()
 
-        line = pv.Line(pointa, pointb, resolution=resolution)
-        sampled = line.sample(mesh)
+            line = pv.Line(pointa, pointb, resolution=resolution)
+            sampled = line.sample(mesh)
 
-        if 'p' not in sampled.array_names or 'T' not in sampled.array_names:
-            raise ValueError(f"'p' or 'T' not found in sampled data at time {t}.")
+            if 'p' not in sampled.array_names or 'T' not in sampled.array_names:
+                raise ValueError(f"'p' or 'T' not found in sampled data at time {t}.")
 
-        T = sampled['T']
-        p = sampled['p']
+            T = sampled['T']
+            p = sampled['p']
 
         color = cmap(norm(float(folder))) if specific_time is None else None
         if specific_time is not None:
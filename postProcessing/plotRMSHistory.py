@@ -0,0 +1,85 @@
+import os
+import csv
+import numpy as np
+import matplotlib
+matplotlib.use('TkAgg')
+import matplotlib.pyplot as plt
+
+def get_time_step_folders(simulation_results_path):
+    folders = []
+    for name in os.listdir(simulation_results_path):
+        path = os.path.join(simulation_results_path, name)
+        if os.path.isdir(path):
+            try:
+                folders.append((float(name), name))
+            except ValueError:
+                continue
+    return [name for _, name in sorted(folders)]
+
+def read_rms_history(file_path):
+    times = []
+    values = {}
+    with open(file_path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            try:
+                time = float(row.pop('time'))
+                row = {field: float(value) for field, value in row.items()}
+            except (TypeError, ValueError):
+                continue
+            times.append(time)
+            for field, value in row.items():
+                values.setdefault(field, []).append(value)
+    order = np.argsort(times)
+    return np.array(times)[order], {field: np.array(v)[order] for field, v in values.items()}
+
+def plot_rms_history(simulation_results_path, fields, relative_change=True):
+    all_time_folders = get_time_step_folders(simulation_results_path)
+    if not all_time_folders:
+        raise RuntimeError(f"No valid time-step folders found in {simulation_results_path}")
+
+    n_cols = int(np.ceil(np.sqrt(len(fields))))
+    n_rows = int(np.ceil(len(fields) / n_cols))
+    fig, axs = plt.subplots(n_rows, n_cols, figsize=(5 * n_cols, 4 * n_rows), constrained_layout=True)
+    axs = np.atleast_1d(axs).flatten()
+
+    time_values = [float(folder) for folder in all_time_folders]
+    norm = plt.Normalize(vmin=min(time_values), vmax=max(time_values))
+    cmap = plt.cm.viridis
+    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
+    sm.set_array([])
+
+    for folder in all_time_folders:
+        file_path = os.path.join(simulation_results_path, folder, "rms_history.csv")
+        if not os.path.isfile(file_path):
+            print(f"Warning: rms_history.csv not found in {folder}")
+            continue
+
+        times, values = read_rms_history(file_path)
+        color = cmap(norm(float(folder)))
+        for i, field in enumerate(fields):
+            if field not in values or len(times) < 2:
+                continue
+            if relative_change:
+                # Same measure as the convergence check in monitorSimulation
+                axs[i].semilogy(times[1:], np.abs(np.diff(values[field])) / np.abs(values[field][1:]), color=color)
+            else:
+                axs[i].plot(times, values[field], color=color)
+
+    for i, field in enumerate(fields):
+        axs[i].set_xlabel('Solver time [s]')
+        axs[i].set_ylabel(f'Relative RMS change of {field} [-]' if relative_change else f'RMS of {field}')
+        axs[i].grid(True)
+        fig.colorbar(sm, ax=axs[i], label="Time [s]")
+
+    for j in range(len(fields), len(axs)):
+        fig.delaxes(axs[j])
+
+    plt.show()
+
+# === USER SETTINGS ===
+simulation_results_path = "../cases/wall_interactions/wall_accretion/simulation_results/"
+fields = ['p', 'U', 'T', 'J', 'S_sat', 'N', 'Y']
+relative_change = True
+
+# === RUN ===
+plot_rms_history(simulation_results_path, fields, relative_change)
@@ -1,4 +1,5 @@
 import os
+import sys
 import numpy as np
 import matplotlib
 matplotlib.use('TkAgg')  # or 'Qt5Agg' depending on what's installed
@@ -8,29 +9,53 @@ from matplotlib.animation import FuncAnimation
 import matplotlib.cm as cm
 import matplotlib.colors as mcolors
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import meshGeometry
+import runContainer
+
 # Set the path to the parent directory containing all the folders
 parent_dir = "../cases/wall_interactions/wall_accretion/simulation_results"
 animate = True  # Set this to True to enable animation
 repeat_animation = True
 
+def get_time_step_folders(simulation_results_path):
+    # Run folders ordered by time, other entries (e.g. stage_timing_summary.txt) are skipped
+    folders = []
+    for name in os.listdir(simulation_results_path):
+        path = os.path.join(simulation_results_path, name)
+        if os.path.isdir(path):
+            try:
+                folders.append((float(name), name))
+            except ValueError:
+                continue
+    return [name for _, name in sorted(folders)]
+
 # Dictionary to store wall coordinates for each folder
 wall_coords_by_folder = {}
 
-# Loop through each item in the parent directory
-for folder_name in sorted(os.listdir(parent_dir), key=float):  # ensure ordered by time
+# Loop through each run folder in the parent directory
+for folder_name in get_time_step_folders(parent_dir):
     folder_path = os.path.join(parent_dir, folder_name)
     
-    if os.path.isdir(folder_path):
-        file_path = os.path.join(folder_path, "wall_coordinates")
-        if os.path.isfile(file_path):
-            data = np.loadtxt(file_path)
-            wall_coords_by_folder[folder_name] = data
-        else:
-            print(f"File 'wall_coordinates' not found in {folder_name}")
+    file_path = os.path.join(folder_path, "wall_coordinates")
+    if os.path.isfile(file_path):
+        data = np.loadtxt(file_path)
+        wall_coords_by_folder[folder_name] = data
+    else:
+        print(f"File 'wall_coordinates' not found in {folder_name}")
 
 # Setup common variables
 L = 1.5  # m 
-x = np.linspace(0, L, 214)
+
+# x of the wall cells of the first run, in the order of the wall_coordinates files
+first_folder = next(iter(wall_coords_by_folder))
+container_file = os.path.join(parent_dir, first_folder, runContainer.container_name)
+if os.path.isfile(container_file):
+    with runContainer.RunContainer(container_file) as container:
+        x = container.wall('x')
+else:
+    x = meshGeometry.load(os.path.join(parent_dir, first_folder, "constant", "polyMesh")).wall().cell_centres[:,0]
 
 wall_first_coordinate = list(wall_coords_by_folder.values())[0][0]
 wall_last_coordinate = list(wall_coords_by_folder.values())[0][-1]
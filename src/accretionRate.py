@@ -6,6 +6,7 @@ Created on Wed Mar 26 15:15:12 2025
 """
 
 def calculate(mdot_a):
+    # mdot_a is the mass flux onto the wall [kg/m^2/s], see readWallFields.read_wall_mass_flux
     # Constants
     angstrom = 1e-10 # [m]
     m_H2O = 2.988e-26 # [kg]
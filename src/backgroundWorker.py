@@ -0,0 +1,87 @@
+import os
+import queue
+import shutil
+import threading
+
+# Directory in the case into which finished directories are moved before they are deleted
+trash_dir_name = ".trash"
+
+
+class BackgroundWorker:
+    """
+    Runs the file work of finished runs (deleting old directories, compressing logs, deduplicating
+    archived files, writing results) in a thread while the driver goes on with the next run.
+
+    Tasks run one at a time in the order they were submitted. submit() blocks while max_pending
+    tasks are waiting, so the work can never pile up faster than the disk takes it. flush() waits
+    until all tasks are done and raises the first error of a failed task. With enabled=False every
+    task runs immediately in the calling thread.
+    """
+    def __init__(self, max_pending=4, enabled=True):
+        self.enabled = enabled
+        self.tasks = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = None
+        if enabled:
+            self.thread = threading.Thread(target=self._run, name="BackgroundWorker", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            try:
+                if task is None:
+                    return
+                function, args, kwargs = task
+                if self.error is None:
+                    function(*args, **kwargs)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.tasks.task_done()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def submit(self, function, *args, **kwargs):
+        self._raise_error()
+        if not self.enabled:
+            function(*args, **kwargs)
+            return
+        self.tasks.put((function, args, kwargs))
+
+    def flush(self):
+        if self.enabled:
+            self.tasks.join()
+        self._raise_error()
+
+    def close(self):
+        # Finish all submitted tasks and stop the thread, may be called more than once
+        if self.thread is not None:
+            self.tasks.put(None)
+            self.thread.join()
+            self.thread = None
+        self._raise_error()
+
+
+def move_to_trash(paths, trash_dir=trash_dir_name):
+    """
+    Move paths into a new directory in trash_dir and return it. Renaming is instantaneous, so the
+    paths are gone at once and the slow deletion of the returned directory can run in the background.
+    """
+    os.makedirs(trash_dir, exist_ok=True)
+    index = 0
+    while os.path.exists(os.path.join(trash_dir, str(index))):
+        index += 1
+    target = os.path.join(trash_dir, str(index))
+    os.makedirs(target)
+
+    for path in paths:
+        os.replace(path, os.path.join(target, os.path.basename(os.path.normpath(path))))
+    return target
+
+
+def remove_tree(path):
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,82 @@
+import os
+import json
+import shutil
+import numpy as np
+
+checkpoint_path = "checkpoint.npz"
+
+# Stages of one outer run in the order they complete
+stages = ['prepared', 'solved', 'archived', 'evolved']
+
+
+def save(stage, state, arrays=None, path=checkpoint_path):
+    """
+    Record that stage of the current outer run has completed, together with the outer loop state
+    (JSON serialisable values) and arrays. The checkpoint is one file replaced atomically, so a
+    crash at any point leaves either the previous or the new checkpoint.
+    """
+    if stage not in stages:
+        raise ValueError(f"Unknown stage {stage}.")
+    arrays = dict(arrays or {})
+    arrays['state'] = np.array(json.dumps(dict(state, stage=stage)))
+
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load(path=checkpoint_path):
+    """
+    Return (state, arrays) of the last checkpoint, or (None, None) if there is none.
+    """
+    if not os.path.isfile(path):
+        return None, None
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files if key != 'state'}
+        state = json.loads(str(data['state']))
+    return state, arrays
+
+
+def completed(state, stage):
+    # True if stage of the checkpointed outer run has already completed
+    return state is not None and stages.index(state['stage']) >= stages.index(stage)
+
+
+def prefixed(arrays, prefix):
+    # Entries of arrays saved under prefix, with the prefix removed
+    return {key[len(prefix):]: values for key, values in arrays.items() if key.startswith(prefix)}
+
+
+def remove_incomplete_times(processor_dirs, fields):
+    """
+    Delete the time directories that a crashed solver did not write completely: every time after the
+    latest one that all processor directories contain with all fields. Returns that latest time or None.
+    """
+    def times(directory):
+        names = {}
+        for name in os.listdir(directory):
+            try:
+                names[name] = float(name)
+            except ValueError:
+                continue
+        return names
+
+    per_processor = [times(directory) for directory in processor_dirs]
+    common = set.intersection(*(set(names) for names in per_processor)) if per_processor else set()
+
+    def is_complete(name):
+        paths = [os.path.join(directory, name, field) for directory in processor_dirs for field in fields]
+        return all(os.path.isfile(path) and os.path.getsize(path) > 0 for path in paths)
+
+    latest = max(filter(is_complete, common), key=float, default=None)
+    latest_value = float(latest) if latest is not None else 0.0
+
+    for directory, names in zip(processor_dirs, per_processor):
+        for name, value in names.items():
+            if value > latest_value:
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    return latest
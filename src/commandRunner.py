@@ -0,0 +1,173 @@
+import os
+import fnmatch
+import shutil
+import signal
+import subprocess
+
+# Output of every tool run by run() goes to log.<tool> in the case, like the runApplication logs of OpenFOAM
+log_prefix = "log."
+
+# Lines of the log quoted in the error of a failed tool
+error_log_lines = 20
+
+# Time limit of a tool run by run(), None for no limit. Set from [SIMULATION] tool_timeout by runSimulation.py
+timeout_seconds = 3600
+
+# Time a tool gets to exit after SIGTERM before it is killed
+terminate_seconds = 10
+
+
+class CommandError(RuntimeError):
+    """
+    A tool failed, timed out or, for the solver, stopped with an error. The message contains
+    the end of its log file.
+    """
+    def __init__(self, argv, reason, log_path=None):
+        self.argv = list(argv)
+        self.log_path = log_path
+        message = f"{' '.join(self.argv)} {reason}"
+        if log_path is not None:
+            message += f", see {log_path}"
+            tail = log_tail(log_path)
+            if tail:
+                message += ":\n" + tail
+        super().__init__(message)
+
+
+def log_tail(log_path, n_lines=error_log_lines):
+    try:
+        with open(log_path, 'rb') as f:
+            f.seek(max(0, os.path.getsize(log_path) - 64 * 1024))
+            lines = f.read().decode(errors='replace').splitlines()
+    except OSError:
+        return ""
+    return "\n".join(lines[-n_lines:])
+
+
+# ---------- FILESYSTEM ----------
+def remove(path):
+    # rm -rf path
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def remove_matching(pattern, directory='.'):
+    """
+    rm -rf <directory>/<pattern> without a shell: removes the entries of directory whose name matches
+    the shell pattern (e.g. 'processor*' or '0.*'). Returns the number of removed entries.
+    """
+    with os.scandir(directory) as entries:
+        matches = [entry.path for entry in entries if fnmatch.fnmatchcase(entry.name, pattern)]
+    for path in matches:
+        remove(path)
+    return len(matches)
+
+
+def copy(source, destination_dir):
+    # cp -r source destination_dir, the file modes are kept but not the times, as with cp
+    destination = os.path.join(destination_dir, os.path.basename(os.path.normpath(source)))
+    if os.path.isdir(source):
+        shutil.copytree(source, destination, copy_function=shutil.copy, dirs_exist_ok=True)
+    else:
+        shutil.copy(source, destination)
+    return destination
+
+
+def time_directories(path='.', with_zero=False):
+    """
+    Names of the time directories in path sorted by time, as listed by foamListTimes (without 0
+    unless with_zero). The names are kept as written to avoid float formatting mismatches.
+    """
+    times = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name == 'constant' or (entry.name == '0' and not with_zero) or not entry.is_dir():
+                continue
+            try:
+                times.append((float(entry.name), entry.name))
+            except ValueError:
+                continue
+    return [name for _, name in sorted(times)]
+
+
+def latest_time(path='.'):
+    # foamListTimes -latestTime, None if no time was written
+    times = time_directories(path)
+    return times[-1] if times else None
+
+
+# ---------- PROCESSES ----------
+def stop(process):
+    # Terminate the tool and everything it started (e.g. the ranks of mpirun), then kill what is left
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=terminate_seconds)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def run(argv, log_name=None, timeout=None, check=True):
+    """
+    Run a tool with the argument list argv, without a shell, and wait for it. Its output goes to
+    log.<log_name> (default: the tool name), which is overwritten. A tool still running after timeout
+    (default: timeout_seconds) seconds is stopped. Raises CommandError if the tool cannot be started,
+    times out or fails (unless check is False) and returns its exit code.
+    """
+    timeout = timeout_seconds if timeout is None else timeout
+    log_path = log_prefix + (log_name or os.path.basename(argv[0]))
+    with open(log_path, 'wb') as log_file:
+        try:
+            process = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+        except OSError as error:
+            raise CommandError(argv, f"could not be started ({error.strerror})") from error
+
+        try:
+            return_code = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            stop(process)
+            raise CommandError(argv, f"did not finish within {timeout} s", log_path)
+        except BaseException:
+            # e.g. KeyboardInterrupt: do not leave the tool running
+            stop(process)
+            raise
+
+    if check and return_code != 0:
+        raise CommandError(argv, f"failed with exit code {return_code}", log_path)
+    return return_code
+
+
+def start(argv, log_path):
+    """
+    Start a tool in the background, detached from the driver like nohup, with its output appended to
+    log_path. Returns the Popen of the tool, see check().
+    """
+    with open(log_path, 'ab') as log_file:
+        try:
+            return subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+        except OSError as error:
+            raise CommandError(argv, f"could not be started ({error.strerror})") from error
+
+
+def check(process, log_path=None):
+    # Raise CommandError if the background tool process stopped with an error
+    if process is not None and process.poll() not in (None, 0):
+        raise CommandError(process.args, f"stopped with exit code {process.returncode}", log_path)
+
+
+def finish(process, timeout=None):
+    """
+    Wait for a background tool to exit, e.g. the solver after the monitor lowered endTime, and return
+    its exit code. A tool still running after timeout (default: timeout_seconds) seconds is stopped.
+    """
+    timeout = timeout_seconds if timeout is None else timeout
+    try:
+        return process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"{' '.join(process.args)} still running after {timeout} s, stopping it.", flush=True)
+        stop(process)
+        return process.returncode
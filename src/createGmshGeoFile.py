@@ -9,16 +9,7 @@ import csv
 import numpy as np
 
 
-def create(csv_file, gmsh_file, vertical_divisions, horizontal_divisions, progression_vertical, progression_horizontal, bump_horizontal):
-    """
-    Convert a CSV file of (x, y) coordinates into a Gmsh script with optimised transfinite mesh.
-
-    Parameters:
-    - csv_file: str, path to the input CSV file with x, y coordinates.
-    - gmsh_file: str, path to the output Gmsh script file.
-    - vertical_divisions: int, divisions for vertical lines.
-    - horizontal_divisions: int, divisions for horizontal lines.
-    """
+def read_channel_data(csv_file):
     points = []
 
     # Read points from the CSV file
@@ -31,11 +22,14 @@ def create(csv_file, gmsh_file, vertical_divisions, horizontal_divisions, progre
             except ValueError:
                 print(f"Skipping invalid row: {row}")
 
-    num_points = len(points)
-    if num_points < 2:
+    if len(points) < 2:
         raise ValueError("At least 2 points are required to create lines.")
-        
 
+    return points
+
+
+def find_section_boundaries(points):
+    num_points = len(points)
 
     # Calculate gradient changes to determine sections
     x_coords, y_coords = zip(*points)
@@ -47,7 +41,44 @@ def create(csv_file, gmsh_file, vertical_divisions, horizontal_divisions, progre
             section_boundaries.append(i + 1)
 
     section_boundaries.append(num_points - 1)  # Include the last point
+
+    return section_boundaries
+
+
+def section_gradings(section_boundaries, horizontal_divisions, progression_horizontal, bump_horizontal):
+    # Number of nodes and (type, coefficient) of the horizontal transfinite curves of every section
+    num_sections = len(section_boundaries) - 1
+    gradings = []
+
+    for i in range(num_sections):
+        horizontal_divisions_section = int(np.round(horizontal_divisions * (section_boundaries[i + 1] - section_boundaries[i]) / (section_boundaries[-1])))
+
+        if i == 0:  # First section
+            gradings.append((horizontal_divisions_section, 'Progression', progression_horizontal))
+        elif i == num_sections - 1:  # Last section
+            gradings.append((horizontal_divisions_section, 'Progression', 1 + np.round((1 - progression_horizontal), 4)))
+        else:
+            gradings.append((horizontal_divisions_section, 'Bump', bump_horizontal))
+
+    return gradings
+
+
+def create(csv_file, gmsh_file, vertical_divisions, horizontal_divisions, progression_vertical, progression_horizontal, bump_horizontal):
+    """
+    Convert a CSV file of (x, y) coordinates into a Gmsh script with optimised transfinite mesh.
+
+    Parameters:
+    - csv_file: str, path to the input CSV file with x, y coordinates.
+    - gmsh_file: str, path to the output Gmsh script file.
+    - vertical_divisions: int, divisions for vertical lines.
+    - horizontal_divisions: int, divisions for horizontal lines.
+    """
+    points = read_channel_data(csv_file)
+    num_points = len(points)
+
+    section_boundaries = find_section_boundaries(points)
     num_sections = len(section_boundaries) - 1
+    gradings = section_gradings(section_boundaries, horizontal_divisions, progression_horizontal, bump_horizontal)
   
 
 
@@ -120,26 +151,11 @@ def create(csv_file, gmsh_file, vertical_divisions, horizontal_divisions, progre
             file.write(f"Curve Loop({loop_index}) = {{{', '.join(map(str, curve_loop_lines))}}};\n")
             file.write(f"Plane Surface({surface_index}) = {{{loop_index}}};\n")
 
-            horizontal_divisions_section = int(np.round(horizontal_divisions * (section_boundaries[i + 1] - section_boundaries[i]) / (section_boundaries[-1])))
-            
-            
-            # Assign progression to horizontal and vertical lines for each section
-            if i == 0:  # First section
-                
-                file.write(f"Transfinite Curve {{{horizontal_base_line_indices[i]}}} = {horizontal_divisions_section} Using Progression {progression_horizontal};\n")
-                file.write(f"Transfinite Curve {{{horizontal_line_indices[i]}}} = {horizontal_divisions_section} Using Progression {progression_horizontal};\n")
-
-            elif i == num_sections - 1:  # Last section
-                progression_horizontal = 1 + np.round((1 - progression_horizontal), 4)
-                
-                file.write(f"Transfinite Curve {{{horizontal_base_line_indices[i]}}} = {horizontal_divisions_section} Using Progression {progression_horizontal};\n")
-                file.write(f"Transfinite Curve {{{horizontal_line_indices[i]}}} = {horizontal_divisions_section} Using Progression {progression_horizontal};\n")
-      
-            else: 
-                
-                file.write(f"Transfinite Curve {{{horizontal_base_line_indices[i]}}} = {horizontal_divisions_section} Using Bump {bump_horizontal};\n")
-                file.write(f"Transfinite Curve {{{horizontal_line_indices[i]}}} = {horizontal_divisions_section} Using Bump {bump_horizontal};\n")
+            # Assign progression or bump to the horizontal lines of each section
+            horizontal_divisions_section, grading, coefficient = gradings[i]
 
+            file.write(f"Transfinite Curve {{{horizontal_base_line_indices[i]}}} = {horizontal_divisions_section} Using {grading} {coefficient};\n")
+            file.write(f"Transfinite Curve {{{horizontal_line_indices[i]}}} = {horizontal_divisions_section} Using {grading} {coefficient};\n")
 
             file.write(f"Transfinite Curve {{{vertical_line_indices[i + 1]}}} = {vertical_divisions_section} Using Progression {progression_vertical};\n")
             file.write(f"Transfinite Curve {{{vertical_line_indices[i]}}} = {vertical_divisions_section} Using Progression {progression_vertical};\n")
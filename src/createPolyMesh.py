@@ -0,0 +1,245 @@
+import os
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+import foamFieldIO
+
+# Patches in the order of the boundary file, with the type set by editBoundaryFile for the Gmsh mesh
+patch_types = {
+    "inlet": "patch",
+    "outlet": "patch",
+    "outerwall": "wall",
+    "longitudinal_symmetry": "symmetryPlane",
+    "lateral_sides": "empty",
+}
+
+label_dtype = np.dtype('<i4')
+polyMesh_location = "constant/polyMesh"
+
+
+def progression_nodes(n_nodes, ratio):
+    # Normalised node positions of a Gmsh "Using Progression ratio" curve, interval i has size a * ratio^i
+    k = np.arange(n_nodes)
+    if abs(ratio - 1) < 1e-12:
+        return k / (n_nodes - 1)
+    return (ratio**k - 1) / (ratio**(n_nodes - 1) - 1)
+
+
+def bump_nodes(n_nodes, coefficient):
+    # Normalised node positions of a Gmsh "Using Bump coefficient" curve: the element size varies as
+    # 1 - (1 - coefficient) * u^2 over u in [-1, 1], so end size / middle size = coefficient
+    g = np.linspace(-1, 1, n_nodes)
+    k = 1 - coefficient
+    if k > 0:
+        u = np.tanh(g * np.arctanh(np.sqrt(k))) / np.sqrt(k)
+    elif k < 0:
+        u = np.tan(g * np.arctan(np.sqrt(-k))) / np.sqrt(-k)
+    else:
+        u = g
+    return 0.5 * (u + 1)
+
+
+def grading_nodes(n_nodes, grading, coefficient):
+    if grading == 'Progression':
+        return progression_nodes(n_nodes, coefficient)
+    if grading == 'Bump':
+        return bump_nodes(n_nodes, coefficient)
+    raise ValueError(f"Unknown transfinite grading {grading}.")
+
+
+def nodes_on_spline(points, fractions, samples_per_segment=40):
+    # Place nodes at the given fractions of the arc length of the interpolating cubic spline through
+    # points, parametrised by chord length like the Spline of the OpenCASCADE kernel of Gmsh
+    chord = np.r_[0, np.cumsum(np.hypot(*np.diff(points, axis=0).T))]
+    spline = CubicSpline(chord, points, axis=0)
+
+    t = np.linspace(0, chord[-1], samples_per_segment * (len(points) - 1) + 1)
+    speed = np.hypot(*spline(t, 1).T)
+    arc_length = np.r_[0, np.cumsum(0.5 * (speed[1:] + speed[:-1]) * np.diff(t))]
+
+    return spline(np.interp(fractions * arc_length[-1], arc_length, t))
+
+
+def block_points(wall_points, section_boundaries, gradings, vertical_divisions, progression_vertical):
+    """
+    Nodes of the 2D transfinite mesh as an array of shape (columns, vertical_divisions, 2).
+
+    Every section is bounded by the wall spline, the symmetry axis and two vertical lines, and its
+    interior nodes follow from the transfinite interpolation of the boundary nodes, as in Gmsh.
+    Neighbouring sections share their vertical line.
+    """
+    wall_points = np.asarray(wall_points, dtype=np.float64)[:, :2]
+    v = progression_nodes(vertical_divisions, progression_vertical)
+
+    columns = []
+    for i, (n_nodes, grading, coefficient) in enumerate(gradings):
+        section = wall_points[section_boundaries[i]:section_boundaries[i + 1] + 1]
+        f = grading_nodes(n_nodes, grading, coefficient)
+
+        wall = nodes_on_spline(section, f)
+        axis = np.column_stack((section[0, 0] + f * (section[-1, 0] - section[0, 0]), np.zeros(n_nodes)))
+        left = np.column_stack((np.full(vertical_divisions, section[0, 0]), v * section[0, 1]))
+        right = np.column_stack((np.full(vertical_divisions, section[-1, 0]), v * section[-1, 1]))
+
+        # Interpolation parameter along the section from the chord lengths of the wall nodes
+        u = np.r_[0, np.cumsum(np.hypot(*np.diff(wall, axis=0).T))]
+        u = (u / u[-1])[:, None, None]
+        w = v[None, :, None]
+
+        block = ((1 - u) * left[None] + u * right[None] + (1 - w) * axis[:, None] + w * wall[:, None]
+                 - ((1 - u) * (1 - w) * axis[0] + u * (1 - w) * axis[-1] + u * w * wall[-1] + (1 - u) * w * wall[0]))
+
+        columns.append(block if i == 0 else block[1:])
+
+    return np.concatenate(columns)
+
+
+def build_mesh(nodes):
+    """
+    Points, faces, owner, neighbour and patches of the single layer hex mesh extruded from the 2D nodes
+    (columns, rows, 2) between z = 0 and z = 1. Cell (i, j) has index i * (rows - 1) + j. Internal faces
+    are ordered by owner then neighbour and point from owner to neighbour, boundary faces point outwards.
+    """
+    n_columns, n_rows = nodes.shape[:2]
+    n_i, n_j = n_columns - 1, n_rows - 1
+    n_nodes_2d = n_columns * n_rows
+
+    points = np.zeros((2 * n_nodes_2d, 3))
+    points[:n_nodes_2d, :2] = nodes.reshape(-1, 2)
+    points[n_nodes_2d:, :2] = nodes.reshape(-1, 2)
+    points[n_nodes_2d:, 2] = 1.0
+
+    node = np.arange(n_nodes_2d).reshape(n_columns, n_rows)
+    cell = np.arange(n_i * n_j).reshape(n_i, n_j)
+    top = n_nodes_2d
+
+    # Faces between columns, normal +x
+    a, b = node[1:-1, :-1].ravel(), node[1:-1, 1:].ravel()
+    x_faces = np.column_stack((a, b, b + top, a + top))
+    x_owner, x_neighbour = cell[:-1].ravel(), cell[1:].ravel()
+
+    # Faces between rows, normal +y
+    a, b = node[:-1, 1:-1].ravel(), node[1:, 1:-1].ravel()
+    y_faces = np.column_stack((a, a + top, b + top, b))
+    y_owner, y_neighbour = cell[:, :-1].ravel(), cell[:, 1:].ravel()
+
+    owner = np.concatenate((x_owner, y_owner))
+    neighbour = np.concatenate((x_neighbour, y_neighbour))
+    order = np.lexsort((neighbour, owner))
+    faces = [np.concatenate((x_faces, y_faces))[order]]
+    owner, neighbour = [owner[order]], neighbour[order]
+
+    patches = {}
+    n_faces = len(neighbour)
+
+    def edge_faces(a, b):
+        # Extruded faces of the 2D edges a -> b, with normal (b - a) x z
+        return np.column_stack((a, b, b + top, a + top))
+
+    boundary = {
+        "inlet": (edge_faces(node[0, 1:], node[0, :-1]), cell[0]),
+        "outlet": (edge_faces(node[-1, :-1], node[-1, 1:]), cell[-1]),
+        "outerwall": (edge_faces(node[1:, -1], node[:-1, -1]), cell[:, -1]),
+        "longitudinal_symmetry": (edge_faces(node[:-1, 0], node[1:, 0]), cell[:, 0]),
+    }
+
+    corners = (node[:-1, :-1].ravel(), node[1:, :-1].ravel(), node[1:, 1:].ravel(), node[:-1, 1:].ravel())
+    back = np.column_stack((corners[0], corners[3], corners[2], corners[1]))
+    front = np.column_stack(corners) + top
+    boundary["lateral_sides"] = (np.concatenate((back, front)), np.concatenate((cell.ravel(), cell.ravel())))
+
+    for name in patch_types:
+        patch_faces, patch_owner = boundary[name]
+        patches[name] = (n_faces, len(patch_faces))
+        faces.append(patch_faces)
+        owner.append(patch_owner)
+        n_faces += len(patch_faces)
+
+    return points, np.concatenate(faces), np.concatenate(owner), neighbour, patches
+
+
+def _format_list(values, write_format, row_format=None):
+    # "N ( ... )" list of labels or vectors, one entry per line in ascii
+    values = np.asarray(values)
+    if write_format == 'binary':
+        return b''.join((f"{len(values)}\n(".encode(), values.tobytes(), b')'))
+
+    if row_format is None:
+        row_format = "%d\n"
+    rows = (row_format * len(values)) % tuple(values.ravel().tolist())
+    return f"{len(values)}\n(\n{rows})".encode()
+
+
+def _write(file_path, header, *lists):
+    with open(file_path, "wb") as f:
+        f.write(header.encode())
+        f.write(b'\n'.join(lists))
+        f.write(foamFieldIO.foam_footer.encode())
+
+
+def write_polyMesh(points, faces, owner, neighbour, patches, polyMesh_dir="constant/polyMesh", write_format='ascii'):
+    os.makedirs(polyMesh_dir, exist_ok=True)
+
+    # Remove leftovers of gmshToFoam, which would not match the new mesh
+    for name in ["cellZones", "faceZones", "pointZones", "sets"]:
+        path = os.path.join(polyMesh_dir, name)
+        if os.path.isdir(path):
+            for file_name in os.listdir(path):
+                os.remove(os.path.join(path, file_name))
+            os.rmdir(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    note = f"nPoints:{len(points)}  nCells:{owner.max() + 1}  nFaces:{len(faces)}  nInternalFaces:{len(neighbour)}"
+    binary = write_format == 'binary'
+
+    _write(os.path.join(polyMesh_dir, "points"), foamFieldIO.foam_header("vectorField", "points", write_format, polyMesh_location),
+           _format_list(points.astype(foamFieldIO.binary_dtype) if binary else points, write_format, "(%.15g %.15g %.15g)\n"))
+
+    if binary:
+        offsets = np.arange(len(faces) + 1, dtype=label_dtype) * faces.shape[1]
+        _write(os.path.join(polyMesh_dir, "faces"), foamFieldIO.foam_header("faceCompactList", "faces", write_format, polyMesh_location),
+               _format_list(offsets, write_format), _format_list(faces.astype(label_dtype).ravel(), write_format))
+    else:
+        face_format = f"{faces.shape[1]}(" + " ".join(["%d"] * faces.shape[1]) + ")\n"
+        _write(os.path.join(polyMesh_dir, "faces"), foamFieldIO.foam_header("faceList", "faces", write_format, polyMesh_location),
+               _format_list(faces, write_format, face_format))
+
+    _write(os.path.join(polyMesh_dir, "owner"), foamFieldIO.foam_header("labelList", "owner", write_format, polyMesh_location, note),
+           _format_list(owner.astype(label_dtype), write_format))
+    _write(os.path.join(polyMesh_dir, "neighbour"), foamFieldIO.foam_header("labelList", "neighbour", write_format, polyMesh_location, note),
+           _format_list(neighbour.astype(label_dtype), write_format))
+
+    entries = []
+    for name, (start_face, n_faces) in patches.items():
+        patch_type = patch_types[name]
+        entries.append(f"    {name}\n    {{\n        type            {patch_type};\n")
+        if patch_type != 'patch':
+            entries.append(f"        inGroups        1({patch_type});\n")
+        entries.append(f"        nFaces          {n_faces};\n        startFace       {start_face};\n    }}\n")
+
+    with open(os.path.join(polyMesh_dir, "boundary"), "wb") as f:
+        f.write(foamFieldIO.foam_header("polyBoundaryMesh", "boundary", 'ascii', polyMesh_location).encode())
+        f.write(f"{len(patches)}\n(\n{''.join(entries)})".encode())
+        f.write(foamFieldIO.foam_footer.encode())
+
+
+def create(wall_points, section_boundaries, gradings, vertical_divisions, progression_vertical, polyMesh_dir="constant/polyMesh", write_format='ascii'):
+    """
+    Write the hex mesh of the transfinite Gmsh script of createGmshGeoFile directly as an OpenFOAM polyMesh.
+
+    Parameters:
+    - wall_points: array of the (x, y) wall points, i.e. the points of the Gmsh script.
+    - section_boundaries, gradings: sections of the wall and the grading of their horizontal lines,
+      see createGmshGeoFile.find_section_boundaries and createGmshGeoFile.section_gradings.
+    - vertical_divisions: int, number of nodes on the vertical lines.
+    - progression_vertical: float, progression of the vertical lines from the axis to the wall.
+
+    Returns the number of cells.
+    """
+    nodes = block_points(wall_points, section_boundaries, gradings, vertical_divisions, progression_vertical)
+    points, faces, owner, neighbour, patches = build_mesh(nodes)
+
+    write_polyMesh(points, faces, owner, neighbour, patches, polyMesh_dir, write_format)
+
+    return (nodes.shape[0] - 1) * (nodes.shape[1] - 1)
@@ -0,0 +1,132 @@
+import os
+import numpy as np
+
+# Candidates with a larger ratio of the largest to the mean cell count per rank are not used
+max_imbalance = 1.05
+
+# Preferred method when candidates cut the same number of faces; scotch is only an estimate
+method_preference = ['hierarchical', 'simple', 'scotch']
+
+
+class Decomposition:
+    def __init__(self, method, n_ranks, split, parts, geometry):
+        self.method = method
+        self.n_ranks = n_ranks
+        self.split = split
+        self.parts = parts
+        self.processor_faces = processor_faces(parts, geometry)
+        counts = np.bincount(parts, minlength=n_ranks)
+        self.imbalance = float(counts.max() / counts.mean())
+
+    def __str__(self):
+        split = f"({' '.join(map(str, self.split))})" if self.split else "-"
+        return f"{self.method:<13}{self.n_ranks:>6}{split:>12}{self.processor_faces:>18}{self.imbalance:>12.3f}"
+
+
+def processor_faces(parts, geometry):
+    # Internal faces between cells of different ranks, i.e. the faces of the processor patches
+    return int(np.count_nonzero(parts[geometry.owner[:geometry.n_internal_faces]] != parts[geometry.neighbour]))
+
+
+def balanced_split(order, n_parts):
+    # Part of every entry of order when order is cut into n_parts consecutive pieces of equal size
+    parts = np.empty(len(order), dtype=np.int64)
+    parts[order] = np.arange(len(order)) * n_parts // len(order)
+    return parts
+
+
+def simple(cell_centres, split):
+    # OpenFOAM simple: cells sorted by x and by y over the whole mesh, cut into equal counts per direction
+    nx, ny = split
+    x_parts = balanced_split(np.argsort(cell_centres[:,0], kind='stable'), nx)
+    y_parts = balanced_split(np.argsort(cell_centres[:,1], kind='stable'), ny)
+    return x_parts * ny + y_parts
+
+
+def hierarchical(cell_centres, split):
+    # OpenFOAM hierarchical with order xyz: cut in x first, then every x slab in y
+    nx, ny = split
+    x_parts = balanced_split(np.argsort(cell_centres[:,0], kind='stable'), nx)
+    parts = np.empty(len(cell_centres), dtype=np.int64)
+    for i in range(nx):
+        cells = np.flatnonzero(x_parts == i)
+        parts[cells] = i * ny + balanced_split(np.argsort(cell_centres[cells,1], kind='stable'), ny)
+    return parts
+
+
+def recursive_bisection(geometry, n_ranks):
+    """
+    Estimate of a graph partitioner such as scotch: every part is cut in two, in x or in y,
+    whichever cuts fewer faces, with cell counts in proportion to the ranks on both sides.
+    """
+    cell_centres = geometry.cell_centres
+    owner = geometry.owner[:geometry.n_internal_faces]
+    neighbour = geometry.neighbour
+    parts = np.zeros(geometry.n_cells, dtype=np.int64)
+
+    def bisect(cells, first, n):
+        if n == 1:
+            parts[cells] = first
+            return
+        n_left = n // 2
+        cut = len(cells) * n_left // n
+        in_part = np.zeros(geometry.n_cells, dtype=bool)
+        in_part[cells] = True
+        faces = in_part[owner] & in_part[neighbour]
+
+        best = None
+        for axis in (0, 1):
+            order = cells[np.argsort(cell_centres[cells, axis], kind='stable')]
+            left = np.zeros(geometry.n_cells, dtype=bool)
+            left[order[:cut]] = True
+            cut_faces = np.count_nonzero(faces & (left[owner] != left[neighbour]))
+            if best is None or cut_faces < best[0]:
+                best = (cut_faces, order)
+
+        order = best[1]
+        bisect(order[:cut], first, n_left)
+        bisect(order[cut:], first + n_left, n - n_left)
+
+    bisect(np.arange(geometry.n_cells), 0, n_ranks)
+    return parts
+
+
+def rank_count(n_cells, max_ranks, min_cells_per_rank):
+    # As many ranks as the cores allow while every rank keeps at least min_cells_per_rank cells
+    return int(max(1, min(max_ranks, n_cells // min_cells_per_rank)))
+
+
+def candidates(geometry, n_ranks):
+    splits = [(nx, n_ranks // nx) for nx in range(1, n_ranks + 1) if n_ranks % nx == 0]
+    decompositions = []
+    for split in splits:
+        decompositions.append(Decomposition('hierarchical', n_ranks, split + (1,), hierarchical(geometry.cell_centres, split), geometry))
+        if split[1] > 1:
+            # With one rank across the channel simple and hierarchical are the same
+            decompositions.append(Decomposition('simple', n_ranks, split + (1,), simple(geometry.cell_centres, split), geometry))
+    if n_ranks > 1:
+        decompositions.append(Decomposition('scotch', n_ranks, None, recursive_bisection(geometry, n_ranks), geometry))
+    return decompositions
+
+
+def plan(geometry, max_ranks=None, min_cells_per_rank=5000):
+    """
+    Choose the decomposition of the mesh: the rank count from min_cells_per_rank and max_ranks (default:
+    the cores this process may run on), then among the simple and hierarchical 2D splits and scotch the
+    candidate with the fewest processor boundary faces that keeps the cell counts balanced.
+    Prints the processor boundary faces of every candidate and returns the chosen Decomposition.
+    """
+    if max_ranks is None:
+        max_ranks = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    n_ranks = rank_count(geometry.n_cells, max_ranks, min_cells_per_rank)
+
+    decompositions = candidates(geometry, n_ranks)
+    balanced = [d for d in decompositions if d.imbalance <= max_imbalance] or decompositions
+    chosen = min(balanced, key=lambda d: (d.processor_faces, method_preference.index(d.method)))
+
+    print(f"Decomposition of {geometry.n_cells} cells into {n_ranks} ranks ({geometry.n_cells // n_ranks} cells per rank):", flush=True)
+    print(f"{'method':<13}{'ranks':>6}{'split':>12}{'processor faces':>18}{'imbalance':>12}", flush=True)
+    for decomposition in decompositions:
+        print(f"{decomposition}{'  <- chosen' if decomposition is chosen else ''}", flush=True)
+
+    return chosen
@@ -7,39 +7,39 @@ Created on Wed Apr 30 14:58:21 2025
 
 import numpy as np
 
-def edit(boundary_condition_type, number_of_wall_points, temperature_inlet, temperature_outlet):
+import foamFieldIO
+
+def edit(boundary_condition_type, wall, temperature_inlet, temperature_outlet):
     temperature_BC_file = "./0/T"
     
-    with open(temperature_BC_file, "r") as file:
-        lines = file.readlines()
+    content = foamFieldIO.read_file(temperature_BC_file)
 
     new_lines = []
-    inside_outerwall = False
-    for i, line in enumerate(lines):
-        if "outerwall" in line:
-            new_lines.append(line)
-            inside_outerwall = True
-            if boundary_condition_type == 'fixedValue':
-                new_lines.append("    {\n")
-                new_lines.append("        type            fixedValue;\n")
-                new_lines.append("        value           nonuniform List<scalar>\n")
-                new_lines.append("        (\n")
-                temperatures = np.linspace(temperature_inlet, temperature_outlet, number_of_wall_points)
-                for t in temperatures:
-                    new_lines.append(f"            {t:.6f}\n")
-                new_lines.append("        );\n")
-                new_lines.append("    }\n")
-            elif boundary_condition_type == 'zeroGradient':
-                new_lines.append("    {\n")
-                new_lines.append("        type            zeroGradient;\n")
-                new_lines.append("    }\n")
-        elif inside_outerwall:
-            if "}" in line:
-                inside_outerwall = False  # already added our new block
+    new_lines.append("{\n")
+    if boundary_condition_type == 'fixedValue':
+        new_lines.append("        type            fixedValue;\n")
+        # Linear from inlet to outlet along the wall, written in the face order of the patch
+        temperatures = wall.to_patch_order(np.linspace(temperature_inlet, temperature_outlet, wall.n_faces))
+        if foamFieldIO.read_format(content) == 'binary':
+            new_lines.append("        value           nonuniform ")
+            new_lines.append(foamFieldIO.format_list(temperatures, 'binary'))
+            new_lines.append(";\n")
         else:
-            new_lines.append(line)
+            new_lines.append("        value           nonuniform List<scalar>\n")
+            new_lines.append("        (\n")
+            for t in temperatures:
+                new_lines.append(f"            {t:.6f}\n")
+            new_lines.append("        );\n")
+    elif boundary_condition_type == 'zeroGradient':
+        new_lines.append("        type            zeroGradient;\n")
+    else:
+        raise ValueError(f"Unknown wall temperature boundary condition type {boundary_condition_type}.")
+    new_lines.append("    }")
+
+    block = b''.join(line if isinstance(line, bytes) else line.encode() for line in new_lines)
 
-    with open(temperature_BC_file, "w") as file:
-        file.writelines(new_lines)
+    # Replace the outerwall patch by its parsed extent, which is safe for binary files
+    with open(temperature_BC_file, "wb") as file:
+        file.write(foamFieldIO.replace_patch(content, 'outerwall', block))
 
     return
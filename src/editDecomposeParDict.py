@@ -7,7 +7,8 @@ Created on Fri Jun  6 16:13:24 2025
 
 import re
 
-def edit(n):
+def edit(n, method='hierarchical', split=None):
+    # split is the (x y z) subdivision of the simple and hierarchical methods, by default n strips along x
     filename = 'system/decomposeParDict'
     # Check if the file exists
     try:
@@ -24,9 +25,21 @@ def edit(n):
                  lambda m: f'{m.group(1)}{n};',
                  content)
                  
-    # Factor and replace hierarchicalCoeffs n
-    content = re.sub(r'n\s+\(\s*\d+\s+\d+\s+\d+\s*\);',
-                     f'n               ({n} {1} {1});', content)
+    content = re.sub(r'^(method\s+)\w+;', lambda m: f'{m.group(1)}{method};', content, flags=re.MULTILINE)
+
+    if method in ('simple', 'hierarchical'):
+        nx, ny, nz = split or (n, 1, 1)
+        coeffs = re.compile(rf'^{method}Coeffs\s*\{{.*?^\}}', re.MULTILINE | re.DOTALL)
+        if not coeffs.search(content):
+            # Add the coefficients of a method the dictionary does not have yet after the method entry
+            order = '\n    order           xyz;' if method == 'hierarchical' else ''
+            content = re.sub(r'^(method\s+\w+;\n)',
+                             lambda m: f'{m.group(1)}\n{method}Coeffs\n{{\n    n               (1 1 1);\n    delta           0.001;{order}\n}}\n',
+                             content, flags=re.MULTILINE)
+
+        # Replace n in the coefficients of the method
+        content = coeffs.sub(lambda m: re.sub(r'n\s+\(\s*\d+\s+\d+\s+\d+\s*\);', f'n               ({nx} {ny} {nz});', m.group(0)),
+                             content)
 
     with open(filename, 'w') as file:
         file.write(content)
@@ -0,0 +1,366 @@
+import os
+import re
+import numpy as np
+
+# Number of components per OpenFOAM list type
+components = {
+    'scalar': 1,
+    'vector': 3,
+}
+
+value_pattern = re.compile(rb'(nonuniform|uniform)\s+')
+list_header_pattern = re.compile(rb'List<(\w+)>\s*(\d*)\s*([({])')
+uniform_vector_pattern = re.compile(rb'\(([^)]*)\)')
+uniform_scalar_pattern = re.compile(rb'([^\s;]+)\s*;')
+vector_list_end_pattern = re.compile(rb'\)\s*\)')
+patch_pattern = re.compile(rb'\s*("[^"]*"|[^\s{}]+)\s*\{')
+patch_value_pattern = re.compile(rb'\bvalue\s+(?=(?:nonuniform|uniform)\s)|\}')
+nonuniform_pattern = re.compile(rb'\bnonuniform\s+')
+format_pattern = re.compile(rb'\bformat\s+(ascii|binary)\s*;')
+arch_pattern = re.compile(rb'\barch\s+"([^"]*)"\s*;')
+
+# Architecture written by the solver, see the "arch" entry of the FoamFile header
+binary_arch = 'LSB;label=32;scalar=64'
+binary_dtype = np.dtype('<f8')
+
+foam_banner = r"""/*--------------------------------*- C++ -*----------------------------------*\
+| =========                 |                                                 |
+| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |
+|  \\    /   O peration     | Version:  v2012                                 |
+|   \\  /    A nd           | Website:  www.openfoam.com                      |
+|    \\/     M anipulation  |                                                 |
+\*---------------------------------------------------------------------------*/
+"""
+foam_separator = "// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //\n\n"
+foam_footer = "\n\n// ************************************************************************* //\n"
+
+
+def foam_header(class_name, object_name, write_format='ascii', location=None, note=None):
+    # Banner and FoamFile header of the OpenFOAM files written from Python
+    lines = [
+        "FoamFile",
+        "{",
+        "    version     2.0;",
+        f"    format      {write_format};",
+    ]
+    if write_format == 'binary':
+        lines.append(f'    arch        "{binary_arch}";')
+    lines.append(f"    class       {class_name};")
+    if note is not None:
+        lines.append(f'    note        "{note}";')
+    if location is not None:
+        lines.append(f'    location    "{location}";')
+    lines += [
+        f"    object      {object_name};",
+        "}",
+    ]
+    return foam_banner + "\n".join(lines) + "\n" + foam_separator
+
+
+def read_file(field_file):
+    with open(field_file, 'rb') as f:
+        return f.read()
+
+
+def read_format(content):
+    match = format_pattern.search(content)
+    return match.group(1).decode() if match else 'ascii'
+
+
+def _binary_dtype(content):
+    # Scalar dtype of the binary list payloads, None for ascii files
+    if read_format(content) != 'binary':
+        return None
+
+    arch = arch_pattern.search(content)
+    arch = arch.group(1).decode() if arch else binary_arch
+    byte_order = '>' if 'MSB' in arch else '<'
+    scalar_bits = re.search(r'scalar=(\d+)', arch)
+    scalar_bytes = int(scalar_bits.group(1)) // 8 if scalar_bits else 8
+
+    return np.dtype(f'{byte_order}f{scalar_bytes}')
+
+
+def _parse_list(content, pos, dtype=None):
+    # Parse "List<type> N ( ... )" starting at pos, return the values and the end position.
+    # The size N may be omitted in ascii lists. Binary payloads (dtype given) are returned as
+    # read-only views into content without copying.
+    header = list_header_pattern.match(content, pos)
+    if not header:
+        raise ValueError(f"Could not parse nonuniform list at position {pos}.")
+
+    value_type = header.group(1).decode()
+    if value_type not in components:
+        raise ValueError(f"Unsupported list type List<{value_type}>.")
+    n_components = components[value_type]
+    size = int(header.group(2)) if header.group(2) else None
+    start = header.end()
+
+    if size is None and (header.group(3) == b'{' or dtype is not None):
+        raise ValueError(f"Missing size of List<{value_type}> at position {pos}.")
+
+    # Compact form written for constant lists, e.g. "100{0}"
+    if header.group(3) == b'{':
+        end = content.index(b'}', start)
+        value = np.fromstring(content[start:end].translate(None, b'()'), sep=' ')
+        values = np.tile(value, (size, 1)) if n_components > 1 else np.full(size, value[0])
+        return values, end + 1
+
+    if dtype is not None:
+        count = size * n_components
+        end = start + count * dtype.itemsize
+        if content[end:end + 1] != b')':
+            raise ValueError(f"Binary List<{value_type}> of size {size} is not terminated by ')'.")
+        values = np.frombuffer(content, dtype=dtype, count=count, offset=start)
+        if n_components > 1:
+            values = values.reshape(size, n_components)
+        return values, end + 1
+
+    empty = size == 0 or content[start:start + 64].strip().startswith(b')')
+    if empty or n_components == 1:
+        end = content.index(b')', start)
+        list_end = end + 1
+    else:
+        match = vector_list_end_pattern.search(content, start)
+        if not match:
+            raise ValueError("Could not find the end of the vector list.")
+        end = match.start() + 1
+        list_end = match.end()
+
+    payload = content[start:end]
+    if n_components > 1:
+        payload = payload.translate(None, b'()')
+
+    values = np.fromstring(payload, sep=' ')
+    if size is None:
+        size = values.size // n_components
+    if values.size != size * n_components:
+        raise ValueError(f"Expected {size} List<{value_type}> entries but read {values.size // n_components}.")
+
+    if n_components > 1:
+        values = values.reshape(size, n_components)
+
+    return values, list_end
+
+
+def _parse_value(content, pos, size=None, dtype=None):
+    # Parse an "uniform ..." or "nonuniform List<...> ..." entry starting at pos
+    match = value_pattern.match(content, pos)
+    if not match:
+        raise ValueError(f"Could not parse field value at position {pos}.")
+
+    if match.group(1) == b'nonuniform':
+        return _parse_list(content, match.end(), dtype)
+
+    vector = uniform_vector_pattern.match(content, match.end())
+    if vector:
+        value = np.fromstring(vector.group(1), sep=' ')
+        end = vector.end()
+    else:
+        scalar = uniform_scalar_pattern.match(content, match.end())
+        if not scalar:
+            raise ValueError(f"Could not parse uniform value at position {pos}.")
+        value = np.array([float(scalar.group(1))])
+        end = scalar.end(1)
+
+    if size is None:
+        size = 1
+    values = np.tile(value, (size, 1)) if value.size > 1 else np.full(size, value[0])
+
+    return values, end
+
+
+def _find_internal_field(content):
+    match = re.search(rb'\binternalField\s+', content)
+    if not match:
+        raise ValueError("No internalField entry found.")
+    return match.end()
+
+
+def read_internal_field(field_file, num_cells=None, content=None):
+    """
+    Read the internalField of an OpenFOAM field file into a contiguous float64 array.
+
+    Scalar fields are returned with shape (N,), vector fields with shape (N, 3).
+    A uniform internalField is broadcast to num_cells entries (one entry if num_cells is None).
+    Binary files are read without copying, so the returned array is read-only in that case.
+    """
+    if content is None:
+        content = read_file(field_file)
+
+    values, _ = _parse_value(content, _find_internal_field(content), num_cells, _binary_dtype(content))
+
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def read_time_directory(time_dir, num_cells, exclude=()):
+    """
+    Read the internalField of every field file in time_dir into a dict of arrays. Files without an
+    internalField or with a different number of cells (e.g. uniform/ or surface fields) are skipped.
+    """
+    fields = {}
+    for name in sorted(os.listdir(time_dir)):
+        path = os.path.join(time_dir, name)
+        if name in exclude or not os.path.isfile(path):
+            continue
+        content = read_file(path)
+        if b'internalField' not in content:
+            continue
+        values = read_internal_field(None, num_cells, content)
+        if len(values) == num_cells:
+            fields[name] = values
+
+    return fields
+
+
+def _iter_patches(content, dtype=None):
+    # Yield (name, block start, block end, value) for every patch of the boundaryField,
+    # where the block spans the braces of the patch and value is None without a value entry.
+    # Payloads are skipped by parsing them, so binary data is never scanned for names or braces.
+    _, pos = _parse_value(content, _find_internal_field(content), dtype=dtype)
+
+    match = re.compile(rb'\bboundaryField\s*\{').search(content, pos)
+    if not match:
+        raise ValueError("No boundaryField entry found.")
+    pos = match.end()
+
+    while True:
+        patch = patch_pattern.match(content, pos)
+        if not patch:
+            break
+        name = patch.group(1).strip(b'"').decode()
+        block_start = patch.end() - 1
+        pos = patch.end()
+
+        value = None
+        entry = patch_value_pattern.search(content, pos)
+        if not entry:
+            raise ValueError(f"Unterminated patch {name} in boundaryField.")
+        if entry.group(0) != b'}':
+            value, pos = _parse_value(content, entry.end(), dtype=dtype)
+            pos = content.index(b'}', pos)
+        else:
+            pos = entry.start()
+        pos += 1
+
+        yield name, block_start, pos, value
+
+
+def read_boundary_fields(field_file, content=None):
+    """
+    Read the value entry of every patch in the boundaryField of an OpenFOAM field file.
+
+    Returns a dictionary of patch name -> array. Patches without a value entry (e.g. zeroGradient,
+    empty, symmetryPlane) are left out. Uniform patch values are returned as a single entry.
+    """
+    if content is None:
+        content = read_file(field_file)
+
+    patches = {}
+    for name, _, _, value in _iter_patches(content, _binary_dtype(content)):
+        if value is not None:
+            patches[name] = value
+
+    return patches
+
+
+def replace_patch(content, patch, block):
+    """
+    Replace the braced dictionary of a boundaryField patch with block, which includes the braces.
+    """
+    for name, block_start, block_end, _ in _iter_patches(content, _binary_dtype(content)):
+        if name == patch:
+            return b''.join((content[:block_start], block, content[block_end:]))
+
+    raise ValueError(f"No patch {patch} found in boundaryField.")
+
+
+def read_boundary_field(field_file, patch, content=None):
+    patches = read_boundary_fields(field_file, content)
+    if patch not in patches:
+        raise ValueError(f"No value found for patch {patch}.")
+    return np.ascontiguousarray(patches[patch], dtype=np.float64)
+
+
+def format_list(values, write_format='ascii'):
+    """
+    Format a scalar (N,) or vector (N, 3) array as an OpenFOAM "List<type> N (...)" entry.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    value_type = 'vector' if values.ndim == 2 else 'scalar'
+    header = f"List<{value_type}> \n{len(values)}\n(".encode()
+
+    if write_format == 'binary':
+        payload = memoryview(np.ascontiguousarray(values, dtype=binary_dtype)).cast('B')
+        return b''.join((header, payload, b')'))
+
+    if value_type == 'vector':
+        rows = '\n'.join(f"({x} {y} {z})" for x, y, z in values.tolist())
+    else:
+        rows = '\n'.join(map(str, values.tolist()))
+
+    return header + f"\n{rows}\n)".encode()
+
+
+def _rewrite_lists(content, pos, dtype, write_format):
+    # Re-encode every nonuniform list after pos in write_format
+    # Walk the lists in file order, skipping each payload so binary data is never searched
+    chunks = []
+    while True:
+        match = nonuniform_pattern.search(content, pos)
+        if not match:
+            break
+        values, end = _parse_list(content, match.end(), dtype)
+        chunks.append(content[pos:match.end()])
+        chunks.append(format_list(values, write_format))
+        pos = end
+
+    chunks.append(content[pos:])
+
+    return chunks
+
+
+def convert_format(content, write_format):
+    """
+    Rewrite the FoamFile header and every nonuniform list of a field file in the given format.
+    """
+    if write_format not in ('ascii', 'binary'):
+        raise ValueError(f"Unknown write format {write_format}.")
+
+    dtype = _binary_dtype(content)
+    if read_format(content) == write_format:
+        return content
+
+    match = format_pattern.search(content)
+    if not match:
+        raise ValueError("No format entry found in FoamFile header.")
+
+    chunks = [content[:match.start(1)], write_format.encode()]
+    pos = match.end(1)
+
+    if write_format == 'binary' and not arch_pattern.search(content, 0, content.find(b'}')):
+        line_end = content.index(b'\n', pos) + 1
+        chunks.append(content[pos:line_end])
+        chunks.append(f'    arch        "{binary_arch}";\n'.encode())
+        pos = line_end
+
+    chunks.extend(_rewrite_lists(content, pos, dtype, write_format))
+
+    return b''.join(chunks)
+
+
+
+def replace_internal_field(content, values, write_format=None):
+    """
+    Replace the internalField of a field file with a nonuniform list of values.
+
+    The list is written in the format of the file, after converting the file to write_format if given.
+    """
+    if write_format is not None:
+        content = convert_format(content, write_format)
+
+    dtype = _binary_dtype(content)
+    start = _find_internal_field(content)
+    _, end = _parse_value(content, start, dtype=dtype)
+
+    return b''.join((content[:start], b'nonuniform ', format_list(values, read_format(content)), content[end:]))
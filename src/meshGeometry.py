@@ -0,0 +1,178 @@
+import os
+import hashlib
+import numpy as np
+
+import foamFieldIO
+import polyMesh
+
+# Cell centre fields written by writeCellCentres describe the mesh itself, not the flow
+cell_centre_fields = ['C', 'Cx', 'Cy', 'Cz']
+
+# Geometry of the most recently loaded meshes, keyed by the hash of their points file
+cache = {}
+cache_size = 4
+
+
+def _sum_by_cell(cells, values, n_cells):
+    # Sum values of shape (n,) or (n, 3) into the given cells
+    if values.ndim == 1:
+        return np.bincount(cells, values, n_cells)
+    return np.column_stack([np.bincount(cells, values[:, k], n_cells) for k in range(values.shape[1])])
+
+
+def face_centres_and_areas(points, faces):
+    """
+    Face centres and area vectors as computed by OpenFOAM (primitiveMeshFaceCentresAndAreas):
+    every face is split into triangles around the average of its points, the centre is the
+    area-weighted average of the triangle centres and the area vector the sum of the triangle normals.
+    """
+    face_points = points[faces]
+    estimate = face_points.mean(axis=1, keepdims=True)
+    next_points = np.roll(face_points, -1, axis=1)
+
+    centres = face_points + next_points + estimate
+    normals = np.cross(next_points - face_points, estimate - face_points)
+    magnitudes = np.linalg.norm(normals, axis=2)
+
+    face_centres = np.einsum('ij,ijk->ik', magnitudes, centres) / (3 * magnitudes.sum(axis=1)[:, None])
+    face_areas = 0.5 * normals.sum(axis=1)
+
+    return face_centres, face_areas
+
+
+def cell_centres_and_volumes(face_centres, face_areas, owner, neighbour, n_cells):
+    """
+    Cell centres and volumes as computed by OpenFOAM (primitiveMeshCellCentresAndVols): every cell
+    is split into pyramids from its faces to the average of its face centres.
+    """
+    n_internal = len(neighbour)
+    counts = np.bincount(owner, minlength=n_cells) + np.bincount(neighbour, minlength=n_cells)
+    estimate = (_sum_by_cell(owner, face_centres, n_cells) + _sum_by_cell(neighbour, face_centres[:n_internal], n_cells)) / counts[:, None]
+
+    # Three times the pyramid volumes, positive for the owner and the neighbour side
+    owner_volumes = np.einsum('ij,ij->i', face_areas, face_centres - estimate[owner])
+    neighbour_volumes = np.einsum('ij,ij->i', face_areas[:n_internal], estimate[neighbour] - face_centres[:n_internal])
+
+    owner_centres = 0.75 * face_centres + 0.25 * estimate[owner]
+    neighbour_centres = 0.75 * face_centres[:n_internal] + 0.25 * estimate[neighbour]
+
+    volumes = np.bincount(owner, owner_volumes, n_cells) + np.bincount(neighbour, neighbour_volumes, n_cells)
+    centres = (_sum_by_cell(owner, owner_volumes[:, None] * owner_centres, n_cells)
+               + _sum_by_cell(neighbour, neighbour_volumes[:, None] * neighbour_centres, n_cells)) / volumes[:, None]
+
+    return centres, volumes / 3
+
+
+class MeshGeometry:
+    """
+    Topology and geometry of a polyMesh: points, faces, owner, neighbour, boundary patches,
+    face centres and area vectors, cell centres and volumes.
+    """
+    def __init__(self, polyMesh_dir="constant/polyMesh"):
+        self.points = polyMesh.read_points(polyMesh_dir)
+        self.faces = polyMesh.read_faces(polyMesh_dir)
+        self.owner = polyMesh.read_labels("owner", polyMesh_dir)
+        self.neighbour = polyMesh.read_labels("neighbour", polyMesh_dir)
+        self.boundary = polyMesh.read_boundary(polyMesh_dir)
+
+        self.n_cells = int(self.owner.max()) + 1
+        self.n_internal_faces = len(self.neighbour)
+
+        self.face_centres, self.face_areas = face_centres_and_areas(self.points, self.faces)
+        self.cell_centres, self.cell_volumes = cell_centres_and_volumes(self.face_centres, self.face_areas, self.owner, self.neighbour, self.n_cells)
+
+        self.walls = {}
+
+    def patch_slice(self, patch):
+        if patch not in self.boundary:
+            raise ValueError(f"No patch {patch} found in boundary file.")
+        start = self.boundary[patch]['startFace']
+        return slice(start, start + self.boundary[patch]['nFaces'])
+
+    def wall(self, patch='outerwall'):
+        # The wall index is built once per patch and kept with the cached geometry
+        if patch not in self.walls:
+            self.walls[patch] = Wall(self, patch)
+        return self.walls[patch]
+
+
+class Wall:
+    """
+    Faces of a wall patch ordered along x with their owner cells, face centres, area vectors and
+    outward unit normals. Values ordered along x are put back into patch order with to_patch_order.
+    """
+    def __init__(self, geometry, patch='outerwall'):
+        patch_slice = geometry.patch_slice(patch)
+        patch_faces = np.arange(patch_slice.start, patch_slice.stop)
+
+        # The face order of the patch depends on the mesher, sort along the channel
+        self.order = np.argsort(geometry.face_centres[patch_faces, 0], kind='stable')
+        self.faces = patch_faces[self.order]
+        self.n_faces = len(self.faces)
+
+        self.cells = geometry.owner[self.faces]
+        self.cell_centres = geometry.cell_centres[self.cells]
+        self.face_centres = geometry.face_centres[self.faces]
+
+        # Boundary face area vectors point out of the domain
+        self.face_areas = geometry.face_areas[self.faces]
+        self.face_area_magnitudes = np.linalg.norm(self.face_areas, axis=1)
+        self.normals = self.face_areas / self.face_area_magnitudes[:, None]
+
+        # Length of the faces in the x-y plane, the mesh is one cell deep in z
+        depths = np.ptp(geometry.points[geometry.faces[self.faces], 2], axis=1)
+        self.face_lengths = self.face_area_magnitudes / depths
+
+        # Wall-normal distance of the cell centres and mean cell height normal to the wall
+        self.cell_volumes = geometry.cell_volumes[self.cells]
+        self.wall_distances = np.einsum('ij,ij->i', self.face_centres - self.cell_centres, self.normals)
+        self.cell_heights = self.cell_volumes / self.face_area_magnitudes
+
+    def to_patch_order(self, values):
+        values = np.asarray(values)
+        patch_values = np.empty_like(values)
+        patch_values[self.order] = values
+        return patch_values
+
+
+def points_hash(polyMesh_dir="constant/polyMesh"):
+    with open(os.path.join(polyMesh_dir, "points"), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load(polyMesh_dir="constant/polyMesh"):
+    """
+    Return the MeshGeometry of polyMesh_dir, computed once per mesh. A mesh is identified by the
+    hash of its points file, so a morphed or regenerated mesh is recomputed.
+    """
+    key = points_hash(polyMesh_dir)
+    if key not in cache:
+        if len(cache) >= cache_size:
+            cache.pop(next(iter(cache)))
+        cache[key] = MeshGeometry(polyMesh_dir)
+
+    return cache[key]
+
+
+def write_cell_centres(geometry, cell_centres_file="0/C", write_format='ascii'):
+    """
+    Write the cell centres and the patch face centres as volVectorField, like postProcess -func writeCellCentres.
+    """
+    blocks = []
+    for patch, entry in geometry.boundary.items():
+        if entry['type'] in ['empty', 'symmetryPlane']:
+            blocks.append(f"    {patch}\n    {{\n        type            {entry['type']};\n    }}\n".encode())
+        else:
+            values = foamFieldIO.format_list(geometry.face_centres[geometry.patch_slice(patch)], write_format)
+            blocks.append(f"    {patch}\n    {{\n        type            calculated;\n        value           nonuniform ".encode() + values + b";\n    }\n")
+
+    content = b''.join((
+        foamFieldIO.foam_header("volVectorField", "C", write_format, "0").encode(),
+        b"dimensions      [0 1 0 0 0 0 0];\n\n",
+        b"internalField   nonuniform ", foamFieldIO.format_list(geometry.cell_centres, write_format), b";\n\n",
+        b"boundaryField\n{\n", *blocks, b"}\n",
+        foamFieldIO.foam_footer.encode(),
+    ))
+
+    with open(cell_centres_file, "wb") as f:
+        f.write(content)
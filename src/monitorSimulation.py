@@ -1,115 +1,308 @@
 import os
+import re
+import csv
+import glob
 import time
-import subprocess
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+import commandRunner
+import foamFieldIO
+import stageTimer
+import timeDirectoryWatcher
 
 # PATHS & SETTINGS
 
-processor0_path = './processor0'
 control_dict_path = "./system/controlDict"
+rms_history_path = "./rms_history.csv"
+function_object_name = "rmsMonitor"
+function_object_dir = "./postProcessing/" + function_object_name
+function_object_poll_seconds = 1
 steady_count_required = 5
+residual_steady_steps = 100
 check_interval_seconds = 30
 fields = ['p', 'U', 'T', 'J', 'S_sat', 'N', 'Y']  # Fields to monitor
+solver_process = None  # Popen of the running solver, set by runSimulation.py
+exited_solver = None  # solver_process once check_solver() has seen it exit
 
 # ---------- RMS UTILS ----------
-def reconstruct_last_two_time_steps():
-    all_time_steps = sorted([float(d) for d in os.listdir('processor0')
-                             if os.path.isdir(os.path.join('processor0', d)) 
-                             and d not in ['0', 'constant']])
+def list_processor_dirs():
+    processor_dirs = [d for d in os.listdir('.')
+                      if d.startswith('processor') and d[len('processor'):].isdigit() and os.path.isdir(d)]
+
+    # Serial runs write their time directories into the case directory itself
+    return sorted(processor_dirs, key=lambda d: int(d[len('processor'):])) or ['.']
+
+def list_time_steps(path=None):
+    # Time directory names sorted by time, the names are kept to avoid float formatting mismatches.
+    # By default those of processor0, or of the case directory for serial runs
+    return commandRunner.time_directories(path or list_processor_dirs()[0])
+
+def last_two_time_steps():
+    all_time_steps = list_time_steps()
     
     if len(all_time_steps) < 2:
         return None
     
     last_two = [all_time_steps[-2], all_time_steps[-1]]
-    for ts in last_two:
-        subprocess.run(['reconstructPar', '-time', str(ts)],
-                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     print(f"Computing RMS errors from {last_two[0]} and {last_two[1]}...", flush=True)
     return last_two
 
-def calculate_rms_scalar_field(field_file):
-    with open(field_file, 'r') as f:
-        lines = f.readlines()
-    
-    values = []
-    start_reading = False
-    inside_internal_field = False
-
-    for line in lines:
-        line = line.strip()
-        if "internalField" in line:
-            inside_internal_field = True
-        if inside_internal_field and line.startswith("("):
-            start_reading = True
+def reconstruct_time_step(time_step):
+    # Serial runs already write their time directories into the case directory
+    if list_processor_dirs() == ['.']:
+        return
+    with stageTimer.substage('reconstructPar'):
+        commandRunner.run(['reconstructPar', '-time', str(time_step)])
+
+def check_solver():
+    """
+    Stop monitoring with an error as soon as the solver has failed, instead of waiting for times it will
+    not write. A solver that ended without error (e.g. at the endTime limit) is given one more check of
+    its output for convergence, after that True is returned and the monitor stops at its latest time.
+    """
+    global exited_solver
+    commandRunner.check(solver_process, "OpenFOAM_simulation.log")
+    if solver_process is None or solver_process.poll() is None:
+        return False
+    if exited_solver is solver_process:
+        return True
+    exited_solver = solver_process
+    return False
+
+def wait_for_solver(seconds):
+    # The time the monitor sleeps is reported separately in the stage timing of the run
+    with stageTimer.substage('monitor_wait'):
+        time.sleep(seconds)
+    return check_solver()
+
+def calculate_sum_of_squares(field_file):
+    values = foamFieldIO.read_internal_field(field_file)
+
+    # Vector fields contribute |U|^2 per cell
+    if values.ndim == 2:
+        return float(np.einsum('ij,ij->', values, values)), len(values)
+    return float(np.dot(values, values)), len(values)
+
+def compute_field_rms(time_step, executor=None):
+    # Reduce sum of squares and cell counts over the processor directories
+    processor_dirs = list_processor_dirs()
+
+    partials = {}
+    for field in fields:
+        field_files = [os.path.join(d, str(time_step), field) for d in processor_dirs]
+        if not all(os.path.exists(field_file) for field_file in field_files):
             continue
-        elif line.startswith(")"):
-            start_reading = False
-            inside_internal_field = False
+        if executor is None:
+            partials[field] = [calculate_sum_of_squares(field_file) for field_file in field_files]
+        else:
+            partials[field] = [executor.submit(calculate_sum_of_squares, field_file) for field_file in field_files]
 
-        if start_reading:
-            try:
-                values.append(float(line))
-            except ValueError:
-                continue
-                
-    return np.sqrt(np.mean(np.square(values))) if values else float('nan')
+    field_rms = {}
+    for field, results in partials.items():
+        if executor is not None:
+            results = [future.result() for future in results]
+        sum_of_squares = sum(result[0] for result in results)
+        count = sum(result[1] for result in results)
+        field_rms[field] = np.sqrt(sum_of_squares / count) if count else float('nan')
+
+    return field_rms
+
+def calculate_rms_scalar_field(field_file):
+    values = foamFieldIO.read_internal_field(field_file)
+
+    return np.sqrt(np.mean(np.square(values))) if values.size else float('nan')
 
 def calculate_rms_vector_field(field_file):
-    with open(field_file, 'r') as f:
-        lines = f.readlines()
+    values = foamFieldIO.read_internal_field(field_file)
 
-    values = []
-    start_reading = False
-    inside_internal_field = False
+    # |U|^2 summed over components, so no square root per cell is needed
+    return np.sqrt(np.mean(np.einsum('ij,ij->i', values, values))) if values.size else float('nan')
 
-    for line in lines:
-        line = line.strip()
-        if "internalField" in line:
-            inside_internal_field = True
-        if inside_internal_field and "(" in line and not start_reading:
-            start_reading = True
-            continue
-        if line == ");":
-            start_reading = False
-            inside_internal_field = False
-            continue
+class RMSCache:
+    """
+    RMS of the monitored fields per time, so that every field file is parsed only once.
+
+    Entries are appended to an optional CSV sidecar, from which a restarted monitor resumes.
+    Times with missing fields are not cached, so they are read again once completely written.
+    """
+    def __init__(self, sidecar_path=None):
+        self.sidecar_path = sidecar_path
+        self.values = {}
+        if sidecar_path is not None and os.path.exists(sidecar_path):
+            self.values = read_rms_history(sidecar_path)
+            print(f"Resuming from {len(self.values)} cached RMS entries in {sidecar_path}.", flush=True)
 
-        if start_reading:
+    def get(self, time_step, executor=None):
+        time_step = str(time_step)
+        if time_step in self.values:
+            return self.values[time_step]
+
+        field_rms = compute_field_rms(time_step, executor)
+        if all(field in field_rms for field in fields):
+            self.add(time_step, field_rms)
+        return field_rms
+
+    def add(self, time_step, field_rms):
+        self.values[str(time_step)] = field_rms
+        self._append(str(time_step), field_rms)
+
+    def _append(self, time_step, field_rms):
+        if self.sidecar_path is None:
+            return
+        write_header = not os.path.exists(self.sidecar_path)
+        with open(self.sidecar_path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(['time'] + fields)
+            writer.writerow([time_step] + [repr(float(field_rms[field])) for field in fields])
+
+    def history(self):
+        # Times and per-field RMS arrays in chronological order, for trend analysis and plotting
+        time_steps = sorted(self.values, key=float)
+        times = np.array([float(t) for t in time_steps])
+        return times, {field: np.array([self.values[t].get(field, np.nan) for t in time_steps]) for field in fields}
+
+def read_rms_history(sidecar_path):
+    values = {}
+    with open(sidecar_path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            time_step = row.pop('time')
             try:
-                vec = np.array([float(n) for n in line.strip("() ").split()])
-                if len(vec) == 3:
-                    values.append(np.linalg.norm(vec))
+                values[time_step] = {field: float(value) for field, value in row.items() if value not in (None, '')}
             except ValueError:
-                continue
-
-    return np.sqrt(np.mean(np.square(values))) if values else float('nan')
+                continue  # partially written line of an interrupted monitor
+    return values
 
-def compute_rms_errors(time_steps):
-    field_rms_values = []
-    for time_step in time_steps:
-        field_rms = {}
-        time_path = str(time_step)
-        for field in fields:
-            field_file = os.path.join(time_path, field)
-            if not os.path.exists(field_file):
-                continue
-            if field == 'U':
-                rms = calculate_rms_vector_field(field_file)
-            else:
-                rms = calculate_rms_scalar_field(field_file)
-            field_rms[field] = rms
-        field_rms_values.append(field_rms)
+def compute_rms_errors(time_steps, executor=None, cache=None):
+    if cache is None:
+        field_rms_values = [compute_field_rms(time_step, executor) for time_step in time_steps]
+    else:
+        field_rms_values = [cache.get(time_step, executor) for time_step in time_steps]
     
     if len(field_rms_values) == 2:
-        rms_errors = {}
-        for field in fields:
-            v1 = field_rms_values[0].get(field)
-            v2 = field_rms_values[1].get(field)
-            if v1 is not None and v2 is not None and v2 != 0:
-                rms_errors[field] = abs(v2 - v1) / abs(v2)
-        return rms_errors
+        return compute_relative_errors(field_rms_values[0], field_rms_values[1])
     return {}
 
+def compute_relative_errors(previous_rms, current_rms):
+    rms_errors = {}
+    for field in fields:
+        v1 = previous_rms.get(field)
+        v2 = current_rms.get(field)
+        if v1 is not None and v2 is not None and v2 != 0:
+            rms_errors[field] = abs(v2 - v1) / abs(v2)
+    return rms_errors
+
+def update_steady_count(rms_errors, convergence_thresholds, steady_count):
+    print(f"RMS Errors: {rms_errors}", flush=True)
+
+    # Without any compared field nothing is known about convergence
+    if not rms_errors:
+        print("No RMS errors to compare, steady count unchanged.", flush=True)
+        return steady_count
+
+    # Check all fields against their individual convergence thresholds
+    converged_fields = []
+    unconverged_fields = []
+    
+    for field, error in rms_errors.items():
+        threshold = convergence_thresholds.get(field)
+        if error < threshold:
+            converged_fields.append(field)
+        else:
+            unconverged_fields.append((field, error, threshold))
+    
+    if len(unconverged_fields) == 0:
+        steady_count += 1
+        print(f"All fields below thresholds. Steady count: {steady_count}/{steady_count_required}", flush=True)
+    else:
+        steady_count = 0
+        print("Unconverged fields:", flush=True)
+        for field, err, thresh in unconverged_fields:
+            print(f"   - {field}: {err:.3e} > threshold {thresh:.3e}", flush=True)
+
+    return steady_count
+
+class VolFieldValueTail:
+    """
+    Follow the volFieldValue.dat file of the injected rmsMonitor function object.
+
+    Only bytes appended since the previous call are read. Yields (time, {field: rms}) samples,
+    where the RMS is the square root of the cell average of magSqr(field). Samples without all
+    monitored fields are skipped.
+    """
+    def __init__(self, output_dir=function_object_dir):
+        self.output_dir = output_dir
+        self.file_path = None
+        self.offset = 0
+        self.remainder = b''
+        self.columns = None
+
+    def _latest_file(self):
+        # A restarted solver writes volFieldValue_<time>.dat into a new time directory
+        files = glob.glob(os.path.join(self.output_dir, '*', 'volFieldValue*.dat'))
+        return max(files, key=os.path.getmtime) if files else None
+
+    def read_samples(self):
+        file_path = self._latest_file()
+        if file_path is None:
+            return []
+        if file_path != self.file_path:
+            self.file_path, self.offset, self.remainder, self.columns = file_path, 0, b'', None
+
+        with open(file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+
+        # Keep an incomplete last line for the next call
+        lines = (self.remainder + data).split(b'\n')
+        self.remainder = lines.pop()
+
+        samples = []
+        for line in lines:
+            line = line.decode().strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                names = line[1:].split()
+                if names and names[0] == 'Time':
+                    self.columns = [re.sub(r'^average\(magSqr_(.*)\)$', r'\1', name) for name in names[1:]]
+                    missing = [field for field in fields if field not in self.columns]
+                    if missing:
+                        print(f"Warning: no column for {', '.join(missing)} in {file_path}, its samples are skipped.", flush=True)
+                continue
+            if self.columns is None:
+                continue
+            values = line.split()
+            try:
+                sample_time = float(values[0])
+                mean_squares = [float(v) for v in values[1:]]
+            except ValueError:
+                continue
+            field_rms = {field: np.sqrt(v) for field, v in zip(self.columns, mean_squares)}
+            if all(field in field_rms for field in fields):
+                samples.append((sample_time, field_rms))
+
+        return samples
+
+def read_control_dict_entry(keyword):
+    with open(control_dict_path, "r") as f:
+        match = re.search(rf'^\s*{keyword}\s+([^;]+);', f.read(), re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+def stop_at_time_step(time_step):
+    print("\nSteady state reached based on RMS. Stopping simulation.\n", flush=True)
+    update_control_dict(time_step)  # Update endTime
+    reconstruct_time_step(time_step)  # Only the converged time is reconstructed
+
+def stop_at_latest_time():
+    # The solver ended without error before convergence was detected, e.g. at the endTime limit
+    print("\nWarning: the solver ended before convergence was detected, using the latest time.\n", flush=True)
+    time_steps = list_time_steps()
+    if time_steps:
+        reconstruct_time_step(time_steps[-1])
+
 # ---------- SIMULATION MONITOR ----------
 def update_control_dict(new_end_time):
     with open(control_dict_path, "r") as f:
@@ -122,56 +315,271 @@ def update_control_dict(new_end_time):
             else:
                 f.write(line)
 
-def check_rms(convergence_thresholds):
+def update_stop_at(stop_at):
+    with open(control_dict_path, "r") as f:
+        lines = f.readlines()
+
+    with open(control_dict_path, "w") as f:
+        for line in lines:
+            if line.strip().startswith("stopAt"):
+                f.write(f"stopAt          {stop_at};\n")
+            else:
+                f.write(line)
+
+def update_function_objects(enabled, sample_steps=1):
+    # Inject (or remove) the function objects that compute the monitored RMS values in the solver.
+    # magSqr of each field is averaged over the cells, so sqrt(average) is the cell RMS of the field.
+    begin_marker = "// monitorSimulation function objects\n"
+    end_marker = "// end of monitorSimulation function objects\n"
+
+    with open(control_dict_path, "r") as f:
+        content = f.read()
+
+    start = content.find(begin_marker)
+    if start >= 0:
+        end = content.index(end_marker, start) + len(end_marker)
+        if content[end:end + 1] == "\n":
+            end += 1  # blank line added after the block on injection
+        content = content[:start] + content[end:]
+
+    if enabled:
+        block = begin_marker + "functions\n{\n"
+        for field in fields:
+            block += (f"    magSqr_{field}\n    {{\n"
+                      f"        type            magSqr;\n"
+                      f"        libs            (fieldFunctionObjects);\n"
+                      f"        field           {field};\n"
+                      f"        result          magSqr_{field};\n"
+                      f"        executeControl  timeStep;\n"
+                      f"        writeControl    none;\n"
+                      f"    }}\n")
+        block += (f"    {function_object_name}\n    {{\n"
+                  f"        type            volFieldValue;\n"
+                  f"        libs            (fieldFunctionObjects);\n"
+                  f"        fields          ({' '.join('magSqr_' + field for field in fields)});\n"
+                  f"        operation       average;\n"
+                  f"        regionType      all;\n"
+                  f"        writeFields     false;\n"
+                  f"        log             false;\n"
+                  f"        executeControl  timeStep;\n"
+                  f"        writeControl    timeStep;\n"
+                  f"        writeInterval   {sample_steps};\n"
+                  f"    }}\n")
+        block += "}\n" + end_marker
+
+        # Place the block before the closing banner of the dictionary
+        banner = content.rfind("// ****")
+        if banner < 0:
+            banner = len(content)
+        content = content[:banner] + block + "\n" + content[banner:]
+
+    with open(control_dict_path, "w") as f:
+        f.write(content)
+
+def update_write_format(write_format):
+    if write_format not in ('ascii', 'binary'):
+        raise ValueError(f"Unknown write format {write_format}.")
+
+    with open(control_dict_path, "r") as f:
+        lines = f.readlines()
+
+    with open(control_dict_path, "w") as f:
+        for line in lines:
+            if line.strip().startswith("writeFormat"):
+                f.write(f"writeFormat     {write_format};\n")
+            else:
+                f.write(line)
+
+def check_rms(convergence_thresholds, max_workers=None, monitor_mode='poll', rms_history_file=None):
+    if monitor_mode == 'event':
+        return check_rms_events(convergence_thresholds, max_workers, rms_history_file)
+    elif monitor_mode == 'functionObject':
+        return check_rms_function_objects(convergence_thresholds, rms_history_file)
+    elif monitor_mode != 'poll':
+        raise ValueError(f"Unknown monitor mode {monitor_mode}.")
+
     print("Running simulation & monitoring convergence based on RMS error...", flush=True)
     last_checked = set()
     steady_count = 0
 
+    # Processor files are parsed in parallel, the pool is kept for the whole run and shut down on errors too
+    cache = RMSCache(rms_history_file)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            try:
+                time_dirs = list_time_steps()
+
+                # Check if new time steps appeared
+                new_dirs = set(time_dirs) - last_checked
+                if len(time_dirs) >= 2 and new_dirs:
+                    print(f"\nNew time steps detected: {sorted(new_dirs, key=float)}", flush=True)
+                    last_checked = set(time_dirs)
+
+                    last_two = last_two_time_steps()
+                    if last_two is not None:
+                        rms_errors = compute_rms_errors(last_two, executor, cache)
+                        steady_count = update_steady_count(rms_errors, convergence_thresholds, steady_count)
+
+                        if steady_count >= steady_count_required:
+                            stop_at_time_step(last_two[-1])
+                            return
+
+                if wait_for_solver(check_interval_seconds):
+                    break
+
+            except commandRunner.CommandError:
+                raise
+            except Exception as e:
+                print(f"Error: {e}", flush=True)
+                if wait_for_solver(check_interval_seconds):
+                    break
+
+    stop_at_latest_time()
+
+def check_rms_events(convergence_thresholds, max_workers=None, rms_history_file=None):
+    print("Running simulation & monitoring convergence based on RMS error (event-driven)...", flush=True)
+    previous_rms = None
+    steady_count = 0
+
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    cache = RMSCache(rms_history_file)
+    watcher = timeDirectoryWatcher.TimeDirectoryWatcher(list_processor_dirs(), fields, poll_interval=check_interval_seconds)
+
+    try:
+        while True:
+            # Every completely written time is compared with the one before it, each exactly once
+            with stageTimer.substage('monitor_wait'):
+                time_steps = watcher.wait(timeout=check_interval_seconds)
+            solver_ended = check_solver()
+            for time_step in time_steps:
+                print(f"\nNew time step completed: {time_step}", flush=True)
+                try:
+                    field_rms = cache.get(time_step, executor)
+                except Exception as e:
+                    print(f"Error: {e}", flush=True)
+                    continue
+
+                if previous_rms is not None:
+                    rms_errors = compute_relative_errors(previous_rms, field_rms)
+                    steady_count = update_steady_count(rms_errors, convergence_thresholds, steady_count)
+
+                    if steady_count >= steady_count_required:
+                        stop_at_time_step(time_step)
+                        return
+                previous_rms = field_rms
+
+            if solver_ended:
+                stop_at_latest_time()
+                return
+    finally:
+        watcher.close()
+        executor.shutdown()
+
+def stop_and_write_now(timeout_seconds=600):
+    # Let the solver write the converged state at its current time step, then stop
+    print("\nSteady state reached based on RMS. Writing current time & stopping simulation.\n", flush=True)
+    existing_times = set(list_time_steps())
+    watcher = timeDirectoryWatcher.TimeDirectoryWatcher(list_processor_dirs(), fields, poll_interval=check_interval_seconds)
+    update_stop_at("writeNow")
+
+    final_time = None
+    deadline = time.monotonic() + timeout_seconds
+    try:
+        while final_time is None and time.monotonic() < deadline:
+            timeout = min(function_object_poll_seconds, deadline - time.monotonic())
+            new_times = [t for t in watcher.wait(timeout=timeout) if t not in existing_times]
+            if new_times:
+                final_time = new_times[-1]
+            elif solver_process is not None and solver_process.poll() is not None:
+                # The solver has stopped, it will not write any more times
+                break
+    finally:
+        watcher.close()
+        update_stop_at("endTime")
+
+    if final_time is None:
+        # The solver did not write in time (e.g. it had already stopped), use its latest time
+        print("No new time written by the solver, using the latest time.", flush=True)
+        final_time = list_time_steps()[-1]
+
+    update_control_dict(final_time)
+    reconstruct_time_step(final_time)  # Only the converged time is reconstructed
+    return final_time
+
+def check_rms_function_objects(convergence_thresholds, rms_history_file=None):
+    print("Running simulation & monitoring convergence based on function object RMS...", flush=True)
+    steady_count = 0
+    reference = None
+
+    # Samples are compared one write interval apart, as in the field based monitors
+    comparison_interval = float(read_control_dict_entry("writeInterval"))
+    cache = RMSCache(rms_history_file)
+    tail = VolFieldValueTail()
+
     while True:
         try:
-            time_dirs = [float(d) for d in os.listdir(processor0_path)
-                         if os.path.isdir(os.path.join(processor0_path, d)) and d not in ['0', 'constant']]
-            time_dirs = sorted(time_dirs)
-
-            # Check if new time steps appeared
-            new_dirs = set(time_dirs) - last_checked
-            if len(time_dirs) >= 2 and new_dirs:
-                print(f"\nNew time steps detected: {sorted(new_dirs)}", flush=True)
-                last_checked = set(time_dirs)
-
-                last_two = reconstruct_last_two_time_steps()
-                if last_two is not None:
-                    rms_errors = compute_rms_errors(last_two)
-                    print(f"RMS Errors: {rms_errors}", flush=True)
-
-                    # Check all fields against their individual convergence thresholds
-                    converged_fields = []
-                    unconverged_fields = []
-                    
-                    for field, error in rms_errors.items():
-                        threshold = convergence_thresholds.get(field)
-                        if error < threshold:
-                            converged_fields.append(field)
-                        else:
-                            unconverged_fields.append((field, error, threshold))
-                    
-                    if len(unconverged_fields) == 0:
-                        steady_count += 1
-                        print(f"All fields below thresholds. Steady count: {steady_count}/{steady_count_required}", flush=True)
-                    else:
-                        steady_count = 0
-                        print("Unconverged fields:", flush=True)
-                        for field, err, thresh in unconverged_fields:
-                            print(f"   - {field}: {err:.3e} > threshold {thresh:.3e}", flush=True)
+            for sample_time, field_rms in tail.read_samples():
+                if reference is not None and sample_time - reference[0] < comparison_interval * (1 - 1e-6):
+                    continue
 
+                cache.add(repr(sample_time), field_rms)
+                if reference is not None:
+                    print(f"\nComparing function object RMS at {reference[0]:g} and {sample_time:g}", flush=True)
+                    rms_errors = compute_relative_errors(reference[1], field_rms)
+                    steady_count = update_steady_count(rms_errors, convergence_thresholds, steady_count)
 
                     if steady_count >= steady_count_required:
-                        print("\nSteady state reached based on RMS. Stopping simulation.\n", flush=True)
-                        update_control_dict(last_two[-1])  # Update endTime
-                        break
+                        stop_and_write_now()
+                        return
+                reference = (sample_time, field_rms)
 
-            time.sleep(check_interval_seconds)
+            if wait_for_solver(function_object_poll_seconds):
+                break
 
+        except commandRunner.CommandError:
+            raise
         except Exception as e:
             print(f"Error: {e}", flush=True)
-            time.sleep(check_interval_seconds)
+            if wait_for_solver(function_object_poll_seconds):
+                break
+
+    stop_at_latest_time()
+
+def check_residuals(solver_log, residual_thresholds, steady_steps=residual_steady_steps):
+    # Without thresholds every time step would count as steady
+    if not residual_thresholds:
+        raise ValueError("No residual thresholds given.")
+    print("Running simulation & monitoring convergence based on solver residuals...", flush=True)
+    index = 0
+    steady_count = 0
+    last_report = time.monotonic()
+
+    while True:
+        records = solver_log.records_since(index)
+        index += len(records)
+
+        # Initial residuals of every listed variable must stay below threshold for steady_steps steps
+        for record in records:
+            residuals = record['residuals']
+            if all(residuals.get(variable, np.inf) < threshold for variable, threshold in residual_thresholds.items()):
+                steady_count += 1
+            else:
+                steady_count = 0
+
+            if steady_count >= steady_steps:
+                print(f"\nResiduals below thresholds for {steady_steps} time steps at t = {record['time']:g}.", flush=True)
+                stop_and_write_now()
+                return
+
+        if records and time.monotonic() - last_report >= check_interval_seconds:
+            last_report = time.monotonic()
+            residuals = records[-1]['residuals']
+            print(f"\nt = {records[-1]['time']:g}, steady steps: {steady_count}/{steady_steps}", flush=True)
+            for variable, threshold in residual_thresholds.items():
+                print(f"   - {variable}: {residuals.get(variable, float('nan')):.3e} (threshold {threshold:.3e})", flush=True)
+
+        if wait_for_solver(function_object_poll_seconds):
+            break
+
+    stop_at_latest_time()
@@ -0,0 +1,165 @@
+import os
+import re
+import numpy as np
+
+import foamFieldIO
+
+list_size_pattern = re.compile(rb'(\d+)\s*\(')
+header_end_pattern = re.compile(rb'\bFoamFile\s*\{[^}]*\}')
+boundary_patch_pattern = re.compile(rb'([^\s{}()]+)\s*\{([^}]*)\}')
+boundary_entry_pattern = re.compile(rb'(\w+)\s+([^;]+);')
+parentheses_to_spaces = bytes.maketrans(b'()', b'  ')
+
+
+def _label_dtype(content):
+    arch = foamFieldIO.arch_pattern.search(content)
+    arch = arch.group(1).decode() if arch else foamFieldIO.binary_arch
+    byte_order = '>' if 'MSB' in arch else '<'
+    label_bits = re.search(r'label=(\d+)', arch)
+    label_bytes = int(label_bits.group(1)) // 8 if label_bits else 4
+
+    return np.dtype(f'{byte_order}i{label_bytes}')
+
+
+def _header_end(content):
+    match = header_end_pattern.search(content)
+    if not match:
+        raise ValueError("No FoamFile header found.")
+    return match.end()
+
+
+def _parse_plain_list(content, pos, n_components, dtype=None):
+    # Parse a "N ( ... )" list without type prefix, as used in the polyMesh files.
+    # Returns the values, the payload start and the position after the closing parenthesis.
+    match = list_size_pattern.search(content, pos)
+    if not match:
+        raise ValueError(f"Could not find a list at position {pos}.")
+    size = int(match.group(1))
+    start = match.end()
+
+    if dtype is not None:
+        count = size * n_components
+        end = start + count * dtype.itemsize
+        if content[end:end + 1] != b')':
+            raise ValueError(f"Binary list of size {size} is not terminated by ')'.")
+        values = np.frombuffer(content, dtype=dtype, count=count, offset=start)
+        return values.reshape(size, n_components) if n_components > 1 else values, start, end + 1
+
+    if n_components > 1:
+        match = foamFieldIO.vector_list_end_pattern.search(content, start)
+        end = match.start() + 1 if match else content.index(b')', start)
+        list_end = match.end() if match else end + 1
+        values = np.fromstring(content[start:end].translate(None, b'()'), sep=' ')
+    else:
+        end = content.index(b')', start)
+        list_end = end + 1
+        values = np.fromstring(content[start:end], sep=' ')
+
+    if values.size != size * n_components:
+        raise ValueError(f"Expected {size} list entries but read {values.size // n_components}.")
+
+    return values.reshape(size, n_components) if n_components > 1 else values, start, list_end
+
+
+def read_points(polyMesh_dir="constant/polyMesh"):
+    content = foamFieldIO.read_file(os.path.join(polyMesh_dir, "points"))
+    points, _, _ = _parse_plain_list(content, _header_end(content), 3, foamFieldIO._binary_dtype(content))
+
+    return np.array(points, dtype=np.float64)
+
+
+def write_points(points, polyMesh_dir="constant/polyMesh"):
+    """
+    Replace the point coordinates in constant/polyMesh/points, keeping the header and format of the file.
+    """
+    points_file = os.path.join(polyMesh_dir, "points")
+    content = foamFieldIO.read_file(points_file)
+    dtype = foamFieldIO._binary_dtype(content)
+    old_points, start, end = _parse_plain_list(content, _header_end(content), 3, dtype)
+
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape != old_points.shape:
+        raise ValueError(f"Expected {len(old_points)} points but got {len(points)}.")
+
+    if dtype is not None:
+        payload = memoryview(np.ascontiguousarray(points, dtype=dtype)).cast('B')
+        new_content = b''.join((content[:start], payload, content[end - 1:]))
+    else:
+        rows = '\n'.join(f"({x} {y} {z})" for x, y, z in points.tolist())
+        new_content = b''.join((content[:start], f"\n{rows}\n".encode(), content[end - 1:]))
+
+    with open(points_file, "wb") as f:
+        f.write(new_content)
+
+
+def read_faces(polyMesh_dir="constant/polyMesh"):
+    """
+    Read constant/polyMesh/faces (ascii faceList or binary faceCompactList) into an
+    (n_faces, n_points_per_face) array of point labels. All faces must have the same number
+    of points, which holds for the hexahedral meshes created from the transfinite Gmsh blocks.
+    """
+    content = foamFieldIO.read_file(os.path.join(polyMesh_dir, "faces"))
+    pos = _header_end(content)
+
+    if foamFieldIO.read_format(content) == 'binary':
+        dtype = _label_dtype(content)
+        offsets, _, pos = _parse_plain_list(content, pos, 1, dtype)
+        labels, _, _ = _parse_plain_list(content, pos, 1, dtype)
+        sizes = np.diff(offsets)
+    else:
+        # "N ( n(a b ...) n(...) ... )": face sizes and labels interleaved once the parentheses are dropped
+        match = list_size_pattern.search(content, pos)
+        n_faces = int(match.group(1))
+        tokens = np.fromstring(content[match.end():content.rindex(b')')].translate(parentheses_to_spaces), sep=' ').astype(np.int64)
+        n_points = int(tokens[0]) if n_faces else 0
+        if tokens.size != n_faces * (n_points + 1) or np.any(tokens[::n_points + 1] != n_points):
+            raise ValueError("Only meshes with a single face type are supported.")
+        return tokens.reshape(n_faces, n_points + 1)[:, 1:]
+
+    if sizes.size and np.any(sizes != sizes[0]):
+        raise ValueError("Only meshes with a single face type are supported.")
+
+    return np.asarray(labels, dtype=np.int64).reshape(len(sizes), -1)
+
+
+def read_labels(name, polyMesh_dir="constant/polyMesh"):
+    # owner or neighbour list
+    content = foamFieldIO.read_file(os.path.join(polyMesh_dir, name))
+    dtype = _label_dtype(content) if foamFieldIO.read_format(content) == 'binary' else None
+    labels, _, _ = _parse_plain_list(content, _header_end(content), 1, dtype)
+
+    return np.asarray(labels, dtype=np.int64)
+
+
+def read_boundary(polyMesh_dir="constant/polyMesh"):
+    """
+    Read constant/polyMesh/boundary into a dictionary of patch name -> {'type', 'nFaces', 'startFace'}.
+    """
+    content = foamFieldIO.read_file(os.path.join(polyMesh_dir, "boundary"))
+    pos = _header_end(content)
+
+    patches = {}
+    for match in boundary_patch_pattern.finditer(content, content.index(b'(', pos)):
+        entries = dict(boundary_entry_pattern.findall(match.group(2)))
+        patches[match.group(1).decode()] = {
+            'type': entries[b'type'].decode(),
+            'nFaces': int(entries[b'nFaces']),
+            'startFace': int(entries[b'startFace']),
+        }
+
+    return patches
+
+
+def patch_faces(patch, polyMesh_dir="constant/polyMesh", faces=None):
+    boundary = read_boundary(polyMesh_dir)
+    if patch not in boundary:
+        raise ValueError(f"No patch {patch} found in boundary file.")
+    if faces is None:
+        faces = read_faces(polyMesh_dir)
+
+    start = boundary[patch]['startFace']
+    return faces[start:start + boundary[patch]['nFaces']]
+
+
+def patch_point_labels(patch, polyMesh_dir="constant/polyMesh", faces=None):
+    return np.unique(patch_faces(patch, polyMesh_dir, faces))
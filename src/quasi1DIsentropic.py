@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.optimize import fsolve
 
 # Constants
 gamma = 1.333
@@ -12,10 +11,79 @@ def area_mach_relation(M, A_Astar):
     term2 = (gamma + 1) / (2 * (gamma - 1))
     return A_Astar - (1 / M) * term1**term2
 
-def compute_mach_from_area_ratio(A_Astar, subsonic=True):
-    M_guess = 0.2 if subsonic else 2.0
-    M_solution, = fsolve(area_mach_relation, M_guess, args=(A_Astar))
-    return M_solution
+def mach_from_area_ratio(A_Astar, supersonic, gamma=gamma, tolerance=1e-12, max_iterations=100):
+    """
+    Invert the area-Mach relation for an array of area ratios at once.
+
+    supersonic (bool array or scalar) selects the branch, M <= 1 or M >= 1, of every point. Each Mach
+    number is kept inside a bracket of its branch, Newton steps on log(A/A*) that leave the bracket are
+    replaced by bisection, so the solution always lies on the requested branch. Area ratios below 1
+    are treated as the throat, M = 1.
+    """
+    A_Astar = np.maximum(np.asarray(A_Astar, dtype=np.float64), 1.0)
+    supersonic = np.broadcast_to(supersonic, A_Astar.shape)
+    exponent = (gamma + 1) / (2 * (gamma - 1))
+    log_target = np.log(A_Astar)
+
+    def log_area_ratio(M):
+        return exponent * np.log((2 / (gamma + 1)) * (1 + ((gamma - 1) / 2) * M**2)) - np.log(M)
+
+    # Brackets: the area ratio decreases with M on the subsonic branch and increases on the supersonic one
+    lower = np.where(supersonic, 1.0, 1e-12)
+    upper = np.where(supersonic, 2.0, 1.0)
+    while True:
+        too_low = supersonic & (log_area_ratio(upper) < log_target)
+        if not np.any(too_low):
+            break
+        lower = np.where(too_low, upper, lower)
+        upper = np.where(too_low, 2 * upper, upper)
+
+    # Start from the expansion around the throat, log(A/A*) ~ 2 / (gamma + 1) * (M - 1)^2
+    M = 1 + np.where(supersonic, 1, -1) * np.sqrt((gamma + 1) / 2 * log_target)
+    M = np.where((M > lower) & (M < upper), M, 0.5 * (lower + upper))
+
+    # Iterate only the points that have not converged yet
+    M, lower, upper = M.ravel(), lower.ravel(), upper.ravel()
+    supersonic, log_target = supersonic.ravel(), log_target.ravel()
+    M[log_target == 0] = 1.0
+    active = np.flatnonzero(log_target > 0)
+    for _ in range(max_iterations):
+        m = M[active]
+        residual = log_area_ratio(m) - log_target[active]
+
+        # Shrink the bracket around the root, the sign of the residual tells on which side M lies
+        above_root = (residual > 0) == supersonic[active]
+        lower[active] = np.where(above_root, lower[active], m)
+        upper[active] = np.where(above_root, m, upper[active])
+
+        derivative = (m**2 - 1) / (m * (1 + ((gamma - 1) / 2) * m**2))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m_new = m - residual / derivative
+        inside = (m_new > lower[active]) & (m_new < upper[active])
+        m_new = np.where(inside, m_new, 0.5 * (lower[active] + upper[active]))
+        m_new = np.where(residual == 0, m, m_new)
+
+        M[active] = m_new
+        active = active[np.abs(m_new - m) > tolerance * m]
+        if active.size == 0:
+            break
+
+    return M.reshape(A_Astar.shape)
+
+
+def supersonic_points(dA_dx, throat_index):
+    # Points up to the throat are subsonic. Downstream the flow turns subsonic after a converging
+    # point and supersonic again after a diverging one, so the regime of a point follows the sign of
+    # the last nonzero dA/dx before it, starting supersonic behind the throat.
+    supersonic = np.zeros(len(dA_dx), dtype=bool)
+    if throat_index + 1 >= len(dA_dx):
+        return supersonic
+
+    state = np.r_[1.0, np.sign(dA_dx[throat_index + 1:-1])]
+    last_nonzero = np.maximum.accumulate(np.where(state != 0, np.arange(len(state)), 0))
+    supersonic[throat_index + 1:] = state[last_nonzero] > 0
+
+    return supersonic
 
 def isentropic_properties(M):
     T_T0 = 1 / (1 + ((gamma - 1) / 2) * M**2)
@@ -36,28 +104,16 @@ def compute_flow_variables(wall_coordinates_x, wall_coordinates_y, cell_centers_
     throat_index = np.argmin(A)
     A_star = A[throat_index]
     A_ratio = A / A_star
-    Mach = np.zeros_like(A)
-
-    for i in range(0, throat_index + 1):
-        Mach[i] = compute_mach_from_area_ratio(A_ratio[i], subsonic=True)
-
-    regime = "supersonic"
-    for i in range(throat_index + 1, len(A)):
-        if regime == "supersonic":
-            Mach[i] = compute_mach_from_area_ratio(A_ratio[i], subsonic=False)
-            if dA_dx[i] < 0:
-                regime = "subsonic"
-        else:
-            Mach[i] = compute_mach_from_area_ratio(A_ratio[i], subsonic=True)
-            if dA_dx[i] > 0:
-                regime = "supersonic"
+
+    Mach = mach_from_area_ratio(A_ratio, supersonic_points(dA_dx, throat_index), gamma)
 
     T_T0, p_p0 = isentropic_properties(Mach)
     T = T_T0 * T0
     p = p_p0 * p0
     velocity = velocity_magnitude(T, Mach)
 
-    # Interpolate onto cell_centers_x
+    # Interpolate onto cell_centers_x, which may have any size or shape
+    cell_centers_x = np.asarray(cell_centers_x, dtype=np.float64)
     p_interp = np.interp(cell_centers_x, x, p)
     T_interp = np.interp(cell_centers_x, x, T)
     Mach_interp = np.interp(cell_centers_x, x, Mach)
@@ -7,177 +7,38 @@ Created on Tue Apr 22 23:11:02 2025
 
 import numpy as np
 import matplotlib.pyplot as plt
-import re
+
+import foamFieldIO
 
   
-def extract_internal_field_vectors(file_path):
-    with open(file_path, 'r') as f:
-        content = f.read()
+def get_wall_cells(mesh_geometry, patch='outerwall'):
+    # Cells next to the wall are the owners of the wall patch faces, ordered along x. Copies are
+    # returned because the wall coordinates are modified in place during the wall evolution.
+    wall = mesh_geometry.wall(patch)
 
-    # Match internalField block
-    internal_match = re.search(
-        r'internalField\s+nonuniform\s+List<vector>\s+(\d+)\s*\((.*?)\)\s*;',
-        content, re.DOTALL
-    )
+    return wall.cell_centres.copy(), wall.face_centres.copy(), wall.cells.copy()
 
-    if not internal_match:
-        raise ValueError("No internalField block found.")
+def compute_wall_cell_sizes(mesh_geometry, patch='outerwall'):
+    # Lengths along the wall and heights normal to the wall of the wall cells, ordered along x
+    wall = mesh_geometry.wall(patch)
 
-    vector_data = internal_match.group(2).strip()
-    vector_lines = vector_data.split('\n')
+    return wall.face_lengths.copy(), wall.cell_heights.copy()
 
-    vectors = []
-    for line in vector_lines:
-        line = line.strip()
-        if line.startswith('(') and line.endswith(')'):
-            vector = tuple(map(float, line[1:-1].split()))
-            vectors.append(vector)
+def read_static_field(field_file, top_wall_indices):
+    values = foamFieldIO.read_internal_field(field_file)
 
-    return np.array(vectors)
+    return values[top_wall_indices] if values.size else float('nan')
 
 
-def extract_outerwall_vectors(file_path):
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-  
-    outerwall_match = re.search(r'outerwall\s*\{(.*?)\}', content, re.DOTALL)
-    if not outerwall_match:
-        raise ValueError("No outerwall patch found.")
-
-    outerwall_block = outerwall_match.group(1)
-
-    value_match = re.search(r'value\s+(uniform|nonuniform)\s+(List<vector>\s+\d+\s*)?\((.*?)\)\s*;', outerwall_block, re.DOTALL)
-    if not value_match:
-        simple_match = re.search(r'value\s+uniform\s+\(([^)]+)\)\s*;', outerwall_block)
-        if simple_match:
-            vector = tuple(map(float, simple_match.group(1).split()))
-            return np.array([vector])
-        else:
-            raise ValueError("No vector values found in outerwall patch.")
-
-    vector_data = value_match.group(3).strip()
-    vector_lines = vector_data.split('\n')
-
-    vectors = []
-    for line in vector_lines:
-        line = line.strip()
-        if line.startswith('(') and line.endswith(')'):
-            vector = tuple(map(float, line[1:-1].split()))
-            vectors.append(vector)
-
-    return np.array(vectors)
-
-
-def get_wall_cells(c_file_path, points_per_column):
-    outerwall_vectors = extract_outerwall_vectors(c_file_path)
-    internal_vectors = extract_internal_field_vectors(c_file_path)
-
-    # Sort internal vectors by x then y
-    sorted_indices = np.lexsort((internal_vectors[:, 1], internal_vectors[:, 0]))
-    internal_sorted = internal_vectors[sorted_indices]
-
-    x = internal_sorted[:, 0]
-
-    top_wall_indices_in_original = []
-
-    # Group into vertical slices
-    for i in range(0, len(x), points_per_column - 1):
-        col_indices = sorted_indices[i:i + points_per_column - 1]
-        col_vectors = internal_vectors[col_indices]
-        sorted_col_idx = np.argsort(col_vectors[:, 1])
-        top_idx_in_col = col_indices[sorted_col_idx[-1]]  # Index of top-most point in original array
-        top_wall_indices_in_original.append(top_idx_in_col)
-
-    top_wall_indices = np.array(top_wall_indices_in_original)
-    top_wall_cells = internal_vectors[top_wall_indices_in_original]
-
-    return np.array(top_wall_cells), np.array(outerwall_vectors), np.array(top_wall_indices)
-
-def compute_wall_cell_sizes(top_wall_cells, outerwall_vectors):
-    # Cell height = vertical distance from outerwall point to top wall cell
-    cell_heights = outerwall_vectors[:, 1] - top_wall_cells[:, 1]
-
-    # Cell length = average horizontal spacing between adjacent top wall + outerwall cells
-    cell_lengths = np.zeros(len(top_wall_cells))
-    for i in range(len(top_wall_cells)):
-        if i == 0:
-            cell_lengths_top = np.linalg.norm(top_wall_cells[i + 1] - top_wall_cells[i])
-            cell_lengths_outerwall = np.linalg.norm(outerwall_vectors[i + 1] - outerwall_vectors[i])
-        elif i == len(top_wall_cells) - 1:
-            cell_lengths_top = np.linalg.norm(top_wall_cells[i] - top_wall_cells[i - 1])
-            cell_lengths_outerwall = np.linalg.norm(outerwall_vectors[i] - outerwall_vectors[i - 1])
-        else:
-            left_top = np.linalg.norm(top_wall_cells[i] - top_wall_cells[i - 1])
-            right_top = np.linalg.norm(top_wall_cells[i + 1] - top_wall_cells[i])
-            cell_lengths_top = 0.5 * (left_top + right_top)
-
-            left_outerwall = np.linalg.norm(outerwall_vectors[i] - outerwall_vectors[i - 1])
-            right_outerwall = np.linalg.norm(outerwall_vectors[i + 1] - outerwall_vectors[i])
-            cell_lengths_outerwall = 0.5 * (left_outerwall + right_outerwall)
-
-        # Final averaged cell length
-        cell_lengths[i] = 0.5 * (cell_lengths_top + cell_lengths_outerwall)
-
-    return cell_lengths, cell_heights
-
-def read_static_field(field_file, top_wall_indices):
-    with open(field_file, 'r') as f:
-        lines = f.readlines()
-    
-    values = []
-    start_reading = False
-    inside_internal_field = False
-
-    for line in lines:
-        line = line.strip()
-        if "internalField" in line:
-            inside_internal_field = True
-        if inside_internal_field and line.startswith("("):
-            start_reading = True
-            continue
-        elif line.startswith(")"):
-            start_reading = False
-            inside_internal_field = False
-
-        if start_reading:
-            try:
-                values.append(float(line))
-            except ValueError:
-                continue
-                
-    return np.array(values)[top_wall_indices] if values else float('nan')
+def read_wall_mass_flux(field_file, wall):
+    # Mass flux onto the wall faces [kg/m^2/s], written by the solver per unit area of the wall cells
+    return read_static_field(field_file, wall.cells)
 
 
 def read_vector_field(field_file, top_wall_indices):
-    with open(field_file, 'r') as f:
-        lines = f.readlines()
-
-    values = []
-    start_reading = False
-    inside_internal_field = False
-
-    for line in lines:
-        line = line.strip()
-        if "internalField" in line:
-            inside_internal_field = True
-        if inside_internal_field and "(" in line and not start_reading:
-            start_reading = True
-            continue
-        if line == ");":
-            start_reading = False
-            inside_internal_field = False
-            continue
-
-        if start_reading:
-            try:
-                vec = np.array([float(n) for n in line.strip("() ").split()])
-                if len(vec) == 3:
-                    values.append(np.linalg.norm(vec))
-            except ValueError:
-                continue
-    
-    return np.array(values)[top_wall_indices] if values else float('nan')
+    values = np.linalg.norm(foamFieldIO.read_internal_field(field_file), axis=1)
+
+    return values[top_wall_indices] if values.size else float('nan')
 
 
 # def compute_smooth_wall_normals(points, num_eval_points=1000000):
@@ -0,0 +1,195 @@
+import os
+import errno
+import shutil
+import hashlib
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, reflinks are then skipped
+    fcntl = None
+
+# The store is next to the results directory, e.g. simulation_results.objects, so that only run
+# folders are in the results directory itself
+store_suffix = ".objects"
+
+# ioctl request cloning a whole file on Linux (btrfs, XFS with reflink=1, ...)
+FICLONE = 0x40049409
+
+# Errors meaning a link mode is not supported on this filesystem at all
+unsupported_errors = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_path(results_dir):
+    return os.path.normpath(results_dir) + store_suffix
+
+
+def reflink(source, destination):
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "Reflinks are not supported on this platform.")
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+
+
+class RunArchive:
+    """
+    Content-addressed archive of the run directories in results_dir. Every distinct file is stored
+    once under results_dir.objects by its SHA-256 and the run directories are materialised from
+    the stored blobs with hardlinks, reflinks or, where neither works, plain copies.
+
+    Stored blobs are read-only since a hardlinked file is shared by every run that contains it.
+    """
+    def __init__(self, results_dir="simulation_results", link_modes=('hardlink', 'reflink', 'copy')):
+        self.results_dir = results_dir
+        self.store_dir = store_path(results_dir)
+        self.link_modes = list(link_modes)
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        # Digest per path, reused while size, modification time and inode are unchanged
+        self.hashes = {}
+        self.stats = {'files': 0, 'stored': 0, 'bytes': 0, 'stored_bytes': 0}
+        self.stats.update({mode: 0 for mode in self.link_modes})
+
+    def digest(self, path):
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        path = os.path.abspath(path)
+        if path not in self.hashes or self.hashes[path][0] != key:
+            self.hashes[path] = (key, file_hash(path))
+        return self.hashes[path][1]
+
+    def blob_path(self, digest):
+        return os.path.join(self.store_dir, digest[:2], digest[2:])
+
+    def store(self, path):
+        blob = self.blob_path(self.digest(path))
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            temporary = f"{blob}.{os.getpid()}.tmp"
+            shutil.copyfile(path, temporary)
+            os.chmod(temporary, 0o444)
+            os.replace(temporary, blob)
+            self.stats['stored'] += 1
+            self.stats['stored_bytes'] += os.path.getsize(blob)
+        return blob
+
+    def materialise(self, blob, destination):
+        if os.path.lexists(destination):
+            os.remove(destination)
+
+        for mode in list(self.link_modes):
+            try:
+                if mode == 'hardlink':
+                    os.link(blob, destination)
+                elif mode == 'reflink':
+                    reflink(blob, destination)
+                else:
+                    shutil.copyfile(blob, destination)
+                self.stats[mode] += 1
+                return mode
+            except OSError as error:
+                if mode == 'copy':
+                    raise
+                # Drop modes the filesystem does not support, otherwise (e.g. too many links) only skip this file
+                if error.errno in unsupported_errors:
+                    self.link_modes.remove(mode)
+
+        raise OSError(f"Could not materialise {destination}.")
+
+    def add_file(self, source, destination):
+        self.materialise(self.store(source), destination)
+        self.stats['files'] += 1
+        self.stats['bytes'] += os.path.getsize(source)
+
+    def add(self, source, run_dir):
+        """
+        Archive the file or directory tree source into run_dir, like cp -r source run_dir.
+        """
+        destination = os.path.join(run_dir, os.path.basename(os.path.normpath(source)))
+        if os.path.isfile(source):
+            os.makedirs(run_dir, exist_ok=True)
+            self.add_file(source, destination)
+            return
+
+        for root, dirs, files in os.walk(source):
+            target_root = os.path.join(destination, os.path.relpath(root, source))
+            os.makedirs(target_root, exist_ok=True)
+            for name in files:
+                self.add_file(os.path.join(root, name), os.path.join(target_root, name))
+
+    def add_run(self, run_dir, sources):
+        os.makedirs(run_dir, exist_ok=True)
+        for source in sources:
+            self.add(source, run_dir)
+
+    def deduplicate(self, run_dir):
+        """
+        Replace the files of an existing run directory by links to the stored contents, the result
+        is the same as add_run() of the files. New contents are moved into the store instead of copied.
+        """
+        for root, dirs, files in os.walk(run_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                size = os.path.getsize(path)
+                blob = self.blob_path(self.digest(path))
+                if not os.path.exists(blob):
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    os.chmod(path, 0o444)
+                    os.replace(path, blob)
+                    self.stats['stored'] += 1
+                    self.stats['stored_bytes'] += size
+                self.materialise(blob, path)
+                self.stats['files'] += 1
+                self.stats['bytes'] += size
+
+
+def disk_usage(results_dir="simulation_results"):
+    """
+    Sizes of the run directories in results_dir: 'apparent' and 'copies' are the file sizes and the
+    disk space if every file were a plain copy, 'allocated' the disk space counting every inode once
+    and 'unique' the size of the distinct contents in the store. Reflinked files share their data
+    blocks but not their inodes, so they count in full in 'allocated'.
+    """
+    usage = {'runs': 0, 'files': 0, 'apparent': 0, 'copies': 0, 'allocated': 0, 'unique': 0}
+    inodes = set()
+
+    for directory in [results_dir, store_path(results_dir)]:
+        in_store = directory != results_dir
+        for root, dirs, files in os.walk(directory):
+            if os.path.dirname(os.path.abspath(root)) == os.path.abspath(results_dir):
+                usage['runs'] += 1
+            for name in files:
+                stat = os.lstat(os.path.join(root, name))
+                if in_store:
+                    usage['unique'] += stat.st_size
+                else:
+                    usage['files'] += 1
+                    usage['apparent'] += stat.st_size
+                    usage['copies'] += stat.st_blocks * 512
+                if (stat.st_dev, stat.st_ino) not in inodes:
+                    inodes.add((stat.st_dev, stat.st_ino))
+                    usage['allocated'] += stat.st_blocks * 512
+
+    return usage
+
+
+def report(results_dir="simulation_results"):
+    usage = disk_usage(results_dir)
+    copies = max(usage['copies'], 1)
+    print(f"Run archive: {usage['runs']} runs, {usage['files']} files, {usage['apparent'] / 2**20:.1f} MiB", flush=True)
+    print(f"  as plain copies:  {usage['copies'] / 2**20:10.1f} MiB", flush=True)
+    print(f"  on disk:          {usage['allocated'] / 2**20:10.1f} MiB ({100 * (1 - usage['allocated'] / copies):.1f} % saved)", flush=True)
+    print(f"  unique contents:  {usage['unique'] / 2**20:10.1f} MiB", flush=True)
+    return usage
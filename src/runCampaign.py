@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+import configparser
+from datetime import datetime
+
+run_simulation = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runSimulation.py")
+
+
+def requested_processors(case_dir):
+    config = configparser.ConfigParser()
+    config.read(os.path.join(case_dir, "simulation_parameters.ini"))
+    return config.getint("SIMULATION", "processors")
+
+
+class Case:
+    def __init__(self, case_dir, processors):
+        self.case_dir = os.path.abspath(case_dir)
+        self.processors = processors
+        self.cores = None
+        self.process = None
+        self.log_path = None
+        self.start_time = None
+        self.wall_time = None
+        self.returncode = None
+
+
+class CampaignScheduler:
+    """
+    Runs runSimulation.py for several cases at once, each on its own set of cores. At most max_active
+    cases run at the same time. Whenever a case finishes, its cores are freed and the first waiting case
+    that fits is started. Every case runs in its own process and keeps its own outer loop state.
+
+    The ranks and cores of a case are passed to runSimulation.py in PLUMES_PROCESSORS and PLUMES_CPU_SET,
+    and the driver process itself is pinned to the same cores.
+    """
+    def __init__(self, cases, cores=None, max_active=None, resume=False):
+        self.free_cores = sorted(cores if cores is not None else os.sched_getaffinity(0))
+        self.n_cores = len(self.free_cores)
+        self.max_active = max_active or self.n_cores
+        self.resume = resume
+        self.waiting = list(cases)
+        self.running = {}
+        self.finished = []
+
+        for case in self.waiting:
+            if case.processors > self.n_cores:
+                print(f"{case.case_dir} requests {case.processors} processors, only {self.n_cores} cores are available: using {self.n_cores}.", flush=True)
+                case.processors = self.n_cores
+
+    def allocate(self, n_cores):
+        # Prefer a block of consecutive cores, which usually share caches and memory
+        for i in range(len(self.free_cores) - n_cores + 1):
+            if self.free_cores[i + n_cores - 1] - self.free_cores[i] == n_cores - 1:
+                cores = self.free_cores[i:i + n_cores]
+                break
+        else:
+            cores = self.free_cores[:n_cores]
+
+        self.free_cores = [core for core in self.free_cores if core not in cores]
+        return cores
+
+    def start(self, case):
+        case.cores = self.allocate(case.processors)
+        os.makedirs(os.path.join(case.case_dir, "logs"), exist_ok=True)
+        case.log_path = os.path.join(case.case_dir, "logs", f"simulation_{datetime.now():%Y%m%d_%H%M%S}.log")
+
+        environment = dict(os.environ, PLUMES_PROCESSORS=str(case.processors), PLUMES_CPU_SET=",".join(map(str, case.cores)))
+        cores = set(case.cores)
+        command = [sys.executable, run_simulation, case.case_dir] + (["--resume"] if self.resume else [])
+        with open(case.log_path, "w") as log_file:
+            case.process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT,
+                                            env=environment, preexec_fn=lambda: os.sched_setaffinity(0, cores))
+        case.start_time = time.time()
+        self.running[case.process.pid] = case
+
+        print(f"[{datetime.now():%H:%M:%S}] Started {case.case_dir} on cores {','.join(map(str, case.cores))} (log: {case.log_path})", flush=True)
+
+    def start_waiting(self):
+        for case in list(self.waiting):
+            if len(self.running) >= self.max_active:
+                break
+            if case.processors <= len(self.free_cores):
+                self.waiting.remove(case)
+                self.start(case)
+
+    def wait_for_case(self):
+        # Block until any case finishes, so that its cores are reused immediately
+        pid, status = os.waitpid(-1, 0)
+        case = self.running.pop(pid, None)
+        if case is None:
+            return
+        case.returncode = case.process.returncode = os.waitstatus_to_exitcode(status)
+        case.wall_time = time.time() - case.start_time
+        self.free_cores = sorted(self.free_cores + case.cores)
+        self.finished.append(case)
+
+        state = "finished" if case.returncode == 0 else f"failed with exit code {case.returncode}"
+        print(f"[{datetime.now():%H:%M:%S}] {case.case_dir} {state} after {case.wall_time / 3600:.2f} h", flush=True)
+
+    def run(self):
+        while self.waiting or self.running:
+            self.start_waiting()
+            self.wait_for_case()
+
+        return self.finished
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Run the cases of a campaign concurrently on disjoint sets of cores.")
+    parser.add_argument("cases", nargs="+", help="case directories")
+    parser.add_argument("--cores", type=int, help="number of cores to use (default: all cores available to this process)")
+    parser.add_argument("--max-active", type=int, help="maximum number of cases running at the same time")
+    parser.add_argument("--processors", type=int, help="MPI ranks per case (default: 'processors' in the case settings)")
+    parser.add_argument("--resume", action="store_true", help="continue every case from its checkpoint")
+    arguments = parser.parse_args(arguments)
+
+    cases = [Case(case_dir, arguments.processors or requested_processors(case_dir)) for case_dir in arguments.cases]
+    cores = sorted(os.sched_getaffinity(0))[:arguments.cores] if arguments.cores else None
+
+    scheduler = CampaignScheduler(cases, cores, arguments.max_active, arguments.resume)
+    print(f"Running {len(cases)} cases on {scheduler.n_cores} cores, at most {scheduler.max_active} at the same time.\n", flush=True)
+    finished = scheduler.run()
+
+    print("\nCampaign summary:", flush=True)
+    for case in finished:
+        print(f"  {case.case_dir}: {case.processors} ranks, {case.wall_time / 3600:.2f} h, exit code {case.returncode}", flush=True)
+
+    return 0 if all(case.returncode == 0 for case in finished) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import os
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Name of the container inside simulation_results/<time>/
+container_name = "results.npz"
+
+
+def write(path, fields, mesh_geometry, wall_values=None, **metadata):
+    """
+    Pack the results of one run into a compressed NPZ container with one array per entry:
+    fields/<name> for the internal fields of the latest time, mesh/points, mesh/cell_centres and
+    mesh/cell_volumes, wall/* for the wall cells ordered along x (cells, x, coordinates, face areas
+    and the per wall cell arrays in wall_values) and meta/<name> for the keyword arguments.
+    """
+    wall = mesh_geometry.wall()
+    arrays = {
+        'mesh/points': mesh_geometry.points,
+        'mesh/cell_centres': mesh_geometry.cell_centres,
+        'mesh/cell_volumes': mesh_geometry.cell_volumes,
+        'wall/cells': wall.cells,
+        'wall/x': wall.cell_centres[:,0],
+        'wall/coordinates': wall.cell_centres[:,1],
+        'wall/face_centres': wall.face_centres,
+        'wall/face_areas': wall.face_area_magnitudes,
+    }
+    arrays.update({f'fields/{name}': values for name, values in fields.items()})
+    arrays.update({f'wall/{name}': values for name, values in (wall_values or {}).items()})
+    arrays.update({f'meta/{name}': np.asarray(value) for name, value in metadata.items()})
+
+    # Written under a temporary name, so an interrupted run never leaves a truncated container
+    temporary = f"{path}.tmp.npz"
+    np.savez_compressed(temporary, **arrays)
+    os.replace(temporary, path)
+
+
+class RunContainer:
+    """
+    Lazy reader of a run container: opening it only reads the zip directory and every array is
+    decompressed on first access.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.archive = np.load(path)
+        self.loaded = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.archive.close()
+
+    def __contains__(self, key):
+        return key in self.archive.files
+
+    def __getitem__(self, key):
+        if key not in self.loaded:
+            if key not in self.archive.files:
+                raise KeyError(f"No entry {key} in {self.path}.")
+            self.loaded[key] = self.archive[key]
+        return self.loaded[key]
+
+    @property
+    def fields(self):
+        return [key[len('fields/'):] for key in self.archive.files if key.startswith('fields/')]
+
+    def field(self, name):
+        return self[f'fields/{name}']
+
+    def wall(self, name):
+        return self[f'wall/{name}']
+
+    def meta(self, name):
+        value = self[f'meta/{name}']
+        return value.item() if value.ndim == 0 else value
+
+    def sample_over_line(self, field, pointa, pointb, resolution=1000):
+        """
+        Values of field at resolution + 1 points from pointa to pointb, taken from the cell with
+        the nearest centre in the x-y plane. Vector fields keep their components.
+        """
+        if 'tree' not in self.loaded:
+            self.loaded['tree'] = cKDTree(self['mesh/cell_centres'][:,:2])
+        line = np.linspace(np.asarray(pointa, dtype=np.float64), np.asarray(pointb, dtype=np.float64), resolution + 1)
+        _, cells = self.loaded['tree'].query(line[:,:2])
+        return self.field(field)[cells]
+
+
+def open_campaign(results_dir="simulation_results"):
+    """
+    Return {time folder: RunContainer} for every run in results_dir with a container, ordered by time.
+    """
+    runs = []
+    for name in os.listdir(results_dir):
+        path = os.path.join(results_dir, name, container_name)
+        try:
+            runs.append((float(name), name, path))
+        except ValueError:
+            continue
+    return {name: RunContainer(path) for _, name, path in sorted(runs) if os.path.isfile(path)}
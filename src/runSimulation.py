@@ -1,22 +1,41 @@
 import os
+import glob
 import sys
-import subprocess
 import configparser
+import atexit
 import numpy as np
 
 import editBoundaryFile
 import editInitialCondition
 import editBoundaryConditionT
 import editDecomposeParDict
+import foamFieldIO
 import quasi1DIsentropic
 import monitorSimulation
 import accretionRate
+import backgroundWorker
+import checkpoint
+import commandRunner
 import updateGeometry
 import createGmshGeoFile
+import createPolyMesh
+import decompositionPlanner
+import meshGeometry
+import polyMesh
 import readWallFields
+import runArchive
+import runContainer
 import setWallInteractionTerms
+import solverLog
+import stageTimer
+import wallEvolution
+import warmStart
 
 case = sys.argv[1]
+# With --resume the outer loop continues after the last completed stage of the checkpoint
+resume = '--resume' in sys.argv[2:]
+# With --profile (or profile_stages = true) every stage of a run also runs under cProfile
+profile_stages = '--profile' in sys.argv[2:]
 os.chdir(case)
 
 print(f"Starting Coupled Wall Interactions Simulation in {case}...\n", flush=True)
@@ -32,12 +51,32 @@ mesh_horizontal_divisions = config.getint("MESH", "horizontal_divisions")
 mesh_progression_vertical = config.getfloat("MESH", "progression_vertical")
 mesh_progression_horizontal = config.getfloat("MESH", "progression_horizontal")
 mesh_bump_horizontal = config.getfloat("MESH", "bump_horizontal")
+mesh_mode = config.get("MESH", "mode", fallback="remesh")
+mesh_backend = config.get("MESH", "backend", fallback="native")
 
 # Simulation control
 steady_state_simulation_end_time_limit = config.getfloat("SIMULATION", "steady_state_simulation_end_time_limit")
 simulation_end_time = config.getfloat("SIMULATION", "simulation_end_time")
 maximum_number_of_runs = config.getint("SIMULATION", "maximum_number_of_runs")
 processors = config.getint("SIMULATION", "processors")
+# A campaign runner (runCampaign.py) assigns the ranks and the cores of every case
+processors = int(os.environ.get("PLUMES_PROCESSORS", processors))
+cpu_set = os.environ.get("PLUMES_CPU_SET")
+# 'fixed' decomposes into 'processors' strips along x, 'auto' lets decompositionPlanner choose method, split and rank count
+decomposition = config.get("SIMULATION", "decomposition", fallback="fixed")
+min_cells_per_rank = config.getint("SIMULATION", "min_cells_per_rank", fallback=5000)
+write_format = config.get("SIMULATION", "write_format", fallback="ascii")
+monitor_mode = config.get("SIMULATION", "monitor_mode", fallback="poll")
+monitor_sample_steps = config.getint("SIMULATION", "monitor_sample_steps", fallback=1)
+warm_start = config.getboolean("SIMULATION", "warm_start", fallback=False)
+archive_mode = config.get("SIMULATION", "archive_mode", fallback="copy")
+background_archiving = config.getboolean("SIMULATION", "background_archiving", fallback=True)
+background_queue_depth = config.getint("SIMULATION", "background_queue_depth", fallback=4)
+profile_stages = profile_stages or config.getboolean("SIMULATION", "profile_stages", fallback=False)
+residual_steady_steps = config.getint("SIMULATION", "residual_steady_steps", fallback=monitorSimulation.residual_steady_steps)
+# Time limit in seconds of gmsh, gmshToFoam, decomposePar and reconstructPar, 0 for no limit
+tool_timeout = config.getfloat("SIMULATION", "tool_timeout", fallback=commandRunner.timeout_seconds)
+commandRunner.timeout_seconds = tool_timeout or None
 
 # Wall temperature BCs
 wall_temperature_boundary_condition_type = config.get("WALL_TEMPERATURE", "boundary_condition_type")
@@ -49,6 +88,9 @@ wall_evolution_threshold_percentage = config.getfloat("WALL_EVOLUTION", "thresho
 dt_max = config.getfloat("WALL_EVOLUTION", "dt_max")
 dt_min = config.getfloat("WALL_EVOLUTION", "dt_min")
 safety_factor = config.getfloat("WALL_EVOLUTION", "safety_factor")
+wall_integrator = config.get("WALL_EVOLUTION", "integrator", fallback="threshold")
+wall_evolution_tolerance = config.getfloat("WALL_EVOLUTION", "tolerance", fallback=1e-3)
+wall_evolution_max_step_fraction = config.getfloat("WALL_EVOLUTION", "max_step_fraction", fallback=0.25)
 
 # Convergence thresholds
 convergence_thresholds = {
@@ -61,6 +103,13 @@ convergence_thresholds = {
     'Y': config.getfloat("CONVERGENCE_THRESHOLDS", "Y")
 }
 
+# Initial residual thresholds per solved variable, required with monitor_mode = residual
+residual_thresholds = {}
+if config.has_section("RESIDUAL_THRESHOLDS"):
+    residual_thresholds = {variable: float(value) for variable, value in config.items("RESIDUAL_THRESHOLDS")}
+if monitor_mode == 'residual' and not residual_thresholds:
+    raise ValueError("monitor_mode = residual needs at least one threshold in [RESIDUAL_THRESHOLDS], e.g. 'Ux = 1e-5'.")
+
 # print configuration parameters
 print("===========================================================", flush=True)
 print("\t\tSIMULATION PARAMETERS", flush=True)  
@@ -72,8 +121,24 @@ print(f"Mesh horizontal divisions: {mesh_horizontal_divisions}", flush=True)
 print(f"Mesh progression vertical: {mesh_progression_vertical}", flush=True)
 print(f"Mesh progression horizontal: {mesh_progression_horizontal}", flush=True)
 print(f"Mesh bump horizontal: {mesh_bump_horizontal}", flush=True)
+print(f"Mesh update mode: {mesh_mode}", flush=True)
+print(f"Mesh backend: {mesh_backend}", flush=True)
 print("\n[SIMULATION]", flush=True)
 print(f"Processors: {processors}", flush=True)
+print(f"Decomposition: {decomposition}", flush=True)
+if decomposition == 'auto':
+    print(f"Minimum cells per rank: {min_cells_per_rank}", flush=True)
+if cpu_set:
+    print(f"Cores: {cpu_set}", flush=True)
+print(f"Write format: {write_format}", flush=True)
+print(f"Monitor mode: {monitor_mode}", flush=True)
+print(f"Warm start: {warm_start}", flush=True)
+print(f"Archive mode: {archive_mode}", flush=True)
+print(f"Background archiving: {background_archiving}", flush=True)
+print(f"Profile stages: {profile_stages}", flush=True)
+print(f"Tool timeout: {tool_timeout} s", flush=True)
+if monitor_mode == 'functionObject':
+    print(f"Monitor sample interval: {monitor_sample_steps} time steps", flush=True)
 print(f"Steady state simulation end time limit: {steady_state_simulation_end_time_limit} s", flush=True)
 print(f"Simulation end time: {simulation_end_time} s", flush=True)
 print(f"Maximum number of runs: {maximum_number_of_runs}", flush=True)
@@ -86,9 +151,17 @@ print(f"Wall evolution threshold percentage: {wall_evolution_threshold_percentag
 print(f"dt max: {dt_max} s", flush=True)
 print(f"dt min: {dt_min} s", flush=True)
 print(f"Safety factor for dt: {safety_factor}", flush=True)
+print(f"Wall evolution integrator: {wall_integrator}", flush=True)
+if wall_integrator == 'predictor_corrector':
+    print(f"Wall evolution tolerance: {wall_evolution_tolerance}", flush=True)
+    print(f"Wall evolution max step fraction: {wall_evolution_max_step_fraction}", flush=True)
 print("\n[CONVERGENCE]", flush=True)
 for field, threshold in convergence_thresholds.items():
     print(f"{field} convergence threshold: {threshold:.3e}", flush=True)    
+if monitor_mode == 'residual':
+    print(f"Residual steady steps: {residual_steady_steps}", flush=True)
+    for variable, threshold in residual_thresholds.items():
+        print(f"{variable} residual threshold: {threshold:.3e}", flush=True)
 print("===========================================================\n", flush=True)
 
 # --------------------------------------------------
@@ -99,160 +172,365 @@ print("Creating Gmsh file from wall geometry...", flush=True)
 
 gmsh_points = createGmshGeoFile.create('channel_data.csv', mesh_name, mesh_vertical_divisions, mesh_horizontal_divisions, mesh_progression_vertical, mesh_progression_horizontal, mesh_bump_horizontal)
 
+# Sections and grading of the Gmsh script, used to write the same mesh without Gmsh
+mesh_section_boundaries = createGmshGeoFile.find_section_boundaries(gmsh_points)
+mesh_section_gradings = createGmshGeoFile.section_gradings(mesh_section_boundaries, mesh_horizontal_divisions, mesh_progression_horizontal, mesh_bump_horizontal)
+
 print("Done.\n", flush=True)
 
 number_of_runs = 0
 simulation_time = 0
+previous_fields = None
+previous_cell_centres = None
+previous_wall_face_centres = None
+latestTime_str = None
+
+# Keeps the wall growth rates of all outer runs
+wall_evolution = wallEvolution.WallEvolution(wall_evolution_tolerance, wall_evolution_max_step_fraction, wall_evolution_threshold_percentage, min_step=dt_min, max_step=dt_max)
+
+# Deletes old directories, compresses logs and writes results while the next run goes ahead
+archive_worker = backgroundWorker.BackgroundWorker(background_queue_depth, enabled=background_archiving)
+atexit.register(archive_worker.close)
+
+def write_values(path, values):
+    with open(path, 'w') as f:
+        for value in values:
+            f.write(str(value) + '\n')
+
+def save_checkpoint(stage):
+    # Outer loop state after stage of the current run, written atomically to checkpoint.npz
+    arrays = {'gmsh_points': gmsh_points, 'wall_coordinates': wall_coordinates}
+    arrays.update({f'wall_evolution/{key}': values for key, values in wall_evolution.state().items()})
+    if previous_fields is not None:
+        arrays.update({f'previous_fields/{name}': values for name, values in previous_fields.items()})
+        arrays['previous_cell_centres'] = previous_cell_centres
+        arrays['previous_wall_face_centres'] = previous_wall_face_centres
+    if mesh_mode == 'morph' and stage != 'evolved':
+        # Mesh points before the wall evolution of this run, which morphs the mesh
+        arrays['mesh_points'] = mesh_geometry.points
+    checkpoint.save(stage, {'number_of_runs': number_of_runs, 'simulation_time': simulation_time, 'latest_time': latestTime_str}, arrays)
+
+resume_state = None
+if resume:
+    resume_state, resume_arrays = checkpoint.load()
+    if resume_state is None:
+        print("No checkpoint found, starting from the beginning.\n", flush=True)
+
+# Directories left over for deletion by an interrupted run
+if os.path.isdir(backgroundWorker.trash_dir_name):
+    archive_worker.submit(backgroundWorker.remove_tree, backgroundWorker.trash_dir_name)
+
+if resume_state is None:
+    commandRunner.remove("simulation_results")
+    commandRunner.remove(runArchive.store_path("simulation_results"))
+    commandRunner.remove(checkpoint.checkpoint_path)
+    # The log of an interrupted run is continued, otherwise started anew
+    commandRunner.remove("OpenFOAM_simulation.log")
+else:
+    print(f"Resuming run {resume_state['number_of_runs']} at t = {resume_state['simulation_time']:.2f} s after stage '{resume_state['stage']}'...", flush=True)
+
+    number_of_runs = resume_state['number_of_runs']
+    simulation_time = resume_state['simulation_time']
+    latestTime_str = resume_state['latest_time']
+    wall_evolution.restore(checkpoint.prefixed(resume_arrays, 'wall_evolution/'))
+
+    # The Gmsh file was just written from channel_data.csv, move its wall back to the checkpointed geometry
+    updateGeometry.update(f'./{mesh_name}', gmsh_points[:,1] - resume_arrays['gmsh_points'][:,1], len(gmsh_points))
+    gmsh_points = resume_arrays['gmsh_points']
+
+    if 'previous_cell_centres' in resume_arrays:
+        previous_fields = checkpoint.prefixed(resume_arrays, 'previous_fields/')
+        previous_cell_centres = resume_arrays['previous_cell_centres']
+        previous_wall_face_centres = resume_arrays['previous_wall_face_centres']
+
+    if 'mesh_points' in resume_arrays:
+        # Undo a morph of the interrupted wall evolution
+        polyMesh.write_points(resume_arrays['mesh_points'])
+
+    # After a completed run the next run starts from the beginning
+    if resume_state['stage'] == 'evolved':
+        resume_state = None
+
+    print("Done.\n", flush=True)
 
-subprocess.run("rm -rf simulation_results", shell=True, check=True, stderr=subprocess.STDOUT)
+if archive_mode == 'dedup':
+    run_archive = runArchive.RunArchive("simulation_results")
 
 while simulation_time < (simulation_end_time * 60) and number_of_runs <= maximum_number_of_runs:
     print("===========================================================", flush=True)
     print(f"\tRUNNING SIMULATION AT t = {simulation_time:2f}s...", flush=True)
     print("===========================================================\n", flush=True)
 
-    log_file = open("OpenFOAM_simulation.log", "w")   
 
-    print(f"Converting {mesh_name}.geo into a mesh file...", flush=True)
-    
-    subprocess.run(f"gmsh -3 {mesh_name}.geo -o {mesh_name}.msh -format msh2", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)   
+    # Wall time, CPU time, peak memory and bytes written of every stage, see simulation_results/<time>/stage_timing.json
+    stage_timer = stageTimer.StageTimer(profile_stages)
+    stageTimer.active = stage_timer
 
-    print(f"Successfuly converted {mesh_name}.geo into {mesh_name}.msh.\n", flush=True)
-    
-    print("Converting Gmsh msh file to Foam...", flush=True)
+    # Stages of this run completed before an interruption are skipped with --resume
+    prepared = checkpoint.completed(resume_state, 'prepared')
 
-    subprocess.run(f"gmshToFoam {mesh_name}.msh", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
-    
-    print("Successfuly converted Gmsh file to Foam.\n", flush=True)
-    
-    print("Editing boundary file & initial conditions for pressure, temperature, Mach number and velocity...", flush=True)
-    
-    editBoundaryFile.edit()
-    
-    checkMesh = subprocess.run("checkMesh | grep 'hex'", shell=True, stdout=subprocess.PIPE, universal_newlines=True)
-    
-    number_of_cells = int(checkMesh.stdout.strip()[15:])
-    
-    subprocess.run("postProcess -func writeCellCentres", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
+    # With mesh morphing the mesh is only generated once, later runs reuse the morphed points
+    if not prepared and (mesh_mode != 'morph' or number_of_runs == 0):
+        stage_timer.start('mesh')
+
+        if mesh_backend == 'gmsh':
+            print(f"Converting {mesh_name}.geo into a mesh file...", flush=True)
+            
+            commandRunner.run(['gmsh', '-3', f'{mesh_name}.geo', '-o', f'{mesh_name}.msh', '-format', 'msh2'])
+
+            print(f"Successfuly converted {mesh_name}.geo into {mesh_name}.msh.\n", flush=True)
+            
+            print("Converting Gmsh msh file to Foam...", flush=True)
 
-    cell_centers_x = editInitialCondition.read_cell_centers()
+            commandRunner.run(['gmshToFoam', f'{mesh_name}.msh'])
+            
+            print("Successfuly converted Gmsh file to Foam.\n", flush=True)
+            
+            print("Editing boundary file & initial conditions for pressure, temperature, Mach number and velocity...", flush=True)
+            
+            editBoundaryFile.edit()
+        else:
+            print("Writing the transfinite mesh to constant/polyMesh...", flush=True)
+
+            createPolyMesh.create(gmsh_points, mesh_section_boundaries, mesh_section_gradings, mesh_vertical_divisions, mesh_progression_vertical, write_format=write_format)
+
+            print("Done.\n", flush=True)
+
+    # Cell count and cell centres of the current mesh, computed once per mesh
+    stage_timer.start('mesh_geometry')
+    mesh_geometry = meshGeometry.load()
+    number_of_cells = mesh_geometry.n_cells
+    meshGeometry.write_cell_centres(mesh_geometry, write_format=write_format)
+
+    cell_centers_x = mesh_geometry.cell_centres[:,0]
     
-    wall_coordinates, outerwall, top_wall_indices = readWallFields.get_wall_cells("0/C", mesh_vertical_divisions)
+    wall_coordinates, outerwall, top_wall_indices = readWallFields.get_wall_cells(mesh_geometry)
 
     p_ini, T_ini, Mach_ini, U_ini = quasi1DIsentropic.compute_flow_variables(wall_coordinates[:,0], wall_coordinates[:,1], cell_centers_x)
 
-    if simulation_time == 0:
-        print("Initialising wall accretion & sublimation source terms for first steady state simulation...", flush=True)
+    if not prepared:
+        stage_timer.start('initial_conditions')
+
+        if simulation_time == 0:
+            print("Initialising wall accretion & sublimation source terms for first steady state simulation...", flush=True)
+            
+            setWallInteractionTerms.initialise('mdot_a', number_of_cells, write_format)
+            setWallInteractionTerms.initialise('mdot_s', number_of_cells, write_format)
+
+            print("Done.\n", flush=True)
+        
+        # Start from the previous converged solution, or from the isentropic solution for the first run
+        if warm_start and previous_fields is not None:
+            print("Mapping the previous converged solution onto the new mesh...", flush=True)
+
+            mapper = warmStart.FieldMapper(previous_cell_centres, previous_wall_face_centres, mesh_geometry.cell_centres, mesh_geometry.wall().face_centres)
+            mapped_fields = warmStart.map_fields(previous_fields, mapper, write_format=write_format)
+
+            print(f"Mapped {', '.join(mapped_fields)}.\n", flush=True)
+        else:
+            editInitialCondition.edit('p', p_ini, write_format)
+            editInitialCondition.edit('T', T_ini, write_format)
+            editInitialCondition.edit('Ma', Mach_ini, write_format)
+            editInitialCondition.edit('U', U_ini, write_format)
+        
+        editBoundaryConditionT.edit(wall_temperature_boundary_condition_type, mesh_geometry.wall(), wall_temperature_boundary_condition_start, wall_temperature_boundary_condition_end)
+        
+        monitorSimulation.update_control_dict(steady_state_simulation_end_time_limit)
+        monitorSimulation.update_write_format(write_format)
+        monitorSimulation.update_function_objects(monitor_mode == 'functionObject', monitor_sample_steps)
+
         
-        setWallInteractionTerms.initialise('mdot_a', number_of_cells)
-        setWallInteractionTerms.initialise('mdot_s', number_of_cells)
+        stage_timer.start('decompose')
+        print("Decomposing the mesh for parallel simulations...", flush=True)
+        
+        commandRunner.remove_matching("proc*")
+
+        commandRunner.remove(monitorSimulation.rms_history_path)
+
+        commandRunner.remove(monitorSimulation.function_object_dir)
+
+        commandRunner.remove_matching("0.*")
 
+        if decomposition == 'auto':
+            # At most 'processors' ranks and the cores this case may run on
+            plan = decompositionPlanner.plan(mesh_geometry, min(processors, len(os.sched_getaffinity(0))), min_cells_per_rank)
+            ranks = plan.n_ranks
+            editDecomposeParDict.edit(ranks, plan.method, plan.split)
+        else:
+            ranks = processors
+            editDecomposeParDict.edit(processors)
+        
+        # A single rank runs the solver serially in the case directory
+        if ranks > 1:
+            commandRunner.run(['decomposePar'])
+        
         print("Done.\n", flush=True)
-    
-    editInitialCondition.edit('p', p_ini)
-    editInitialCondition.edit('T', T_ini)
-    editInitialCondition.edit('Ma', Mach_ini)
-    editInitialCondition.edit('U', U_ini)
-    
-    editBoundaryConditionT.edit(wall_temperature_boundary_condition_type, len(wall_coordinates), wall_temperature_boundary_condition_start, wall_temperature_boundary_condition_end)
-    
-    monitorSimulation.update_control_dict(steady_state_simulation_end_time_limit)
 
-    
-    print("Decomposing the mesh for parallel simulations...", flush=True)
-    
-    subprocess.run("rm -rf proc*", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
+        save_checkpoint('prepared')
 
-    subprocess.run("rm -rf 0.*", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
+    solver_log = None
+    if not checkpoint.completed(resume_state, 'solved'):
+        stage_timer.start('solve')
 
-    editDecomposeParDict.edit(processors)
-    
-    subprocess.run("decomposePar", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
-    
-    print("Done.\n", flush=True)
-            
-    subprocess.Popen(f"nohup mpirun -np {processors} rhoCentralFoam_2ph -parallel >> OpenFOAM_simulation.log 2>&1 &", shell=True)
-    
-    # check for convergence
-    monitorSimulation.check_rms(convergence_thresholds)
+        if prepared:
+            # The solver was interrupted: drop the time directories it did not finish writing and
+            # continue from the latest complete one (startFrom latestTime in controlDict)
+            restart_time = checkpoint.remove_incomplete_times(monitorSimulation.list_processor_dirs(), monitorSimulation.fields)
+            monitorSimulation.update_control_dict(steady_state_simulation_end_time_limit)
+            monitorSimulation.update_stop_at("endTime")
 
-    print("Copying files to simulation results folder...", flush=True)
-    
-    subprocess.run(f"mkdir -p ./simulation_results/{simulation_time:.2f}", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
+            print(f"Restarting the solver from t = {restart_time or 0}.\n", flush=True)
+
+            # Same rank count as the decomposition of the interrupted run
+            ranks = len([d for d in monitorSimulation.list_processor_dirs() if d != '.']) or 1
+
+        solver_log = solverLog.SolverLogFollower("OpenFOAM_simulation.log")
+        solver_log.start()
+
+        # Ranks of concurrent cases are bound to their own cores (Open MPI options)
+        binding = ['--cpu-set', cpu_set, '--bind-to', 'core'] if cpu_set else []
+        solver = ['mpirun', '-np', str(ranks)] + binding + ['rhoCentralFoam_2ph', '-parallel'] if ranks > 1 else ['rhoCentralFoam_2ph']
+        # The monitor stops with an error as soon as the solver fails, and at the latest time if it ends before convergence
+        monitorSimulation.solver_process = commandRunner.start(solver, "OpenFOAM_simulation.log")
         
-    subprocess.run(f"cp -r 0 ./simulation_results/{simulation_time:.2f}", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
-            
-    latestTime = subprocess.run("foamListTimes -latestTime", shell=True, stdout=subprocess.PIPE, universal_newlines=True)
-    latestTime_str = latestTime.stdout.strip()
+        # check for convergence
+        if monitor_mode == 'residual':
+            monitorSimulation.check_residuals(solver_log, residual_thresholds, residual_steady_steps)
+        else:
+            monitorSimulation.check_rms(convergence_thresholds, monitor_mode=monitor_mode, rms_history_file=monitorSimulation.rms_history_path)
 
-    subprocess.run(f"cp -r {latestTime_str} ./simulation_results/{simulation_time:.2f}", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
+        # The solver stops at the endTime set by the monitor, its last time directory is complete once it has exited
+        commandRunner.finish(monitorSimulation.solver_process)
+        solver_log.stop()
 
-    subprocess.run(f"cp -r constant ./simulation_results/{simulation_time:.2f}", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
+        # Latest time directory of the case, as foamListTimes -latestTime
+        latestTime_str = commandRunner.latest_time()
+        if latestTime_str is None:
+            raise RuntimeError("The solver did not write any time directory, see OpenFOAM_simulation.log")
 
-    subprocess.run(f"cp -r system ./simulation_results/{simulation_time:.2f}", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
-    
-    subprocess.run(f"cp foam.foam ./simulation_results/{simulation_time:.2f}", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
-    
-    subprocess.run(f"cp {mesh_name}.geo ./simulation_results/{simulation_time:.2f}", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)        
+    stage_timer.start('read_fields')
+    run_dir = f"./simulation_results/{simulation_time:.2f}"
 
-    print("Done.\n", flush=True)
+    # The converged time directory is moved into the run folder when it is archived (except for containers)
+    latest_time_dir = latestTime_str if os.path.isdir(latestTime_str) else f"{run_dir}/{latestTime_str}"
+
+    # Converged fields of this run, for the warm start of the next run and the run container
+    if warm_start or archive_mode == 'container':
+        latest_fields = foamFieldIO.read_time_directory(latest_time_dir, number_of_cells, exclude=meshGeometry.cell_centre_fields)
+        previous_fields = latest_fields
+        previous_cell_centres = mesh_geometry.cell_centres
+        previous_wall_face_centres = mesh_geometry.wall().face_centres
+
+    if not checkpoint.completed(resume_state, 'solved'):
+        save_checkpoint('solved')
+
+    if not checkpoint.completed(resume_state, 'archived'):
+        stage_timer.start('archive')
+        print("Copying files to simulation results folder...", flush=True)
+
+        if archive_mode == 'container':
+            # The fields, mesh and wall data are packed into one container after the wall fluxes are read
+            os.makedirs(run_dir, exist_ok=True)
+        else:
+            # Copies of the case files the next run rewrites, taken now; the converged time directory is
+            # only moved. With archive_mode = dedup the files are linked to the store in the background.
+            os.makedirs(run_dir, exist_ok=True)
+
+            commandRunner.copy("0", run_dir)
+
+            commandRunner.copy("constant", run_dir)
+
+            commandRunner.copy("system", run_dir)
+
+            commandRunner.copy("foam.foam", run_dir)
+
+            commandRunner.copy(f"{mesh_name}.geo", run_dir)
+
+            if os.path.exists(monitorSimulation.rms_history_path):
+                commandRunner.copy(monitorSimulation.rms_history_path, run_dir)
+
+            if latest_time_dir == latestTime_str:
+                os.replace(latestTime_str, f"{run_dir}/{latestTime_str}")
+                latest_time_dir = f"{run_dir}/{latestTime_str}"
+
+        if solver_log is not None:
+            solver_log.write(f"{run_dir}/solver_telemetry.npz")
+
+        print("Done.\n", flush=True)
+
+        save_checkpoint('archived')
     
+    stage_timer.start('wall_update')
     print("Evolving the change in wall height due to wall accretion & sublimation...", flush=True)
         
     
     # check if r at any cell on the boundary > local cell height: if true then stop dr/dt evolution
     
-    with open(f"./simulation_results/{simulation_time:.2f}/wall_coordinates", 'w') as f:
-        for value in wall_coordinates[:,1]:
-            f.write(str(value) + '\n')
+    archive_worker.submit(write_values, f"{run_dir}/wall_coordinates", wall_coordinates[:,1].copy())
     
-    wall_cell_lengths, wall_cell_heights = readWallFields.compute_wall_cell_sizes(wall_coordinates, outerwall)
+    wall_cell_lengths, wall_cell_heights = readWallFields.compute_wall_cell_sizes(mesh_geometry)
             
-    mdot_a = readWallFields.read_static_field(f'./{latestTime_str}/mdot_a', top_wall_indices)
-    mdot_s = readWallFields.read_static_field(f'./{latestTime_str}/mdot_s', top_wall_indices)
-
-    R_wall_threshold = wall_evolution_threshold_percentage * wall_coordinates[:,1] # a certain percentage of the local channel height
+    mdot_a = readWallFields.read_wall_mass_flux(f'{latest_time_dir}/mdot_a', mesh_geometry.wall())
+    mdot_s = readWallFields.read_wall_mass_flux(f'{latest_time_dir}/mdot_s', mesh_geometry.wall())
 
     dRw_a_dt = accretionRate.calculate(mdot_a)
     dRw_s_dt = accretionRate.calculate(mdot_s)
     
     dRw_dt_total = dRw_a_dt + dRw_s_dt
-    
-    dRw_total = np.zeros((len(dRw_dt_total)))
-    
+
+    archive_worker.submit(write_values, f"{run_dir}/wall_growth_rate", dRw_dt_total)
+
+    if archive_mode == 'container':
+        archive_worker.submit(runContainer.write, f"{run_dir}/{runContainer.container_name}", latest_fields, mesh_geometry,
+                           {'mdot_a': mdot_a, 'mdot_s': mdot_s, 'dRw_dt': dRw_dt_total}, simulation_time=simulation_time, latest_time=latestTime_str)
+
     simulation_time_temp = simulation_time
     wall_closed = False
     
     wall_coordinates_temp = wall_coordinates
-    
-    while np.all(dRw_total < R_wall_threshold) and not wall_closed:
-        
-        # Calculate how close we are to the threshold
-        delta = np.abs(R_wall_threshold - dRw_total)
-        max_delta = np.max(delta)
-    
-        # Dynamically adjust dt
-        if max_delta > 0:
-            dt = safety_factor * max_delta / np.max(np.abs(dRw_dt_total))
-            dt = np.clip(dt, dt_min, dt_max)  # Keep dt between dt_min and dt_max
-        else:
-            dt = dt_min
-        
-        dRw = dRw_dt_total * dt
-        dRw_total += dRw
+
+    if wall_integrator == 'predictor_corrector':
+        # One step per outer run, its length set by the error estimate of the rate history
+        wall_evolution.add_rates(simulation_time, wall_coordinates[:,0], dRw_dt_total)
+        dt, dRw_total, wall_closed = wall_evolution.next_step(wall_coordinates[:,1])
         simulation_time += dt
-    
-        wall_coordinates_temp[:,1] -= dRw
-        
-        
-        if np.any(wall_coordinates_temp[:,1] <= 0):
-            print(f'Wall has fully closed at t = {simulation_time:.3f}s!', flush=True)
-            subprocess.run(f"mkdir -p ./simulation_results/{simulation_time:.2f}_wall_closed", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
-            with open(f"./simulation_results/{simulation_time:.2f}_wall_closed", 'w') as f:
-                for value in wall_coordinates_temp[:,1]:
-                    f.write(str(value) + '\n')
-            
-            wall_closed = True 
+
+        wall_coordinates_temp[:,1] -= dRw_total
+
+        if wall_evolution.error is not None:
+            print(f"Wall evolution step: {dt:.3f} s, error estimate of the previous step: {wall_evolution.error:.2e}", flush=True)
+    else:
+        R_wall_threshold = wall_evolution_threshold_percentage * wall_coordinates[:,1] # a certain percentage of the local channel height
+
+        dRw_total = np.zeros((len(dRw_dt_total)))
+
+        while np.all(dRw_total < R_wall_threshold) and not wall_closed:
+
+            # Calculate how close we are to the threshold
+            delta = np.abs(R_wall_threshold - dRw_total)
+            max_delta = np.max(delta)
+
+            # Dynamically adjust dt
+            if max_delta > 0:
+                dt = safety_factor * max_delta / np.max(np.abs(dRw_dt_total))
+                dt = np.clip(dt, dt_min, dt_max)  # Keep dt between dt_min and dt_max
+            else:
+                dt = dt_min
+
+            dRw = dRw_dt_total * dt
+            dRw_total += dRw
+            simulation_time += dt
+
+            wall_coordinates_temp[:,1] -= dRw
+
+            wall_closed = np.any(wall_coordinates_temp[:,1] <= 0)
+
+    if wall_closed:
+        print(f'Wall has fully closed at t = {simulation_time:.3f}s!', flush=True)
+        os.makedirs(f"./simulation_results/{simulation_time:.2f}_wall_closed", exist_ok=True)
+        with open(f"./simulation_results/{simulation_time:.2f}_wall_closed/wall_coordinates", 'w') as f:
+            for value in wall_coordinates_temp[:,1]:
+                f.write(str(value) + '\n')
             
     print("Done.\n", flush=True)
 
@@ -261,26 +539,67 @@ while simulation_time < (simulation_end_time * 60) and number_of_runs <= maximum
     updated_wall_coordinates_Gmsh = updateGeometry.interpolateSpline(wall_coordinates, dRw_total, gmsh_points[:,0])
     
     updateGeometry.update(f'./{mesh_name}', updated_wall_coordinates_Gmsh, len(gmsh_points))
+    gmsh_points[:,1] -= updated_wall_coordinates_Gmsh  # keep in sync with the Gmsh file
     
     print("Done.\n", flush=True)
 
+    if mesh_mode == 'morph':
+        print("Morphing mesh points to the new wall geometry...", flush=True)
+
+        updateGeometry.morph(wall_coordinates, dRw_total)
+
+        print("Done.\n", flush=True)
+
+    # The results of this run are on disk before the next run starts from the checkpoint
+    stage_timer.start('cleanup')
+    archive_worker.flush()
+    number_of_runs += 1
+    save_checkpoint('evolved')
+
+    # Only the resumed run skips the stages completed before the interruption
+    resume_state = None
     
     print("Removing old steady state results & old processor folders...", flush=True)
     
-    subprocess.run("rm -r proc*", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
-    subprocess.run("rm -r 0.*", shell=True, check=True, stdout=log_file, stderr=subprocess.STDOUT)
+    # Moved out of the case at once and deleted in the background while the next run goes ahead
+    old_directories = glob.glob("processor*") + glob.glob("0.*")
+    if old_directories:
+        archive_worker.submit(backgroundWorker.remove_tree, backgroundWorker.move_to_trash(old_directories))
     
     print("Done.\n", flush=True)
+
+    stage_timer.write(run_dir, run=number_of_runs - 1, simulation_time=simulation_time_temp, latest_time=latestTime_str)
+    stageTimer.active = None
     
     if wall_closed:
         stop_simulation = True
     print("===========================================================", flush=True)
     print(f"\tSIMULATION AT t = {simulation_time_temp:2f} s COMPLETED!", flush=True)
     print("===========================================================\n", flush=True)
-    log_file.close()
+
+    # Keep the solver log bounded: this run's log is moved into its results folder and compressed there
+    if os.path.exists("OpenFOAM_simulation.log"):
+        os.replace("OpenFOAM_simulation.log", f"{run_dir}/OpenFOAM_simulation.log")
+        archive_worker.submit(solverLog.compress_log, f"{run_dir}/OpenFOAM_simulation.log", f"{run_dir}/OpenFOAM_simulation.log.gz")
+
+    # The logs of the other tools of this run (log.gmsh, log.decomposePar, ...) go with it
+    for tool_log in glob.glob(f"{commandRunner.log_prefix}*"):
+        os.replace(tool_log, f"{run_dir}/{tool_log}")
+
+    if archive_mode == 'dedup':
+        # Files unchanged since an earlier run are linked to the same stored copy
+        archive_worker.submit(run_archive.deduplicate, run_dir)
+
     simulation_time_temp = simulation_time
-    number_of_runs += 1
     
 print("===========================================================", flush=True)
 print("\t\tALL SIMULATIONS COMPLETED!", flush=True)
 print("===========================================================", flush=True)
+
+# Wait for the archiving and cleanup of the last run
+archive_worker.close()
+
+if archive_mode == 'dedup':
+    runArchive.report("simulation_results")
+
+stageTimer.write_summary("simulation_results")
@@ -5,7 +5,13 @@ Created on Sun Apr 27 20:35:21 2025
 @author: sebas
 """
 
-def initialise(field_name, num_cells):
+import numpy as np
+
+import foamFieldIO
+
+def initialise(field_name, num_cells, write_format='ascii'):
+    # The binary list payload needs the architecture entry in the header
+    arch = f'\n    arch        "{foamFieldIO.binary_arch}";' if write_format == 'binary' else ''
     header = f"""/*--------------------------------*- C++ -*----------------------------------*\\
 | =========                 |                                                 |
 | \\\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |
@@ -16,7 +22,7 @@ def initialise(field_name, num_cells):
 FoamFile
 {{
     version     2.0;
-    format      ascii;
+    format      {write_format};{arch}
     class       volScalarField;
     location    "0";
     object      {field_name};
@@ -26,11 +32,8 @@ FoamFile
 dimensions      [1 -3 -1 0 0 0 0];
 
 
-internalField   nonuniform List<scalar> 
-{num_cells}
-(
-"""
-    boundary_field = """)
+internalField   nonuniform """
+    boundary_field = """
 ;
 boundaryField
 {
@@ -59,31 +62,25 @@ boundaryField
 }
 """
 
-    with open('./0/' + field_name, 'w') as f:
-        f.write(header)
-        for _ in range(num_cells):
-            f.write('0\n')
-        f.write(boundary_field)
+    with open('./0/' + field_name, 'wb') as f:
+        f.write(header.encode())
+        f.write(foamFieldIO.format_list(np.zeros(num_cells), write_format))
+        f.write(boundary_field.encode())
         
 
 def update(field_name, indices, new_values):
-    # Read the whole file
-    with open('./0/' + field_name, 'r') as f:
-        lines = f.readlines()
+    content = foamFieldIO.read_file('./0/' + field_name)
 
-    # Find the start and end of the internalField list
-    try:
-        start_index = next(i for i, line in enumerate(lines) if '(' in line and 'internalField' not in line) + 1
-        end_index = next(i for i, line in enumerate(lines[start_index:], start=start_index) if ')' in line)
-    except StopIteration:
-        raise ValueError("Could not find internalField list in the file.")
+    # Copy, since binary files are read into a read-only view
+    values = foamFieldIO.read_internal_field(None, content=content).copy()
 
     # Update the required indices
-    for idx, val in zip(indices, new_values):
-        if idx < 0 or idx >= (end_index - start_index):
-            raise IndexError(f"Cell index {idx} out of range (0 to {end_index - start_index - 1}).")
-        lines[start_index + idx] = f"{val}\n"
+    indices = np.asarray(indices)
+    out_of_range = (indices < 0) | (indices >= len(values))
+    if np.any(out_of_range):
+        raise IndexError(f"Cell index {indices[out_of_range][0]} out of range (0 to {len(values) - 1}).")
+    values[indices] = new_values
 
-    # Write back to the file
-    with open('./0/' + field_name, 'w') as f:
-        f.writelines(lines)
\ No newline at end of file
+    # Write back to the file in its own format
+    with open('./0/' + field_name, 'wb') as f:
+        f.write(foamFieldIO.replace_internal_field(content, values))
@@ -0,0 +1,162 @@
+import os
+import re
+import csv
+import gzip
+import shutil
+import threading
+import numpy as np
+
+time_pattern = re.compile(r'^Time = (\S+)')
+delta_t_pattern = re.compile(r'^deltaT = (\S+)')
+courant_patterns = [
+    re.compile(r'^Mean and max Courant Numbers = (\S+) (\S+)'),
+    re.compile(r'^Courant Number mean: (\S+) max: (\S+)'),
+]
+residual_pattern = re.compile(r'Solving for (\w+), Initial residual = (\S+), Final residual = (\S+), No Iterations (\d+)')
+execution_time_pattern = re.compile(r'^ExecutionTime = (\S+) s\s+ClockTime = (\S+) s')
+
+columns = ['time', 'deltaT', 'courant_mean', 'courant_max', 'execution_time', 'clock_time']
+
+
+class SolverLogFollower:
+    """
+    Follow the solver log and collect one record per time step.
+
+    Only bytes appended since the previous poll are read, so the log is never read twice.
+    Courant number and deltaT are printed before "Time =" and belong to the step that follows,
+    residuals and ExecutionTime/ClockTime are printed after it. Residuals are the initial
+    residual of the first solution of each variable in the step.
+    """
+    def __init__(self, log_path, poll_seconds=1.0, start_at_end=True):
+        self.log_path = log_path
+        self.poll_seconds = poll_seconds
+        # Skip what is already in the log, e.g. the meshing and decomposition output of this run
+        self.offset = os.path.getsize(log_path) if start_at_end and os.path.exists(log_path) else 0
+        self.remainder = b''
+        self.pending = {}
+        self.current = None
+        self.records = []
+        self.lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        try:
+            size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+        if size < self.offset:
+            # Log was truncated or rotated, start again at its beginning
+            self.offset, self.remainder = 0, b''
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+
+        lines = (self.remainder + data).split(b'\n')
+        self.remainder = lines.pop()
+
+        n_records = len(self.records)
+        for line in lines:
+            self._parse_line(line.decode(errors='replace').strip())
+        return len(self.records) - n_records
+
+    def _parse_line(self, line):
+        match = time_pattern.match(line)
+        if match:
+            self._finish_record()
+            try:
+                self.current = {'time': float(match.group(1)), 'residuals': {}}
+            except ValueError:
+                return
+            self.current.update(self.pending)
+            self.pending = {}
+            return
+
+        match = delta_t_pattern.match(line)
+        if match:
+            self.pending['deltaT'] = float(match.group(1))
+            return
+
+        for pattern in courant_patterns:
+            match = pattern.match(line)
+            if match:
+                self.pending['courant_mean'] = float(match.group(1))
+                self.pending['courant_max'] = float(match.group(2))
+                return
+
+        if self.current is None:
+            return
+
+        match = residual_pattern.search(line)
+        if match:
+            self.current['residuals'].setdefault(match.group(1), float(match.group(2)))
+            return
+
+        match = execution_time_pattern.match(line)
+        if match:
+            self.current['execution_time'] = float(match.group(1))
+            self.current['clock_time'] = float(match.group(2))
+
+    def _finish_record(self):
+        if self.current is not None:
+            with self.lock:
+                self.records.append(self.current)
+            self.current = None
+
+    def records_since(self, index):
+        with self.lock:
+            return self.records[index:]
+
+    # ---------- BACKGROUND FOLLOWING ----------
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error while following {self.log_path}: {e}", flush=True)
+            self._stop_event.wait(self.poll_seconds)
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.poll()
+        self._finish_record()
+
+    # ---------- TIME SERIES ----------
+    def time_series(self):
+        with self.lock:
+            records = list(self.records)
+        variables = sorted({variable for record in records for variable in record['residuals']})
+
+        series = {column: np.array([record.get(column, np.nan) for record in records]) for column in columns}
+        for variable in variables:
+            series[f'residual_{variable}'] = np.array([record['residuals'].get(variable, np.nan) for record in records])
+        return series
+
+    def write(self, output_file):
+        # Compressed NPZ for .npz files, CSV otherwise
+        series = self.time_series()
+        if output_file.endswith('.npz'):
+            np.savez_compressed(output_file, **series)
+            return
+
+        with open(output_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(list(series))
+            writer.writerows(zip(*(values.tolist() for values in series.values())))
+
+
+def compress_log(log_path, destination):
+    # Compress the log of a finished run, which is no longer written to, into destination and remove it
+    with open(log_path, 'rb') as f_in, gzip.open(destination, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(log_path)
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import glob
+import cProfile
+import contextlib
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak memory is then not reported
+    resource = None
+
+timing_file_name = "stage_timing.json"
+summary_file_name = "stage_timing_summary.txt"
+
+# Timer of the current run, substages of other modules (e.g. reconstructPar in the monitor) are recorded in it
+active = None
+
+
+def bytes_written():
+    # Bytes this process and its finished child processes passed to write(), Linux only
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    # Resets the peak resident set size of this process reported in /proc/self/status (Linux 4.0 and later)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Peak over the whole lifetime of the process, ru_maxrss is in kB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+
+
+def children_peak_rss():
+    # Largest peak resident set size of the finished child processes (gmsh, decomposePar, ...) so far
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024 if resource else None
+
+
+class StageTimer:
+    """
+    Measures the stages of one outer run: wall time, CPU time of the driver and of the finished child
+    processes, peak resident set size and bytes written. A stage lasts from start() to the next start()
+    or stop(), so the stages of the driver script need no extra indentation. With profile=True every
+    stage also runs under cProfile and write() dumps one .prof file per stage.
+
+    The solver runs detached from the driver, so its CPU time is not included: the 'solve' stage shows the
+    work of the monitor as CPU time and the time the monitor waits for the solver as the rest of the wall time.
+    """
+    def __init__(self, profile=False):
+        self.profile = profile
+        self.records = []
+        self.profiles = {}
+        self.current = None
+
+    def _counters(self):
+        times = os.times()
+        return {
+            'wall_time': time.perf_counter(),
+            'cpu_time': time.process_time(),
+            'cpu_time_children': times.children_user + times.children_system,
+            'bytes_written': bytes_written(),
+        }
+
+    def _begin(self, name):
+        reset_peak_rss()
+        profile = None
+        if self.profile:
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+        return {'name': name, 'start': self._counters(), 'profile': profile}
+
+    def _end(self, stage, merge=False):
+        end = self._counters()
+        if stage['profile'] is not None:
+            stage['profile'].disable()
+
+        record = {'stage': stage['name'], 'count': 1}
+        for key, value in end.items():
+            start = stage['start'][key]
+            record[key] = value - start if value is not None and start is not None else None
+        record['peak_rss'] = peak_rss()
+        record['peak_rss_children'] = children_peak_rss()
+
+        # Repeated substages (e.g. every wait of the monitor) add up in one record
+        previous = next((r for r in self.records if r['stage'] == record['stage']), None) if merge else None
+        if previous is None:
+            self.records.append(record)
+            return record
+        previous['count'] += 1
+        for key in end:
+            if record[key] is not None:
+                previous[key] = (previous[key] or 0) + record[key]
+        previous['peak_rss'] = record['peak_rss']
+        previous['peak_rss_children'] = record['peak_rss_children']
+        return previous
+
+    def start(self, name):
+        self.stop()
+        self.current = self._begin(name)
+
+    def stop(self):
+        if self.current is not None:
+            self._end(self.current)
+            self.current = None
+
+    @contextlib.contextmanager
+    def substage(self, name):
+        # Part of the current stage recorded separately as '<stage>/<name>', the stage itself goes on.
+        # All calls of a substage within the run are summed up.
+        parent = self.current['name'] if self.current is not None else None
+        stage = {'name': f"{parent}/{name}" if parent else name, 'start': self._counters(), 'profile': None}
+        try:
+            yield
+        finally:
+            self._end(stage, merge=True)
+
+    def write(self, run_dir, **metadata):
+        """
+        Write the records to run_dir/stage_timing.json and the profiles to run_dir/profiles/<stage>.prof.
+        """
+        self.stop()
+        os.makedirs(run_dir, exist_ok=True)
+        with open(os.path.join(run_dir, timing_file_name), 'w') as f:
+            json.dump(dict(metadata, stages=self.records), f, indent=2)
+
+        for name, profile in self.profiles.items():
+            os.makedirs(os.path.join(run_dir, "profiles"), exist_ok=True)
+            profile.dump_stats(os.path.join(run_dir, "profiles", f"{name}.prof"))
+
+
+@contextlib.contextmanager
+def substage(name):
+    # Records name in the timer of the current run, if there is one
+    if active is None:
+        yield
+        return
+    with active.substage(name):
+        yield
+
+
+def summary(results_dir="simulation_results"):
+    """
+    Table of the stage timings of all runs in results_dir: per stage the number of runs, total and mean
+    wall time, share of the total wall time, CPU time of the driver and its children, largest peak
+    resident set size of the driver and bytes written.
+    """
+    totals = {}
+    runs = 0
+    for path in sorted(glob.glob(os.path.join(results_dir, "*", timing_file_name))):
+        with open(path) as f:
+            records = json.load(f)['stages']
+        runs += 1
+        for record in records:
+            total = totals.setdefault(record['stage'], {'runs': 0, 'wall_time': 0.0, 'cpu_time': 0.0, 'cpu_time_children': 0.0,
+                                                        'peak_rss': 0, 'bytes_written': 0})
+            total['runs'] += 1
+            for key in ['wall_time', 'cpu_time', 'cpu_time_children', 'bytes_written']:
+                total[key] += record[key] or 0
+            total['peak_rss'] = max(total['peak_rss'], record['peak_rss'] or 0)
+
+    # Substages are part of their stage and do not count twice in the total
+    wall_time = max(sum(total['wall_time'] for name, total in totals.items() if '/' not in name), 1e-12)
+
+    lines = [f"Stage timing of {runs} runs in {results_dir}",
+             f"{'stage':<28}{'runs':>6}{'wall [s]':>12}{'mean [s]':>11}{'share':>8}{'CPU [s]':>11}{'CPU children [s]':>18}{'peak RSS [MiB]':>16}{'written [MiB]':>15}"]
+    for name, total in totals.items():
+        lines.append(f"{name:<28}{total['runs']:>6}{total['wall_time']:>12.2f}{total['wall_time'] / total['runs']:>11.3f}"
+                     f"{100 * total['wall_time'] / wall_time:>7.1f}%{total['cpu_time']:>11.2f}{total['cpu_time_children']:>18.2f}"
+                     f"{total['peak_rss'] / 2**20:>16.1f}{total['bytes_written'] / 2**20:>15.1f}")
+    return "\n".join(lines)
+
+
+def write_summary(results_dir="simulation_results"):
+    table = summary(results_dir)
+    with open(os.path.join(results_dir, summary_file_name), 'w') as f:
+        f.write(table + "\n")
+    print(table, flush=True)
+    return table
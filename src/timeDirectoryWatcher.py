@@ -0,0 +1,209 @@
+import os
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify event masks, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+event_header = struct.Struct('iIII')
+
+
+class Inotify:
+    """
+    Minimal pure-Python inotify binding through ctypes (Linux only).
+    """
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+
+    def add_watch(self, path, mask):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.paths[wd] = path
+        return wd
+
+    def read_events(self, timeout):
+        # Return a list of (watched path, mask, name) once events are available or after timeout
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = event_header.unpack_from(buffer, offset)
+            offset += event_header.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            events.append((self.paths.get(wd), mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def is_time_name(name):
+    if name in ['0', 'constant']:
+        return False
+    try:
+        float(name)
+    except ValueError:
+        return False
+    return True
+
+
+class TimeDirectoryWatcher:
+    """
+    Report each time directory once it is completely written on all processor directories.
+
+    A time is complete when a later time exists on every processor, or when all required files
+    of that time have been closed after writing (or left unmodified for settle_seconds) on every
+    processor. Uses inotify when available and rescans every poll_interval seconds regardless,
+    which is the only mechanism on filesystems without notifications.
+    """
+    def __init__(self, processor_dirs, required_files, poll_interval=30, settle_seconds=1.0):
+        self.processor_dirs = list(processor_dirs)
+        self.required_files = list(required_files)
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+
+        self.time_dirs = {d: set() for d in self.processor_dirs}
+        self.closed_files = {}
+        self.reported = set()
+        self.last_scan = 0.0
+
+        try:
+            self.inotify = Inotify()
+            for d in self.processor_dirs:
+                self.inotify.add_watch(d, IN_CREATE | IN_MOVED_TO | IN_DELETE_SELF)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), falling back to polling every {poll_interval}s.", flush=True)
+            self.inotify = None
+
+        self.scan()
+
+    @property
+    def event_driven(self):
+        return self.inotify is not None
+
+    def _watch_time_dir(self, processor_dir, time_name):
+        if time_name in self.time_dirs[processor_dir]:
+            return
+        self.time_dirs[processor_dir].add(time_name)
+        if self.inotify is not None:
+            try:
+                self.inotify.add_watch(os.path.join(processor_dir, time_name), IN_CLOSE_WRITE | IN_MOVED_TO)
+            except OSError:
+                pass  # removed before it could be watched, the rescan will catch up
+
+    def scan(self):
+        # Full directory listing, used initially, as polling fallback and after queue overflows
+        for d in self.processor_dirs:
+            try:
+                names = os.listdir(d)
+            except FileNotFoundError:
+                continue
+            for name in names:
+                if is_time_name(name) and os.path.isdir(os.path.join(d, name)):
+                    self._watch_time_dir(d, name)
+        self.last_scan = time.monotonic()
+
+    def _handle_events(self, events):
+        for path, mask, name in events:
+            if mask & IN_Q_OVERFLOW or path is None:
+                self.scan()
+            elif path in self.time_dirs:
+                if mask & IN_ISDIR and is_time_name(name):
+                    self._watch_time_dir(path, name)
+            else:
+                processor_dir, time_name = os.path.split(path)
+                self.closed_files.setdefault((processor_dir, time_name), set()).add(name)
+
+    def _is_written(self, processor_dir, time_name):
+        closed = self.closed_files.get((processor_dir, time_name), set())
+        now = time.time()
+        for field in self.required_files:
+            if field in closed:
+                continue
+            try:
+                modified = os.stat(os.path.join(processor_dir, time_name, field)).st_mtime
+            except FileNotFoundError:
+                return False
+            if now - modified < self.settle_seconds:
+                return False
+        return True
+
+    def _pending(self):
+        common = set.intersection(*self.time_dirs.values()) if self.time_dirs else set()
+        return sorted(common, key=float)
+
+    def _collect_complete(self):
+        common = self._pending()
+        complete = []
+        for i, time_name in enumerate(common):
+            if time_name in self.reported:
+                continue
+            has_later_time = i < len(common) - 1
+            if not has_later_time and not all(self._is_written(d, time_name) for d in self.processor_dirs):
+                break
+            self.reported.add(time_name)
+            complete.append(time_name)
+        return complete
+
+    def wait(self, timeout=None):
+        """
+        Block until at least one new complete time is available or timeout expires.
+        Returns the newly completed time names in chronological order, each reported only once.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            complete = self._collect_complete()
+            if complete:
+                return complete
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return []
+
+            # Wake up often enough to re-check files that are still settling
+            wait_time = self.poll_interval
+            if any(t not in self.reported for t in self._pending()):
+                wait_time = min(wait_time, self.settle_seconds)
+            if deadline is not None:
+                wait_time = min(wait_time, deadline - now)
+
+            if self.inotify is not None:
+                self._handle_events(self.inotify.read_events(wait_time))
+                if time.monotonic() - self.last_scan >= self.poll_interval:
+                    self.scan()
+            else:
+                time.sleep(wait_time)
+                self.scan()
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
@@ -8,6 +8,8 @@ Created on Mon Mar 17 15:12:58 2025
 from scipy.interpolate import splrep, splev
 import numpy as np
 
+import polyMesh
+
 def interpolateSpline(wall_coordinates, mesh_points, sample_points):
     
     x = wall_coordinates[:,0]
@@ -56,3 +58,25 @@ def update(filename, R_wall, N):
                 file.write(line)    
             
     return
+
+def morph(wall_coordinates, R_wall, polyMesh_dir="constant/polyMesh"):
+    """
+    Move the wall of the existing mesh inwards by the spline of R_wall instead of remeshing.
+
+    Every point is scaled vertically so that it keeps its relative height between the symmetry
+    axis and the wall, which preserves the vertical progression of the transfinite Gmsh mesh.
+    Points keep their x coordinate.
+    """
+    points = polyMesh.read_points(polyMesh_dir)
+
+    # Wall height of the current mesh, the outerwall faces are straight between their points
+    wall_points = points[polyMesh.patch_point_labels('outerwall', polyMesh_dir)]
+    wall_x, wall_index = np.unique(wall_points[:,0], return_index=True)
+    wall_y = wall_points[wall_index, 1]
+
+    wall_height = np.interp(points[:,0], wall_x, wall_y)
+    points[:,1] *= 1 - interpolateSpline(wall_coordinates, R_wall, points[:,0]) / wall_height
+
+    polyMesh.write_points(points, polyMesh_dir)
+
+    return
@@ -0,0 +1,143 @@
+import numpy as np
+
+
+def closure_time(heights, rates, rate_changes):
+    """
+    Time at which the first wall cell closes when the wall moves inwards by
+    rates * t + rate_changes * t**2 / 2, or inf if no cell closes.
+    """
+    # Smallest positive root of rate_changes / 2 * t**2 + rates * t - heights = 0 per cell,
+    # in the form that stays exact for rate_changes = 0
+    discriminant = rates**2 + 2 * rate_changes * heights
+    root = np.sqrt(np.maximum(discriminant, 0))
+    denominator = rates + root
+    with np.errstate(divide='ignore', invalid='ignore'):
+        times = np.where((discriminant >= 0) & (denominator > 0), 2 * heights / denominator, np.inf)
+    return float(np.min(times))
+
+
+class WallEvolution:
+    """
+    Evolves the wall between outer runs from the history of the wall growth rates dRw/dt of
+    the steady CFD runs.
+
+    Predictor: the rate is extrapolated linearly from the last two runs and integrated exactly
+    over the step. Corrector: once the next run gives the rate at the end of the step, the step
+    is recomputed with the trapezoidal rule and the difference is added to the next step. This
+    difference, relative to the local channel height, is the error estimate that sets the next
+    step length, so slowly varying rates give long steps and few solver launches.
+
+    The first step, without rate history, moves the wall by first_step_fraction of the local
+    channel height with the rate frozen, like the threshold integrator. If no rate exceeds min_rate
+    [m/s] the wall does not move and the step is max_step.
+    """
+    def __init__(self, tolerance=1e-3, max_step_fraction=0.25, first_step_fraction=0.05, safety_factor=0.9,
+                 max_growth=4.0, min_step=1e-4, max_step=np.inf, min_rate=1e-15):
+        self.tolerance = tolerance
+        self.max_step_fraction = max_step_fraction
+        self.first_step_fraction = first_step_fraction
+        self.safety_factor = safety_factor
+        self.max_growth = max_growth
+        self.min_step = min_step
+        self.max_step = max_step
+        self.min_rate = min_rate
+
+        # Rate history of the outer runs: time, x of the wall cells and dRw/dt
+        self.times = []
+        self.x = []
+        self.rates = []
+
+        # Last step: length, predicted displacement and the order of its predictor
+        self.step = None
+        self.predicted = None
+        self.order = 1
+        self.error = None
+
+    def add_rates(self, time, x, rates):
+        self.times.append(float(time))
+        self.x.append(np.asarray(x, dtype=np.float64).copy())
+        self.rates.append(np.asarray(rates, dtype=np.float64).copy())
+
+    def state(self):
+        # Rate history and last step as arrays, e.g. for a checkpoint, restored by restore()
+        arrays = {'times': np.array(self.times), 'order': np.array(self.order),
+                  'step': np.array(np.nan if self.step is None else self.step)}
+        if self.predicted is not None:
+            arrays['predicted'] = self.predicted
+        for i, (x, rates) in enumerate(zip(self.x, self.rates)):
+            arrays[f'x/{i}'] = x
+            arrays[f'rates/{i}'] = rates
+        return arrays
+
+    def restore(self, arrays):
+        self.times = [float(time) for time in arrays['times']]
+        self.x = [np.asarray(arrays[f'x/{i}'], dtype=np.float64) for i in range(len(self.times))]
+        self.rates = [np.asarray(arrays[f'rates/{i}'], dtype=np.float64) for i in range(len(self.times))]
+        self.order = int(arrays['order'])
+        self.step = None if np.isnan(arrays['step']) else float(arrays['step'])
+        self.predicted = arrays.get('predicted')
+
+    def previous(self, values, x):
+        # Values of the previous run on the wall cells of the current run, which move slightly when remeshing
+        return np.interp(x, self.x[-2], values)
+
+    def rate_change(self):
+        if len(self.rates) < 2:
+            return np.zeros_like(self.rates[-1])
+        return (self.rates[-1] - self.previous(self.rates[-2], self.x[-1])) / (self.times[-1] - self.times[-2])
+
+    def correction(self):
+        # Trapezoidal displacement of the last step minus the predicted displacement
+        if self.predicted is None:
+            return np.zeros_like(self.rates[-1])
+        corrected = 0.5 * (self.previous(self.rates[-2], self.x[-1]) + self.rates[-1]) * self.step
+        return corrected - self.previous(self.predicted, self.x[-1])
+
+    def next_step(self, heights):
+        """
+        Return (dt, displacement, closed) for the step from the last run: the step length, the inwards
+        displacement of every wall cell including the correction of the previous step, and whether
+        the wall closes within the step (dt is then the closure time).
+        """
+        heights = np.asarray(heights, dtype=np.float64)
+        rates = self.rates[-1]
+        rate_changes = self.rate_change()
+        correction = self.correction()
+
+        if np.all(np.abs(rates) <= self.min_rate):
+            # The wall does not move: the largest allowed step with zero displacement
+            if not np.isfinite(self.max_step):
+                raise ValueError("All wall growth rates are zero, the step length needs a finite max_step.")
+            rates = np.zeros_like(rates)
+            rate_changes = np.zeros_like(rate_changes)
+            dt = self.max_step
+        elif self.step is None:
+            with np.errstate(divide='ignore'):
+                dt = self.first_step_fraction * np.min(heights / np.abs(rates))
+        else:
+            # Step size controller for a method of the order of the last predictor, with the error
+            # relative to the channel height so that steps do not vanish as the wall closes
+            self.error = np.max(np.abs(correction)) / np.max(heights)
+            factor = self.safety_factor * (self.tolerance / self.error) ** (1 / (self.order + 1)) if self.error > 0 else self.max_growth
+            dt = self.step * min(factor, self.max_growth)
+
+        dt = float(np.clip(dt, self.min_step, self.max_step))
+
+        # The wall closes if any cell reaches the axis within the error-controlled step
+        remaining = heights - correction
+        closing = closure_time(remaining, rates, rate_changes)
+        closed = closing <= dt
+        if closed:
+            dt = closing
+        else:
+            # Otherwise keep the next mesh valid: no cell may move by more than max_step_fraction of its height
+            displacement_limit = self.max_step_fraction * remaining
+            largest = np.max((np.abs(rates) * dt + 0.5 * np.abs(rate_changes) * dt**2) / displacement_limit)
+            if largest > 1:
+                dt = max(dt / largest, self.min_step)
+
+        self.predicted = rates * dt + 0.5 * rate_changes * dt**2
+        self.step = dt
+        self.order = 2 if len(self.rates) >= 2 else 1
+
+        return dt, self.predicted + correction, closed
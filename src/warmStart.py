@@ -0,0 +1,65 @@
+import os
+import numpy as np
+from scipy.spatial import cKDTree
+
+import foamFieldIO
+
+
+def normalised_coordinates(cell_centres, wall_face_centres):
+    # Cell centres as (x / channel length, y / local channel height). The mesh follows the wall
+    # vertically, so cells keep these coordinates when the wall moves and the boundary layer
+    # is mapped onto the cells next to the new wall.
+    wall = wall_face_centres[np.argsort(wall_face_centres[:,0])]
+
+    wall_height = np.interp(cell_centres[:,0], wall[:,0], wall[:,1])
+    length = wall[-1,0] - wall[0,0]
+
+    return np.column_stack(((cell_centres[:,0] - wall[0,0]) / length, cell_centres[:,1] / wall_height))
+
+
+class FieldMapper:
+    """
+    Inverse distance interpolation from the cells of a previous mesh onto the cells of the current
+    mesh, using the nearest source cells in normalised coordinates found with a KD-tree.
+    Meshes are given by their cell centres and the face centres of their outerwall patch.
+    """
+    def __init__(self, source_centres, source_wall, target_centres, target_wall, neighbours=4):
+        source = normalised_coordinates(source_centres, source_wall)
+        target = normalised_coordinates(target_centres, target_wall)
+        self.n_source = len(source)
+        self.n_target = len(target)
+
+        distances, self.indices = cKDTree(source).query(target, k=neighbours)
+
+        # A source cell at the same normalised position, as for morphed meshes, takes all the weight
+        weights = 1.0 / np.maximum(distances, 1e-12)
+        self.weights = weights / weights.sum(axis=1, keepdims=True)
+
+    def map(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) != self.n_source:
+            raise ValueError(f"Expected {self.n_source} source values but got {len(values)}.")
+        return np.einsum('ij,ij...->i...', self.weights, values[self.indices])
+
+
+def map_fields(source_fields, mapper, target_dir="0", write_format=None):
+    """
+    Replace the internalField of every field in target_dir that is also in source_fields (name -> values
+    on the previous mesh) by the values mapped onto the current mesh. Boundary conditions of the target
+    files are kept. Returns the names of the mapped fields.
+    """
+    mapped_fields = []
+    for field, values in source_fields.items():
+        target_file = os.path.join(target_dir, field)
+        if not os.path.isfile(target_file):
+            continue
+
+        target_content = foamFieldIO.read_file(target_file)
+        new_content = foamFieldIO.replace_internal_field(target_content, mapper.map(values), write_format)
+
+        with open(target_file, "wb") as f:
+            f.write(new_content)
+
+        mapped_fields.append(field)
+
+    return mapped_fields
@@ -0,0 +1,16 @@
+#!/bin/bash
+
+if [ "$#" -lt 1 ]; then
+    echo "Usage: $0 [--cores N] [--max-active M] [--processors P] [--resume] <case_directory> [<case_directory> ...]"
+    exit 1
+fi
+
+mkdir -p logs
+
+LOGFILE="logs/campaign_$(date +%Y%m%d_%H%M%S).log"
+
+echo "Starting campaign in background for: $*"
+echo "Logging scheduler output to: $LOGFILE (every case logs to <case_directory>/logs)"
+
+# The scheduler starts one runSimulation.py per case on its own set of cores
+nohup python3 src/runCampaign.py "$@" > "$LOGFILE" 2>&1 &
@@ -1,11 +1,19 @@
 #!/bin/bash
 
-if [ "$#" -ne 1 ]; then
-    echo "Usage: $0 <case_directory>"
+if [ "$#" -lt 1 ]; then
+    echo "Usage: $0 <case_directory> [--resume] [--profile]"
     exit 1
 fi
 
 CASE_DIR="$1"
+shift
+
+for OPTION in "$@"; do
+    if [ "$OPTION" != "--resume" ] && [ "$OPTION" != "--profile" ]; then
+        echo "Error: Unknown option '$OPTION'."
+        exit 1
+    fi
+done
 
 if [ ! -d "$CASE_DIR" ]; then
     echo "Error: Directory '$CASE_DIR' does not exist."
@@ -20,4 +28,5 @@ echo "Starting simulation in background for case directory: $CASE_DIR"
 echo "Logging output to: $LOGFILE"
 
 # Pass the case path into Python and redirect all stdout+stderr from Python to the log file
-nohup python3 src/runSimulation.py "$CASE_DIR" > "$LOGFILE" 2>&1 &
+# --resume continues from the checkpoint of the last completed stage, --profile runs every stage under cProfile
+nohup python3 src/runSimulation.py "$CASE_DIR" "$@" > "$LOGFILE" 2>&1 &
@@ -1,5 +1,6 @@
 #!/bin/bash
 
+pkill -f -u "$USER" runCampaign.py
 pkill -f -u "$USER" runSimulation.py
 pkill -2 -u "$USER" -x mpirun
 